@@ -0,0 +1,227 @@
+from collections import deque
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+import time
+
+KINDS = ("screenshot", "dom", "network")
+DROP_POLICIES = ("oldest", "newest")
+
+# Resumen tipo HAR de las peticiones de la página (Resource Timing): no requiere
+# activar el log de red al lanzar el navegador y funciona en todos los backends.
+_NETWORK_JS = r"""
+    var nav = performance.getEntriesByType('navigation');
+    return nav.concat(performance.getEntriesByType('resource')).map(function (e) {
+        return {
+            url: e.name, type: e.initiatorType || e.entryType, start: Math.round(e.startTime),
+            duration: Math.round(e.duration), transferSize: e.transferSize || 0,
+            status: e.responseStatus || null
+        };
+    });
+"""
+
+_DOM_JS = "return document.documentElement ? document.documentElement.outerHTML : '';"
+
+
+class ArtifactCollector:
+    def __init__(self, directory="artifacts", on_failure=True, every=None, kinds=KINDS, max_queue=16, drop="oldest"):
+        """
+        Captura capturas de pantalla, DOM y resumen de red cuando falla un método
+        público del driver (o cada `every` llamadas) para poder hacer post-mortems.
+
+        En el camino de la acción solo se piden los datos al navegador; decodificar,
+        comprimir y escribir en disco lo hace un hilo en segundo plano. La cola está
+        acotada: si el disco no da abasto se descartan capturas según `drop` en lugar
+        de frenar el scraping. Las llamadas que terminan bien no pagan nada si
+        `every` es None.
+
+        Args:
+            directory: Carpeta donde se crea una subcarpeta por captura
+            on_failure: Si True, captura cuando un método termina en excepción
+            every: Capturar también cada N llamadas (default: nunca)
+            kinds: Qué capturar: "screenshot", "dom", "network"
+            max_queue: Capturas pendientes de escribir como máximo
+            drop: Qué descartar con la cola llena: "oldest" (la más antigua en cola)
+                o "newest" (la nueva)
+
+        Example:
+            driver = CustomDriver(artifacts={"directory": "failures", "every": 50})
+        """
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise Exception(f"Unknown artifact kinds {sorted(unknown)}. Use {KINDS}")
+        if drop not in DROP_POLICIES:
+            raise Exception(f"Unknown drop policy {drop}. Use one of {DROP_POLICIES}")
+        self.directory = directory
+        self.on_failure = on_failure
+        self.every = every
+        self.kinds = tuple(kinds)
+        self.max_queue = max_queue
+        self.drop = drop
+        self.calls = 0
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pending = 0
+        self._worker = threading.Thread(target=self._write_loop, name="customdriver-artifacts", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_option(cls, option):
+        """
+        Construye el colector a partir del parámetro `artifacts` del driver: None
+        (desactivado), una carpeta, un diccionario de argumentos o una instancia.
+        """
+        if option is None or option is False:
+            return None
+        if isinstance(option, ArtifactCollector):
+            return option
+        if isinstance(option, str):
+            return cls(directory=option)
+        if isinstance(option, dict):
+            return cls(**option)
+        raise Exception(f"Invalid artifacts {option}. Use a directory, a dict of arguments or an ArtifactCollector")
+
+    def after_call(self, custom_driver, record):
+        """
+        Lo llama el decorador `instrumented` al terminar cada método público.
+        """
+        with self._cond:
+            self.calls += 1
+            calls = self.calls
+        failed = record["error"] is not None
+        if (failed and self.on_failure) or (self.every and calls % self.every == 0):
+            self.capture(custom_driver, record["method"], selector=record["selector"], error=record["error"])
+
+    def capture(self, custom_driver, label="manual", selector=None, error=None):
+        """
+        Pide al navegador los artefactos y los encola para escribirlos en segundo plano.
+        Nunca lanza excepciones: un navegador muerto no debe tapar el error original.
+
+        Returns:
+            bool: False si no se pudo capturar o se descartó por la cola llena
+        """
+        started = time.perf_counter()
+        item = {"label": label, "selector": selector, "error": error, "time": time.time(), "call": self.calls}
+        try:
+            # Directo al driver: los métodos instrumentados volverían a pasar por after_call
+            item["url"] = custom_driver.driver.get_current_url() if custom_driver.cdp else custom_driver.driver.current_url
+        except Exception as e:
+            item["url"] = None
+            item["capture_errors"] = [f"url: {e}"]
+        for kind in self.kinds:
+            try:
+                item[kind] = self._grab(custom_driver, kind)
+            except Exception as e:
+                item.setdefault("capture_errors", []).append(f"{kind}: {e}")
+        item["capture_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return self._enqueue(item)
+
+    def _grab(self, custom_driver, kind):
+        if kind == "screenshot":
+            # base64 tal cual: decodificar y escribir el PNG es trabajo del hilo de fondo
+            if custom_driver.cdp:
+                return custom_driver._execute_cdp("Page.captureScreenshot", {"format": "png"})["data"]
+            return custom_driver.driver.get_screenshot_as_base64()
+        if kind == "dom":
+            return custom_driver._execute_js(_DOM_JS)
+        return custom_driver._execute_js(_NETWORK_JS)
+
+    def _enqueue(self, item):
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.drop == "newest":
+                    print(f"⚠️ Artifact queue full, dropped capture of {item['label']}")
+                    return False
+                old = self._queue.popleft()
+                self._pending -= 1
+                print(f"⚠️ Artifact queue full, dropped capture of {old['label']}")
+            self._queue.append(item)
+            self.captured += 1
+            self._pending += 1
+            self._cond.notify()
+        return True
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+            try:
+                self._write(item)
+                with self._cond:
+                    self.written += 1
+            except Exception as e:
+                print(f"⚠️ Could not write artifacts for {item['label']}: {e}")
+                with self._cond:
+                    self.errors += 1
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    self._cond.notify_all()
+
+    def _write(self, item):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(item["time"])) + f"-{int(item['time'] * 1000) % 1000:03d}"
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{stamp}-{item['call']}-{item['label']}")
+        folder = os.path.join(self.directory, name)
+        os.makedirs(folder, exist_ok=True)
+        if item.get("screenshot"):
+            with open(os.path.join(folder, "screenshot.png"), "wb") as f:
+                f.write(base64.b64decode(item["screenshot"]))
+        if item.get("dom") is not None:
+            with gzip.open(os.path.join(folder, "dom.html.gz"), "wt", encoding="utf-8") as f:
+                f.write(item["dom"])
+        if item.get("network") is not None:
+            with gzip.open(os.path.join(folder, "network.json.gz"), "wt", encoding="utf-8") as f:
+                json.dump(item["network"], f)
+        meta = {key: item.get(key) for key in ("label", "selector", "error", "url", "time", "call", "capture_ms", "capture_errors")}
+        with open(os.path.join(folder, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def flush(self, timeout=10):
+        """
+        Espera a que se escriban las capturas encoladas.
+
+        Returns:
+            bool: True si no queda nada pendiente
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Escribe lo pendiente y detiene el hilo de fondo."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    def stats(self):
+        """
+        Returns:
+            dict: calls, captured, written, dropped, errors y queued
+        """
+        with self._cond:
+            return {
+                "calls": self.calls, "captured": self.captured, "written": self.written,
+                "dropped": self.dropped, "errors": self.errors, "queued": len(self._queue),
+            }
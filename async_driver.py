@@ -0,0 +1,390 @@
+from typing import Protocol
+from concurrent.futures import ThreadPoolExecutor
+from driver import CustomDriver
+from metrics import instrumented, note_sleep
+import pacing
+from selenium.webdriver.common.by import By
+import asyncio
+import contextvars
+import functools
+import threading
+
+# Executor compartido por todas las sesiones asíncronas. Está acotado para que
+# decenas de sesiones no se traduzcan en decenas de hilos bloqueados.
+DEFAULT_MAX_WORKERS = 32
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor(max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Devuelve el ThreadPoolExecutor compartido para las llamadas bloqueantes
+    de WebDriver/CDP, creándolo la primera vez que se pide.
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="customdriver")
+        return _default_executor
+
+
+class AsyncCustomDriver:
+    def __init__(self, custom_driver, executor=None):
+        """
+        Envuelve un CustomDriver ya iniciado con una API asíncrona.
+
+        Cada método delega en el mismo método de CustomDriver, ejecutado en un
+        executor acotado, así que ambas APIs se comportan igual. Los delays
+        humanizados de esos métodos se esperan después con `await asyncio.sleep`,
+        sin ocupar el hilo, de modo que un solo event loop puede manejar muchas
+        sesiones a la vez.
+
+        Normalmente se construye con `await AsyncCustomDriver.create(...)`.
+
+        Args:
+            custom_driver: Instancia de CustomDriver ya inicializada
+            executor: Executor para las llamadas bloqueantes (default: executor compartido)
+        """
+        self._sync = custom_driver
+        self._executor = executor or get_default_executor()
+        # Un WebDriver no admite comandos concurrentes: se serializan por sesión
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def create(cls, executor=None, **kwargs):
+        """
+        Crea el CustomDriver subyacente en el executor (el arranque del navegador
+        es bloqueante) y devuelve la versión asíncrona.
+
+        Args:
+            executor: Executor para las llamadas bloqueantes (default: executor compartido)
+            **kwargs: Argumentos de CustomDriver (proxy, browser_options, pacing, ...)
+
+        Returns:
+            AsyncCustomDriver: Driver listo para usar
+        """
+        executor = executor or get_default_executor()
+        loop = asyncio.get_running_loop()
+        custom_driver = await loop.run_in_executor(executor, functools.partial(CustomDriver, **kwargs))
+        return cls(custom_driver, executor)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.quit()
+
+    @property
+    def driver(self):
+        return self._sync.driver
+
+    @property
+    def cdp(self):
+        return self._sync.cdp
+
+    @property
+    def mobileEmulation(self):
+        return self._sync.mobileEmulation
+
+    @property
+    def pacer(self):
+        return self._sync.pacer
+
+    @property
+    def metrics(self):
+        return self._sync.metrics
+
+    @property
+    def artifacts(self):
+        return self._sync.artifacts
+
+    @property
+    def type_speed(self):
+        return self._sync.type_speed
+
+    @property
+    def wait_speed(self):
+        return self._sync.wait_speed
+
+    @property
+    def typeSlowly(self):
+        return self._sync.typeSlowly
+
+    async def _run(self, fn, *args, **kwargs):
+        """
+        Ejecuta una llamada bloqueante en el executor, serializada por sesión.
+
+        Se ejecuta en una copia del contexto actual para que el hilo vea la llamada
+        instrumentada en curso: así el método síncrono delegado no se registra como
+        otra llamada de primer nivel.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        async with self._lock:
+            return await loop.run_in_executor(self._executor, contextvars.copy_context().run, call)
+
+    async def _call(self, method, *args, **kwargs):
+        """
+        Ejecuta un método del CustomDriver síncrono en el executor, con la misma lógica
+        (motor de esperas, caché de elementos, reintentos, escritura por W3C Actions).
+        Sus delays humanizados no se duermen en el hilo: se acumulan y se esperan al
+        terminar con await asyncio.sleep (ver pacing.deferred_sleeps).
+        """
+        deferred = []
+        token = pacing.deferred_sleeps.set(deferred)
+        try:
+            result = await self._run(method, *args, **kwargs)
+        finally:
+            pacing.deferred_sleeps.reset(token)
+        seconds = sum(deferred)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+            note_sleep(seconds)
+        return result
+
+    async def quit(self):
+        """
+        Cierra el navegador y finaliza la sesión del driver.
+        """
+        await self._run(self._sync.quit)
+
+    async def is_alive(self):
+        """
+        Comprueba que la sesión del navegador sigue respondiendo.
+        """
+        return await self._run(self._sync.is_alive)
+
+    async def reset(self):
+        """
+        Deja la sesión limpia para reutilizarla (pestañas, cookies, storage, about:blank).
+        """
+        await self._run(self._sync.reset)
+
+    def cache_stats(self):
+        """
+        Estadísticas de la caché de elementos (ver CustomDriver.cache_stats).
+        """
+        return self._sync.cache_stats()
+
+    def blocking_stats(self):
+        """
+        Recursos bloqueados en esta sesión (ver CustomDriver.blocking_stats).
+        """
+        return self._sync.blocking_stats()
+
+    def artifact_stats(self):
+        """
+        Estadísticas de la captura de artefactos (ver CustomDriver.artifact_stats).
+        """
+        return self._sync.artifact_stats()
+
+    async def capture_artifacts(self, label="manual"):
+        """
+        Captura pantalla, DOM y red de la página actual (ver CustomDriver.capture_artifacts).
+        """
+        return await self._run(self._sync.capture_artifacts, label)
+
+    def memory_stats(self):
+        """
+        Estado del watchdog de memoria (ver CustomDriver.memory_stats).
+        """
+        return self._sync.memory_stats()
+
+    async def detach(self, name=None):
+        """
+        Suelta el driver dejando el navegador abierto (ver CustomDriver.detach).
+        """
+        return await self._run(self._sync.detach, name)
+
+    async def recycle(self, restore=True, reason="manual"):
+        """
+        Relanza el navegador y restaura URL y estado (ver CustomDriver.recycle).
+        """
+        await self._call(self._sync.recycle, restore, reason)
+
+    async def pause(self):
+        """
+        Pausa la ejecución hasta que el usuario presione Enter, sin bloquear el event loop.
+        """
+        await self._run(self._sync.pause)
+
+    @instrumented("get")
+    async def get(self, url, wait_until=None, timeout=30, humanize=None):
+        """
+        Navega a la URL especificada (ver CustomDriver.get).
+        """
+        await self._call(self._sync.get, url, wait_until, timeout, humanize)
+
+    @instrumented("change_to_new_tab")
+    async def change_to_new_tab(self, wait_until=None, timeout=30, humanize=None):
+        """
+        Cambia el foco del driver a la última pestaña abierta (ver CustomDriver.change_to_new_tab).
+        """
+        await self._call(self._sync.change_to_new_tab, wait_until, timeout, humanize)
+
+    @instrumented("type")
+    async def type(self, element_selector, text, scroll=False, clickOutside=True):
+        """
+        Escribe texto en un elemento input/textarea (ver CustomDriver.type).
+
+        Con typeSlowly=True la escritura va por el motor de typing_engine: con el motor
+        "actions" las pausas entre teclas las hace el navegador dentro de cada bloque
+        de W3C Actions, así que el hilo del executor queda ocupado mientras dura.
+        """
+        await self._call(self._sync.type, element_selector, text, scroll, clickOutside)
+
+    @instrumented("click")
+    async def click(self, element_selector, scroll=False, radio=False):
+        """
+        Hace clic en un elemento (ver CustomDriver.click).
+        """
+        await self._call(self._sync.click, element_selector, scroll, radio)
+
+    @instrumented("select_option_by_value")
+    async def select_option_by_value(self, element_selector, value):
+        """
+        Selecciona una opción de un <select> por su valor (ver CustomDriver.select_option_by_value).
+        """
+        await self._call(self._sync.select_option_by_value, element_selector, value)
+
+    @instrumented("fill_form")
+    async def fill_form(self, fields, scroll=False, clickOutside=True):
+        """
+        Rellena varios campos de un formulario de una vez (ver CustomDriver.fill_form).
+        """
+        await self._call(self._sync.fill_form, fields, scroll, clickOutside)
+
+    @instrumented("wait_for_clickable_element")
+    async def wait_for_clickable_element(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
+        """
+        Espera hasta que un elemento sea clickeable (ver CustomDriver.wait_for_clickable_element).
+
+        Returns:
+            WebElement: El elemento cuando está listo para ser clickeado
+        """
+        return await self._call(self._sync.wait_for_clickable_element, element_selector, timeout, by)
+
+    @instrumented("wait_for_visible_element")
+    async def wait_for_visible_element(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
+        """
+        Espera hasta que un elemento sea visible (ver CustomDriver.wait_for_visible_element).
+
+        Returns:
+            WebElement: El elemento cuando es visible
+        """
+        return await self._call(self._sync.wait_for_visible_element, element_selector, timeout, by)
+
+    @instrumented("scroll_to_element")
+    async def scroll_to_element(self, element):
+        """
+        Hace scroll suave hasta un elemento (ver CustomDriver.scroll_to_element).
+
+        Returns:
+            WebElement: El elemento al que se hizo scroll
+        """
+        return await self._call(self._sync.scroll_to_element, element)
+
+    @instrumented("getElement")
+    async def getElement(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
+        """
+        Obtiene un elemento esperando a que esté presente (ver CustomDriver.getElement).
+
+        Returns:
+            WebElement: El elemento encontrado
+        """
+        return await self._call(self._sync.getElement, element_selector, timeout, by)
+
+    @instrumented("get_current_url")
+    async def get_current_url(self):
+        """
+        Obtiene la URL actual del navegador.
+        """
+        return await self._run(self._sync.get_current_url)
+
+    @instrumented("wait_for_element_to_disappear")
+    async def wait_for_element_to_disappear(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
+        """
+        Espera hasta que un elemento desaparezca o se vuelva invisible (ver CustomDriver.wait_for_element_to_disappear).
+        """
+        await self._call(self._sync.wait_for_element_to_disappear, element_selector, timeout, by)
+
+    @instrumented("wait_for")
+    async def wait_for(self, element_selector, state="visible", timeout=20, by=By.CSS_SELECTOR, text=None):
+        """
+        Espera a que un elemento alcance un estado (ver CustomDriver.wait_for).
+        La espera se resuelve dentro de la página con un único script.
+        """
+        return await self._call(self._sync.wait_for, element_selector, state, timeout, by, text)
+
+    @instrumented("wait_for_any")
+    async def wait_for_any(self, conditions, timeout=20):
+        """
+        Espera a que se cumpla la primera de varias condiciones (ver CustomDriver.wait_for_any).
+
+        Returns:
+            tuple: (nombre de la condición cumplida, elemento o None)
+        """
+        return await self._call(self._sync.wait_for_any, conditions, timeout)
+
+    @instrumented("extract")
+    async def extract(self, root_selector, fields, limit=None):
+        """
+        Extrae datos estructurados en un único script (ver CustomDriver.extract).
+        """
+        return await self._run(self._sync.extract, root_selector, fields, limit)
+
+    @instrumented("extract_table")
+    async def extract_table(self, table_selector):
+        """
+        Extrae una tabla HTML como lista de diccionarios (ver CustomDriver.extract_table).
+        """
+        return await self._run(self._sync.extract_table, table_selector)
+
+    @instrumented("extract_list")
+    async def extract_list(self, selector, attr=None):
+        """
+        Devuelve el texto o atributo de todos los elementos (ver CustomDriver.extract_list).
+        """
+        return await self._run(self._sync.extract_list, selector, attr)
+
+    async def save_state(self, path, indexeddb=True):
+        """
+        Guarda el estado de la sesión (ver CustomDriver.save_state).
+        """
+        return await self._run(self._sync.save_state, path, indexeddb)
+
+    async def load_state(self, path, max_age=None, required_cookies=None, url=None):
+        """
+        Restaura un estado guardado (ver CustomDriver.load_state).
+        """
+        return await self._call(self._sync.load_state, path, max_age, required_cookies, url)
+
+
+class AsyncDriverMethods(Protocol):
+    async def get(self, url: str, wait_until=None, timeout: int = 30, humanize: bool = None) -> None: ...
+    async def quit(self) -> None: ...
+    async def change_to_new_tab(self, wait_until=None, timeout: int = 30, humanize: bool = None) -> None: ...
+    async def type(self, element_selector: str, text: str, scroll: bool = False, clickOutside: bool = True) -> None: ...
+    async def click(self, element_selector: str, scroll: bool = False, radio: bool = False) -> None: ...
+    async def select_option_by_value(self, element_selector: str, value: str) -> None: ...
+    async def fill_form(self, fields: dict, scroll: bool = False, clickOutside: bool = True) -> None: ...
+    async def wait_for_visible_element(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
+    async def get_current_url(self) -> str: ...
+    async def getElement(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
+    async def scroll_to_element(self, element: any) -> any: ...
+    async def wait_for_clickable_element(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
+    async def wait_for_element_to_disappear(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> None: ...
+    async def wait_for(self, element_selector: str, state: str = "visible", timeout: int = 20, by=By.CSS_SELECTOR, text: str = None) -> any: ...
+    async def wait_for_any(self, conditions: dict, timeout: int = 20) -> tuple: ...
+    async def extract(self, root_selector: str, fields: dict, limit: int = None) -> list: ...
+    async def extract_table(self, table_selector: str) -> list: ...
+    async def extract_list(self, selector: str, attr: str = None) -> list: ...
+    async def save_state(self, path: str, indexeddb: bool = True) -> dict: ...
+    async def load_state(self, path: str, max_age: float = None, required_cookies: list = None, url: str = None) -> bool: ...
+    async def is_alive(self) -> bool: ...
+    async def recycle(self, restore: bool = True, reason: str = "manual") -> None: ...
+    async def detach(self, name: str = None) -> dict: ...
+    async def capture_artifacts(self, label: str = "manual") -> bool: ...
+    async def reset(self) -> None: ...
+    mobileEmulation: bool
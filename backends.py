@@ -0,0 +1,223 @@
+import abc
+import asyncio
+import importlib
+import threading
+import weakref
+
+# Grupo de entry points con el que un paquete externo puede registrar backends:
+#   [project.entry-points."customdriver.backends"]
+#   mibackend = "mi_paquete.backend:MiBackend"
+ENTRY_POINT_GROUP = "customdriver.backends"
+
+_registry = {}
+_instances = {}
+_lock = threading.Lock()
+_entry_points_loaded = False
+
+
+class Backend(abc.ABC):
+    """
+    Interfaz de un backend de navegador. Las dependencias de cada backend se
+    importan dentro de sus métodos, solo cuando se usa.
+
+    Attributes:
+        cdp: True si el driver devuelto es un sb_cdp (API CDPMethods) en lugar de un WebDriver
+        mobile_emulation: False si el backend no admite la emulación táctil
+    """
+    cdp = False
+    mobile_emulation = True
+
+    @abc.abstractmethod
+    def start(self, proxy=None, browser_options=None):
+        """Arranca una sesión y devuelve el driver (WebDriver o CDPMethods)."""
+
+    def start_many(self, count, browser_options=None):
+        """Arranca `count` sesiones en paralelo y devuelve la lista de drivers."""
+        raise Exception(f"Fleet startup is not supported for browser type {type(self).__name__}")
+
+    def recycle(self, driver, proxy=None, browser_options=None):
+        """
+        Cierra el navegador de `driver` y arranca una sesión nueva (ver CustomDriver.recycle).
+        """
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing browser while recycling: {e}")
+        return self.start(proxy=proxy, browser_options=browser_options)
+
+
+class ProfileBackend(Backend):
+    """
+    Backend de perfiles de un gestor externo (Undetectable, Incogniton): el navegador
+    lo lanza la aplicación del gestor, no el driver, así que driver.quit() no lo
+    cierra. Recuerda el perfil de cada driver para cerrarlo por la API al reciclar y
+    relanzar ese mismo perfil.
+    """
+
+    def __init__(self):
+        self._profiles = weakref.WeakKeyDictionary()
+
+    def stop_profile(self, profile_id):
+        """Cierra el perfil `profile_id` por la API del gestor."""
+        raise Exception(f"Stopping profiles is not supported for browser type {type(self).__name__}")
+
+    def recycle(self, driver, proxy=None, browser_options=None):
+        browser_options = dict(browser_options or {})
+        profile_id = self._profiles.get(driver)
+        if profile_id is None and isinstance(browser_options.get("profile"), str):
+            profile_id = browser_options["profile"]
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing browser while recycling: {e}")
+        if profile_id is not None:
+            try:
+                self.stop_profile(profile_id)
+            except Exception as e:
+                print(f"⚠️ Could not stop profile {profile_id} while recycling: {e}")
+            # El mismo perfil, no el siguiente que elija la política
+            browser_options["profile"] = profile_id
+        return self.start(proxy=proxy, browser_options=browser_options)
+
+
+class SeleniumBaseBackend(Backend):
+    cdp = True
+    mobile_emulation = False
+
+    def start(self, proxy=None, browser_options=None):
+        from seleniumbase import sb_cdp
+
+        return sb_cdp.Chrome(browser="brave", proxy="socks5h://" + proxy if proxy else None)
+
+
+class UndetectableBackend(ProfileBackend):
+    def start(self, proxy=None, browser_options=None):
+        from drivers.undetectable import Undetectable
+
+        undetectable = Undetectable()
+        driver = undetectable.start_driver(profile=(browser_options or {}).get("profile"))
+        self._profiles[driver] = undetectable.profile_id
+        return driver
+
+    def start_many(self, count, browser_options=None):
+        from drivers.undetectable import Undetectable
+
+        profile = (browser_options or {}).get("profile", {"policy": "first_available"})
+        drivers = []
+        for profile_id, driver, _ in Undetectable().start_many(count, profile):
+            self._profiles[driver] = profile_id
+            drivers.append(driver)
+        return drivers
+
+    def stop_profile(self, profile_id):
+        from drivers.undetectable import Undetectable
+
+        Undetectable().stop(profile_id)
+
+
+class IncognitonBackend(ProfileBackend):
+    def start(self, proxy=None, browser_options=None):
+        from drivers.incogniton_driver import IncognitonDriver
+
+        incogniton = IncognitonDriver()
+        driver = asyncio.run(incogniton.list_and_select_profile((browser_options or {}).get("profile")))
+        if driver is not None:
+            self._profiles[driver] = incogniton.profile_id
+        return driver
+
+    def start_many(self, count, browser_options=None):
+        from drivers.incogniton_driver import IncognitonDriver
+
+        profile = (browser_options or {}).get("profile", {"policy": "first_available"})
+        drivers = []
+        for profile_id, driver in asyncio.run(IncognitonDriver().start_many(count, profile)):
+            self._profiles[driver] = profile_id
+            drivers.append(driver)
+        return drivers
+
+    def stop_profile(self, profile_id):
+        from drivers.incogniton_driver import IncognitonDriver
+
+        asyncio.run(IncognitonDriver().stop(profile_id))
+
+
+def register(name, backend=None):
+    """
+    Registra un backend para browser_options["type"] == name.
+
+    Args:
+        name: Tipo de backend
+        backend: Clase o instancia de Backend, o su ruta "modulo:Clase" para importarlo
+            solo cuando se use. Sin backend, devuelve un decorador de clase.
+
+    Example:
+        @register("remote-grid")
+        class GridBackend(Backend):
+            def start(self, proxy=None, browser_options=None):
+                from selenium import webdriver
+                return webdriver.Remote(browser_options["url"], options=webdriver.ChromeOptions())
+    """
+    if backend is None:
+        def decorator(cls):
+            register(name, cls)
+            return cls
+        return decorator
+    if isinstance(backend, type) and getattr(backend, "__abstractmethods__", None):
+        raise Exception(f"Backend {name} does not implement {sorted(backend.__abstractmethods__)}")
+    with _lock:
+        _registry[name] = backend
+        _instances.pop(name, None)
+    return backend
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name not in _registry:
+            _registry[entry_point.name] = entry_point.value
+
+
+def get(name):
+    """
+    Devuelve la instancia del backend `name`, importándolo la primera vez.
+
+    Raises:
+        Exception: Si no hay ningún backend registrado con ese nombre
+    """
+    with _lock:
+        if name in _instances:
+            return _instances[name]
+        if name not in _registry:
+            _load_entry_points()
+        if name not in _registry:
+            raise Exception(f"Unknown browser type {name}. Registered: {sorted(_registry)}")
+        backend = _registry[name]
+    # Fuera del lock: el módulo importado puede llamar a register() al importarse
+    if isinstance(backend, str):
+        module, _, attr = backend.partition(":")
+        backend = getattr(importlib.import_module(module), attr)
+    if isinstance(backend, type):
+        backend = backend()
+    with _lock:
+        # Si otro hilo lo resolvió a la vez, todos usan la misma instancia
+        return _instances.setdefault(name, backend)
+
+
+def available():
+    """Nombres de los backends registrados (incluidos los de entry points)."""
+    with _lock:
+        _load_entry_points()
+        return sorted(_registry)
+
+
+register("seleniumbase", SeleniumBaseBackend)
+register("undetectable", UndetectableBackend)
+register("incogniton", IncognitonBackend)
+# Backends en memoria para benchmarks y pruebas sin navegador (ver drivers/fake.py)
+register("fake", "drivers.fake:FakeBackend")
+register("fake_cdp", "drivers.fake:FakeCDPBackend")
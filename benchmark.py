@@ -0,0 +1,162 @@
+from driver import CustomDriver
+import argparse
+import json
+import math
+import time
+
+URL = "https://example.com/"
+
+# Métodos públicos medidos, sobre los selectores de drivers.fake.DEFAULT_PAGE
+OPERATIONS = {
+    "get": lambda d: d.get(URL),
+    "get_current_url": lambda d: d.get_current_url(),
+    "click": lambda d: d.click("#button"),
+    "type": lambda d: d.type("#input", "hola mundo"),
+    "select_option_by_value": lambda d: d.select_option_by_value("#select", "ES"),
+    "fill_form": lambda d: d.fill_form({"#email": "user@example.com", "#select": "MX", "#checkbox": True}),
+    "wait_for_visible_element": lambda d: d.wait_for_visible_element("#button"),
+    "wait_for_clickable_element": lambda d: d.wait_for_clickable_element("#button"),
+    "getElement": lambda d: d.getElement("#input"),
+    "wait_for_element_to_disappear": lambda d: d.wait_for_element_to_disappear(".missing", timeout=1),
+    "wait_for_any": lambda d: d.wait_for_any({"ok": "#button", "error": ".error"}),
+    "extract": lambda d: d.extract(".product", {"title": "h2", "price": ".price"}),
+    "extract_table": lambda d: d.extract_table("#results"),
+    "extract_list": lambda d: d.extract_list(".item"),
+}
+
+
+def percentile(samples, q):
+    """Percentil exacto (nearest-rank) de una lista ordenada de muestras."""
+    index = max(0, min(len(samples) - 1, math.ceil(q / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def run_operation(custom_driver, name, iterations, warmup):
+    """
+    Ejecuta una operación `iterations` veces y devuelve su resumen.
+
+    Returns:
+        dict: ops_per_sec, p50_ms, p99_ms, commands_per_op (comandos del backend falso por
+            llamada) y errors
+    """
+    operation = OPERATIONS[name]
+    browser = custom_driver.driver.browser
+    for _ in range(warmup):
+        operation(custom_driver)
+    commands_before = sum(browser.commands.values())
+    samples, errors = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            operation(custom_driver)
+        except Exception as e:
+            errors += 1
+            print(f"❌ {name}: {e}")
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "ops_per_sec": round(iterations / total, 1) if total else None,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "commands_per_op": round((sum(browser.commands.values()) - commands_before) / iterations, 2),
+        "errors": errors,
+    }
+
+
+def run(backends=("fake",), profiles=("none", "brisk"), operations=None, iterations=50, warmup=3,
+        latency=0.0, faults=None, seed=None, type_slowly=False, honor_pauses=True):
+    """
+    Mide los métodos públicos de CustomDriver sobre el backend en memoria, para
+    comparar el coste del wrapper (pacing, esperas, reintentos, caché) entre cambios
+    sin depender de un navegador real.
+
+    Args:
+        backends: "fake" (camino selenium) y/o "fake_cdp" (camino sb_cdp)
+        profiles: Perfiles de pacing a medir
+        operations: Nombres de OPERATIONS a medir (default: todas)
+        iterations: Llamadas medidas por operación
+        warmup: Llamadas previas sin medir
+        latency: Latencia inyectada por comando del backend (float o (min, max))
+        faults: Fallos inyectados, ver drivers.fake.FakeBrowser
+        seed: Semilla de latencias y fallos
+        type_slowly: Si True, mide type con escritura carácter a carácter
+        honor_pauses: Si False, las pausas y movimientos de ActionChains no consumen tiempo
+            (aísla el coste del wrapper del de las animaciones de puntero)
+
+    Returns:
+        dict: {backend: {perfil: {operación: resumen}}}
+    """
+    results = {}
+    for backend in backends:
+        results[backend] = {}
+        for profile in profiles:
+            browser_options = {"type": backend, "latency": latency, "faults": faults or {}, "seed": seed,
+                               "honor_pauses": honor_pauses}
+            custom_driver = CustomDriver(browser_options=browser_options, pacing=profile, typeSlowly=type_slowly)
+            try:
+                custom_driver.get(URL)
+                results[backend][profile] = {
+                    name: run_operation(custom_driver, name, iterations, warmup)
+                    for name in (operations or OPERATIONS)
+                }
+            finally:
+                custom_driver.quit()
+    return results
+
+
+def print_report(results):
+    header = f"{'operation':<30} {'ops/sec':>10} {'p50 ms':>10} {'p99 ms':>10} {'cmds/op':>8} {'errors':>7}"
+    for backend, profiles in results.items():
+        for profile, operations in profiles.items():
+            print(f"\n📊 backend={backend} pacing={profile}")
+            print(header)
+            print("-" * len(header))
+            for name, summary in operations.items():
+                print(
+                    f"{name:<30} {summary['ops_per_sec'] or 0:>10} {summary['p50_ms']:>10} "
+                    f"{summary['p99_ms']:>10} {summary['commands_per_op']:>8} {summary['errors']:>7}"
+                )
+
+
+def parse_faults(specs):
+    """Convierte ["click:stale=0.1,intercepted=0.05", "find:not_found=0.1"] en el dict de faults."""
+    faults = {}
+    for spec in specs or []:
+        op, _, kinds = spec.partition(":")
+        for kind in kinds.split(","):
+            name, _, rate = kind.partition("=")
+            faults.setdefault(op, {})[name] = float(rate)
+    return faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de CustomDriver sobre el backend en memoria")
+    parser.add_argument("--backends", nargs="+", default=["fake"], choices=["fake", "fake_cdp"])
+    parser.add_argument("--profiles", nargs="+", default=["none", "brisk"], help="Perfiles de pacing (none, brisk, human)")
+    parser.add_argument("--operations", nargs="+", choices=sorted(OPERATIONS), help="Operaciones a medir (default: todas)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0], help="Latencia por comando en segundos, o MIN MAX")
+    parser.add_argument("--faults", nargs="+", help="Fallos inyectados, ej: click:stale=0.1,intercepted=0.05 find:not_found=0.1")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--type-slowly", action="store_true")
+    parser.add_argument("--skip-pauses", action="store_true", help="No esperar las pausas de ActionChains")
+    parser.add_argument("--json", help="Guarda los resultados en este fichero")
+    args = parser.parse_args()
+
+    latency = args.latency[0] if len(args.latency) == 1 else tuple(args.latency[:2])
+    results = run(
+        backends=args.backends, profiles=args.profiles, operations=args.operations, iterations=args.iterations,
+        warmup=args.warmup, latency=latency, faults=parse_faults(args.faults), seed=args.seed, type_slowly=args.type_slowly,
+        honor_pauses=not args.skip_pauses,
+    )
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import re
+
+
+def _extensions(*extensions):
+    """
+    Patrones que solo casan con la extensión al final de la ruta (con o sin query):
+    "*://*/*.svg" y "*://*/*.svg?*". Nunca con el host (www.svgrepo.com, www.movistar.es).
+    """
+    return [pattern for ext in extensions for pattern in (f"*://*/*.{ext}", f"*://*/*.{ext}?*")]
+
+
+def _hosts(*domains):
+    """
+    Patrones anclados al host: "*://clarity.ms/*" y "*://*.clarity.ms/*". El host va
+    entre "://" (o un punto) y la primera "/", así que no casan con el dominio cuando
+    aparece en la query de otro sitio (?ref=clarity.ms) ni con clarity.msn.com.
+    """
+    return [pattern for domain in domains for pattern in (f"*://{domain}/*", f"*://*.{domain}/*")]
+
+
+# Patrones por tipo de recurso para Network.setBlockedURLs (el comodín es *).
+# El orden importa al clasificar: un píxel .gif de un tracker cuenta como tracker.
+TYPE_PATTERNS = {
+    "tracker": _hosts(
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+        "connect.facebook.net", "hotjar.com", "clarity.ms", "segment.io", "scorecardresearch.com",
+        "criteo.com", "taboola.com", "outbrain.com",
+    ) + ["*://adservice.google.*/*", "*://analytics.tiktok.com/i18n/pixel/*"],
+    "image": _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": _extensions("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extensions("mp4", "webm", "m3u8", "mp3", "ogg", "wav", "m4a", "mov"),
+    "stylesheet": _extensions("css"),
+}
+
+DEFAULT_TYPES = ("tracker", "image", "font", "media")
+
+# Tamaño medio aproximado por petición (bytes), para estimar el ahorro. Es una cifra
+# fija por tipo, no medida: una petición bloqueada nunca llega a descargarse.
+AVERAGE_BYTES = {
+    "tracker": 30_000,
+    "image": 45_000,
+    "font": 35_000,
+    "media": 600_000,
+    "stylesheet": 20_000,
+    "pattern": 25_000,
+}
+
+# En selenium no hay eventos de red: tras cada navegación se buscan en el DOM las URLs
+# de recursos referenciadas que no aparecen en Resource Timing (no se descargaron).
+_SCAN_JS = r"""
+    var urls = [];
+    document.querySelectorAll('img, source, video, audio, script[src], iframe[src], link[href]').forEach(function (el) {
+        var url = el.currentSrc || el.src || el.href;
+        if (url && url.indexOf('http') === 0) urls.push(url);
+    });
+    var loaded = performance.getEntriesByType('resource').map(function (e) { return e.name; });
+    return [urls, loaded];
+"""
+
+
+def _to_regex(pattern):
+    return re.compile(".*".join(re.escape(part) for part in pattern.lower().split("*")) + "$")
+
+
+def normalize(block):
+    """
+    Normaliza la opción browser_options["block"].
+
+    Formatos aceptados:
+        - True: bloquea los tipos por defecto (tracker, image, font, media)
+        - ["image", "font", "*://ads.example.com/*"]: tipos de recurso y patrones de URL mezclados
+        - {"types": [...], "patterns": [...]}: forma explícita
+
+    Returns:
+        dict: {"types", "patterns", "urls"} o None si no hay nada que bloquear
+    """
+    if not block:
+        return None
+    if block is True:
+        types, patterns = list(DEFAULT_TYPES), []
+    elif isinstance(block, dict):
+        types, patterns = list(block.get("types", [])), list(block.get("patterns", []))
+        unknown = [t for t in types if t not in TYPE_PATTERNS]
+        if unknown:
+            raise Exception(f"Unknown resource types {unknown}. Use some of {tuple(TYPE_PATTERNS)}")
+    else:
+        types = [item for item in block if item in TYPE_PATTERNS]
+        patterns = [item for item in block if item not in TYPE_PATTERNS]
+
+    urls = [p for t in types for p in TYPE_PATTERNS[t]] + patterns
+    if not urls:
+        return None
+    return {"types": types, "patterns": patterns, "urls": urls}
+
+
+class ResourceBlocker:
+    def __init__(self, custom_driver, rules):
+        """
+        Bloquea recursos de la sesión con Network.setBlockedURLs y lleva la cuenta de
+        las peticiones bloqueadas. Los bytes ahorrados son una estimación: peticiones
+        bloqueadas por tipo multiplicadas por AVERAGE_BYTES, no un tamaño medido.
+
+        En sb_cdp las peticiones bloqueadas se cuentan con los eventos Network de CDP
+        (se procesan mientras el loop del driver está corriendo); en selenium se estiman
+        tras cada navegación a partir de las URLs referenciadas en el DOM.
+
+        Args:
+            custom_driver: Instancia de CustomDriver
+            rules: Reglas normalizadas (ver normalize)
+        """
+        self.custom_driver = custom_driver
+        self.rules = rules
+        self.blocked = {}
+        self._matchers = [(t, [_to_regex(p) for p in TYPE_PATTERNS[t]]) for t in TYPE_PATTERNS if t in rules["types"]]
+        self._matchers.append(("pattern", [_to_regex(p) for p in rules["patterns"]]))
+        self._requests = {}
+        self.apply()
+        if custom_driver.cdp:
+            import mycdp
+
+            custom_driver.driver.add_handler(mycdp.network.RequestWillBeSent, self._on_request)
+            custom_driver.driver.add_handler(mycdp.network.LoadingFinished, self._on_finished)
+            custom_driver.driver.add_handler(mycdp.network.LoadingFailed, self._on_failed)
+
+    def apply(self):
+        """
+        Instala las reglas en la pestaña actual (hay que repetirlo al cambiar de pestaña).
+        """
+        self.custom_driver._execute_cdp("Network.enable", {})
+        self.custom_driver._execute_cdp("Network.setBlockedURLs", {"urls": self.rules["urls"]})
+
+    def classify(self, url):
+        """Tipo de la regla que bloquea `url`, o None si no se bloquea."""
+        url = url.lower()
+        for kind, regexes in self._matchers:
+            if any(regex.match(url) for regex in regexes):
+                return kind
+        return None
+
+    def record(self, url):
+        kind = self.classify(url)
+        if kind is not None:
+            self.blocked[kind] = self.blocked.get(kind, 0) + 1
+
+    def collect(self):
+        """
+        Cuenta los recursos bloqueados de la página actual (solo selenium).
+        """
+        if self.custom_driver.cdp:
+            return
+        try:
+            urls, loaded = self.custom_driver._execute_js(_SCAN_JS)
+        except Exception as e:
+            print(f"⚠️ Could not scan blocked resources: {e}")
+            return
+        loaded = set(loaded)
+        for url in set(urls) - loaded:
+            self.record(url)
+
+    def _on_request(self, event):
+        self._requests[event.request_id] = event.request.url
+
+    def _on_finished(self, event):
+        self._requests.pop(event.request_id, None)
+
+    def _on_failed(self, event):
+        url = self._requests.pop(event.request_id, None)
+        if url is not None and event.blocked_reason is not None:
+            self.record(url)
+
+    def stats(self):
+        """
+        Returns:
+            dict: requests (peticiones bloqueadas), bytes_saved_estimate (estimación con
+                el tamaño medio por tipo de AVERAGE_BYTES, no medida) y by_type
+        """
+        return {
+            "requests": sum(self.blocked.values()),
+            "bytes_saved_estimate": sum(AVERAGE_BYTES[kind] * count for kind, count in self.blocked.items()),
+            "by_type": dict(self.blocked),
+        }
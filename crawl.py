@@ -0,0 +1,378 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Marca el último elemento de la lista con un atributo propio (distinto en cada paso,
+# para que la caché de elementos no devuelva el anterior) y devuelve cuántos hay.
+_MARK_LAST_JS = r"""
+    var els = document.querySelectorAll(arguments[0]);
+    if (!els.length) return 0;
+    els[els.length - 1].setAttribute('data-customdriver-crawl', String(els.length));
+    return els.length;
+"""
+
+_COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+FORMATS = ("jsonl", "csv")
+
+
+class NextButton:
+    def __init__(self, selector, timeout=10, wait_for=None, same_url=False):
+        """
+        Paginación por botón "Siguiente": se hace click hasta que el botón deja de
+        estar disponible o la URL deja de cambiar. El cursor es {"url", "page"}; al
+        reanudar se vuelve a la URL guardada, así que en SPAs que no cambian de URL se
+        reanuda desde la primera página y la deduplicación descarta lo ya escrito.
+
+        Args:
+            selector: Selector CSS o XPath del botón
+            timeout: Espera máxima a que el botón sea clickable (default: 10)
+            wait_for: Selector que debe estar visible tras el click (ej: los resultados)
+            same_url: True para SPAs que paginan sin cambiar la URL; si es False
+                (default), un click que no cambia la URL termina el crawl
+        """
+        self.selector = selector
+        self.timeout = timeout
+        self.wait_for = wait_for
+        self.same_url = same_url
+
+    def first(self, custom_driver, start_url, cursor=None):
+        url = cursor["url"] if cursor else start_url
+        custom_driver.get(url)
+        return {"url": custom_driver.get_current_url(), "page": cursor["page"] if cursor else 1}
+
+    def next(self, custom_driver, cursor, count):
+        try:
+            custom_driver.wait_for(self.selector, "clickable", timeout=self.timeout)
+        except Exception:
+            return None
+        custom_driver.click(self.selector)
+        if self.wait_for:
+            custom_driver.wait_for(self.wait_for, "visible", timeout=self.timeout)
+        url = custom_driver.get_current_url()
+        if url == cursor["url"] and not self.same_url:
+            return None
+        return {"url": url, "page": cursor["page"] + 1}
+
+
+class UrlTemplate:
+    def __init__(self, template, start=1, step=1, stop=None):
+        """
+        Paginación por URL: template.format(page=n) para n = start, start + step, ...
+        Termina en `stop` (incluido), en la primera página sin registros o, si el sitio
+        limita el número de página, cuando crawl() deja de encontrar registros nuevos.
+
+        Args:
+            template: URL con {page}, ej: "https://example.com/list?page={page}"
+            start: Primera página (default: 1)
+            step: Incremento entre páginas (default: 1; ej: 20 para offsets)
+            stop: Última página (default: hasta una página vacía)
+        """
+        if "{page}" not in template:
+            raise Exception(f"URL template {template} has no {{page}} placeholder")
+        self.template = template
+        self.start = start
+        self.step = step
+        self.stop = stop
+
+    def first(self, custom_driver, start_url, cursor=None):
+        if cursor is not None:
+            # Reanudar no necesita cargar la página ya procesada: next() va directo a la siguiente
+            return cursor
+        custom_driver.get(start_url or self.template.format(page=self.start))
+        return self.start
+
+    def next(self, custom_driver, cursor, count):
+        page = cursor + self.step
+        if count == 0 or (self.stop is not None and page > self.stop):
+            return None
+        custom_driver.get(self.template.format(page=page))
+        return page
+
+
+class InfiniteScroll:
+    cumulative = True
+
+    def __init__(self, item_selector, timeout=10, poll_interval=0.25):
+        """
+        Paginación por scroll infinito: se hace scroll_to_element hasta el último
+        elemento de la lista y se espera a que carguen más. El cursor es el número de
+        elementos cargados. Cada paso solo procesa los registros nuevos; al reanudar
+        se vuelve a cargar la página desde el principio y la deduplicación descarta lo
+        ya escrito (conviene indicar `key`).
+
+        Args:
+            item_selector: Selector CSS de cada elemento de la lista
+            timeout: Segundos sin elementos nuevos tras los que se da por terminada
+            poll_interval: Intervalo entre comprobaciones del número de elementos
+        """
+        self.item_selector = item_selector
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def first(self, custom_driver, start_url, cursor=None):
+        custom_driver.get(start_url)
+        return custom_driver._execute_js(_COUNT_JS, self.item_selector) or 0
+
+    def next(self, custom_driver, cursor, count):
+        loaded = custom_driver._execute_js(_MARK_LAST_JS, self.item_selector) or 0
+        if not loaded:
+            return None
+        custom_driver.scroll_to_element(f'[data-customdriver-crawl="{loaded}"]')
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            current = custom_driver._execute_js(_COUNT_JS, self.item_selector) or 0
+            if current > loaded:
+                return current
+            time.sleep(self.poll_interval)
+        return None
+
+
+class _Sink:
+    def __init__(self, path, fields=None, flush_every=100, flush_interval=5.0):
+        """
+        Fichero de salida en modo append, JSONL o CSV según la extensión. Vuelca el
+        buffer cada `flush_every` registros o `flush_interval` segundos.
+        """
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.path = path
+        self.fields = fields
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._writer = None
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+
+    def offset(self):
+        return self._file.tell()
+
+    def write(self, record):
+        if self.format == "jsonl":
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        else:
+            if self._writer is None:
+                self.fields = self.fields or list(record)
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction="ignore")
+                if self._file.tell() == 0:
+                    self._writer.writeheader()
+            self._writer.writerow(record)
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self, sync=False):
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush(sync=True)
+            self._file.close()
+
+
+class _CrawlState:
+    def __init__(self, path):
+        """Claves ya vistas y cursor del último checkpoint, en SQLite."""
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def get(self, name, default=None):
+        row = self.conn.execute("SELECT value FROM state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def add(self, key):
+        """Registra una clave; False si ya se había visto. Se confirma en checkpoint()."""
+        return self.conn.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,)).rowcount == 1
+
+    def checkpoint(self, **values):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)",
+            [(name, json.dumps(value)) for name, value in values.items()],
+        )
+        self.conn.commit()
+
+    def reset(self):
+        self.conn.execute("DELETE FROM seen")
+        self.conn.execute("DELETE FROM state")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _extract(custom_driver, extractor):
+    if callable(extractor):
+        return extractor(custom_driver) or []
+    if isinstance(extractor, dict) and "root" in extractor:
+        return custom_driver.extract(extractor["root"], extractor["fields"], extractor.get("limit"))
+    raise Exception(f"Invalid extractor {extractor}. Use a callable or a dict with root and fields")
+
+
+def _signature(rows):
+    """Huella de los registros de una página, para detectar paginaciones que no avanzan."""
+    return hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _key(record, key):
+    value = key(record) if callable(key) else record.get(key)
+    return json.dumps(value, ensure_ascii=False, default=str) if not isinstance(value, str) else value
+
+
+def crawl(custom_driver, start_url, extractor, paginate=None, key=None, output=None, state_path=None,
+          resume=True, max_pages=None, fields=None, flush_every=100, flush_interval=5.0):
+    """
+    Recorre un listado paginado y devuelve sus registros a medida que se extraen.
+
+    Es un generador: cada página se extrae, se deduplica y se escribe antes de pasar
+    a la siguiente, sin acumular registros en memoria. Las claves ya vistas viven en
+    SQLite, así que la memoria no crece con el tamaño del crawl.
+
+    Tras cada página se hace un checkpoint: se sincroniza el fichero de salida y se
+    guardan en una sola transacción las claves nuevas, el cursor y el tamaño del
+    fichero. Al reanudar, el fichero se trunca a ese tamaño (se descarta lo escrito
+    de una página a medias) y se continúa desde la página siguiente al cursor.
+
+    El crawl termina cuando la paginación no tiene siguiente página, cuando el cursor
+    no cambia, cuando una página devuelve los mismos registros que la anterior o
+    cuando, tras haber escrito registros en esta ejecución, una página no aporta
+    ninguno nuevo.
+
+    Args:
+        custom_driver: Instancia de CustomDriver
+        start_url: URL de la primera página (en UrlTemplate puede ser None)
+        extractor: Callable (custom_driver) -> lista de dicts, o
+            {"root": selector, "fields": {...}, "limit": n} para usar extract()
+        paginate: NextButton, UrlTemplate o InfiniteScroll (default: solo start_url)
+        key: Campo o callable (registro) -> clave para deduplicar (default: sin deduplicar)
+        output: Fichero .jsonl o .csv donde se añaden los registros (default: ninguno)
+        state_path: SQLite con claves y cursor (default: output + ".state"; sin output,
+            en memoria y sin reanudación)
+        resume: Si True, continúa desde el último checkpoint; si False, vacía la salida
+            y el estado y empieza de cero
+        max_pages: Máximo de páginas a procesar en esta ejecución
+        fields: Columnas del CSV (default: las claves del primer registro)
+        flush_every: Volcar la salida cada N registros (default: 100)
+        flush_interval: Volcar la salida cada N segundos (default: 5)
+
+    Yields:
+        dict: Cada registro nuevo (no visto antes)
+
+    Raises:
+        Exception: Si falla la navegación o la extracción; lo escrito hasta el último
+            checkpoint se conserva para reanudar
+
+    Example:
+        pages = UrlTemplate("https://example.com/list?page={page}")
+        for product in crawl(driver, None, {"root": ".product", "fields": {"title": "h2"}},
+                             paginate=pages, key="title", output="products.jsonl"):
+            print(product["title"])
+    """
+    if output is not None and not output.lower().endswith((".jsonl", ".csv")):
+        raise Exception(f"Unsupported output {output}. Use one of {FORMATS}")
+    state_path = state_path or (output + ".state" if output else ":memory:")
+    state = _CrawlState(state_path)
+    sink = None
+    try:
+        if not resume:
+            state.reset()
+            if output and os.path.exists(output):
+                open(output, "w").close()
+        if state.get("done"):
+            print(f"✅ Crawl already complete ({state.get('records', 0)} records in {output}). Use resume=False to start over")
+            return
+
+        saved_cursor = state.get("cursor")
+        pages = state.get("pages", 0)
+        records = state.get("records", 0)
+        if output:
+            offset = state.get("offset", 0)
+            if os.path.exists(output) and os.path.getsize(output) > offset:
+                # Registros de una página que no llegó al checkpoint: se vuelven a extraer
+                os.truncate(output, offset)
+            sink = _Sink(output, fields=fields, flush_every=flush_every, flush_interval=flush_interval)
+
+        if saved_cursor is not None and paginate is not None:
+            print(f"🔗 Resuming crawl after page {pages}")
+            cursor = paginate.first(custom_driver, start_url, saved_cursor)
+            cursor = paginate.next(custom_driver, cursor, None)
+        elif paginate is not None:
+            cursor = paginate.first(custom_driver, start_url)
+        else:
+            custom_driver.get(start_url)
+            cursor = start_url
+
+        processed = 0
+        previous = 0
+        new_in_run = 0
+        previous_signature = None
+        cumulative = getattr(paginate, "cumulative", False)
+        while cursor is not None:
+            rows = _extract(custom_driver, extractor)
+            count = len(rows)
+            if cumulative:
+                # El scroll infinito devuelve toda la lista: solo interesa lo cargado en este paso
+                rows, previous = rows[previous:], count
+            signature = _signature(rows)
+            if signature == previous_signature and rows:
+                # Enlaces que recargan la misma página o números de página fuera de rango
+                # que el sitio redirige a la última: la página no se vuelve a escribir
+                print(f"⚠️ Stopping crawl after page {pages}: page {pages + 1} repeats its records")
+                cursor = None
+                break
+            new = 0
+            for record in rows:
+                if key is not None and not state.add(_key(record, key)):
+                    continue
+                if sink is not None:
+                    sink.write(record)
+                records += 1
+                new += 1
+                yield record
+            new_in_run += new
+
+            pages += 1
+            processed += 1
+            if sink is not None:
+                sink.flush(sync=True)
+            state.checkpoint(cursor=cursor, pages=pages, records=records, offset=sink.offset() if sink else 0)
+            if paginate is None or (max_pages is not None and processed >= max_pages):
+                break
+
+            # Paginaciones que no avanzan (botón "Siguiente" deshabilitado solo por CSS,
+            # páginas que solo repiten registros ya vistos). Al reanudar se toleran
+            # páginas sin registros nuevos hasta volver a encontrar alguno.
+            reason = None
+            if new == 0 and new_in_run > 0:
+                reason = "no new records"
+            else:
+                next_cursor = paginate.next(custom_driver, cursor, count)
+                if next_cursor is not None and next_cursor == cursor:
+                    reason = "the pagination cursor did not change"
+            if reason is not None:
+                print(f"⚠️ Stopping crawl after page {pages}: {reason}")
+                cursor = None
+                break
+            previous_signature = signature
+            cursor = next_cursor
+        if cursor is None or paginate is None:
+            state.checkpoint(done=True)
+            print(f"✅ Crawl finished: {pages} pages, {records} records")
+        else:
+            print(f"⏸️ Crawl stopped after {pages} pages ({records} records), resume to continue")
+    finally:
+        if sink is not None:
+            sink.close()
+        state.close()
@@ -1,20 +1,35 @@
 from typing import Protocol
-from seleniumbase import sb_cdp
-from drivers.undetectable import Undetectable
-from drivers.incogniton_driver import IncognitonDriver
+from pacing import Pacer
+from retry import RetryPolicy
+from memory_watchdog import MemoryWatchdog
+from artifacts import ArtifactCollector
+from metrics import DriverMetrics, instrumented, note_sleep
+import readiness
+import wait_engine
+import extraction
+import forms
+import typing_engine
+import blocking
+import session_state
+import backends
+import sessions
+import element_cache
+from element_cache import ElementCache
 from selenium.webdriver.common.by import By
 import time
-import random
+import json
+import os
+import tempfile
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions.pointer_input import PointerInput
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-import asyncio
+from selenium.common.exceptions import StaleElementReferenceException
 
 class CustomDriver:
-    def __init__(self, proxy=None, browser_options={"type": "seleniumbase", "mobile_emulation": False}, type_speed=0.0, wait_speed=0.0, typeSlowly=False):
+    def __init__(self, proxy=None, browser_options={"type": "seleniumbase", "mobile_emulation": False}, type_speed=0.0, wait_speed=0.0, typeSlowly=False, pacing="human", metrics=None, wait_until=None, wait_engine="observer", typing_options=None, cache_elements=True, retry_policy=None, memory_watchdog=None, artifacts=None):
         """
         Inicializa el CustomDriver con las opciones de navegador especificadas.
         
@@ -23,36 +38,308 @@ class CustomDriver:
             proxy: Dirección del proxy en formato IP:Puerto (ej: "192.168.1.1:1080")
             url: URL inicial a cargar (default: "about:blank")
             browser_options: Diccionario con configuración del navegador:
-                - type: Tipo de navegador ("seleniumbase", "undetectable", "incogniton")
+                - type: Tipo de navegador ("seleniumbase", "undetectable", "incogniton" o un
+                  backend registrado con backends.register)
                 - mobile_emulation: Si se debe usar emulación móvil (bool)
+                - profile: Selección no interactiva del perfil de Undetectable/Incogniton:
+                  ID, lista de IDs o {"policy": "id"|"first_available"|"lru"|"match", ...}
+                - driver: WebDriver ya iniciado a envolver en lugar de lanzar uno nuevo
+                - attach: Nombre de una sesión dejada abierta con detach() (o True para
+                  "tipo:perfil"); si sigue viva se reutiliza sin lanzar el perfil
+                - sessions_file: Registro de sesiones (default: ~/.customdriver/sessions.json)
+                - chrome_driver_path: chromedriver para conectarse a una sesión registrada
             type_speed: Velocidad base entre teclas al escribir (en segundos)
             wait_speed: Tiempo de espera adicional entre acciones (en segundos)
             typeSlowly: Si True, escribe carácter por carácter; si False, escribe instantáneamente
+            pacing: Política de delays humanizados: "human", "brisk", "none" (sin delays),
+                un diccionario {"profile", "overrides", "budget"} o un Pacer (ver pacing.py)
+            metrics: Instrumentación opcional de latencia: True para crear un DriverMetrics
+                propio o una instancia de DriverMetrics (compartible entre sesiones)
+            wait_until: Estrategia de readiness por defecto para get() y change_to_new_tab().
+                None mantiene el delay fijo después de navegar (ver readiness.py)
+            wait_engine: "observer" (MutationObserver en la página, un solo script por espera)
+                o "poll" (WebDriverWait, una petición cada 500 ms)
+            typing_options: Opciones del motor de escritura humanizada (ver typing_engine.py):
+                engine ("actions" o "send_keys"), typo_rate, burst_rate, burst_length, burst_factor
+            cache_elements: Si True, cachea los elementos resueltos de la página actual
+                (solo backends selenium; se invalida al navegar y con elementos stale)
+            retry_policy: RetryPolicy (o dict con sus argumentos) para click, type, select y
+                las esperas (default: RetryPolicy())
+            memory_watchdog: MemoryWatchdog (o dict con sus argumentos) que recicla la sesión
+                cuando el navegador pasa un umbral de memoria o de páginas (default: desactivado)
+            artifacts: Carpeta, dict de argumentos o ArtifactCollector para guardar captura,
+                DOM y red cuando falla un método (o cada N llamadas) (default: desactivado)
             mobileEmulation: Si se debe usar emulación táctil para clics (bool)
         """
         self.type_speed = type_speed
         self.wait_speed = wait_speed
         self.typeSlowly = typeSlowly
+        self.pacer = Pacer.from_option(pacing, wait_speed=wait_speed, type_speed=type_speed)
+        self.metrics = DriverMetrics() if metrics is True else (metrics or None)
+        self.wait_until = readiness.normalize(wait_until)
+        self._network_idle_tracker = None
+        self.wait_engine = wait_engine
+        self.typing_options = {**typing_engine.DEFAULT_OPTIONS, **(typing_options or {})}
+        if self.typing_options["engine"] not in typing_engine.ENGINES:
+            raise Exception(f"Unknown typing engine {self.typing_options['engine']}. Use one of {typing_engine.ENGINES}")
+        self.element_cache = ElementCache() if cache_elements else None
+        self.retry_policy = RetryPolicy.from_option(retry_policy)
         self.mobileEmulation = browser_options.get("mobile_emulation", False)
+        self.watchdog = MemoryWatchdog.from_option(memory_watchdog)
+        self.artifacts = ArtifactCollector.from_option(artifacts)
         self.cdp = False
+        self.blocker = None
+        # TabGroups abiertos sobre esta sesión (ver tabs.py)
+        self._tab_groups = 0
 
-        match browser_options.get("type", "seleniumbase"):
-            case "incogniton":
-                instance = IncognitonDriver()
-                self.driver = asyncio.run(instance.list_and_select_profile())
-            case "undetectable":
-                instance = Undetectable()
-                self.driver = instance.start_driver()
-            case "seleniumbase":
-                self.driver = sb_cdp.Chrome(browser="brave", proxy="socks5h://" + proxy if proxy else None)
-                self.mobileEmulation = False
-                self.cdp = True
+        # El backend se importa aquí, al usarse por primera vez (ver backends.py)
+        backend = backends.get(browser_options.get("type", "seleniumbase"))
+        self._sessions = sessions.SessionRegistry(browser_options.get("sessions_file", sessions.DEFAULT_SESSIONS_FILE))
+        self._session_name = browser_options.get("attach")
+        if self._session_name is True:
+            self._session_name = sessions.default_name(browser_options)
+        attached = self._attach(backend, browser_options) if self._session_name else None
+        if browser_options.get("driver") is not None:
+            self.driver = browser_options["driver"]
+        elif attached is not None:
+            self.driver = attached
+        else:
+            self.driver = backend.start(proxy=proxy, browser_options=browser_options)
+        # Para poder relanzar la sesión por el mismo backend (ver recycle)
+        self._backend = backend
+        self._proxy = proxy
+        self._browser_options = {key: value for key, value in browser_options.items() if key != "driver"}
+        self.cdp = backend.cdp
+        if not backend.mobile_emulation:
+            self.mobileEmulation = False
+        self._setup_blocking(browser_options.get("block"))
+
+    def _setup_blocking(self, block):
+        rules = blocking.normalize(block)
+        if rules is not None:
+            self.blocker = blocking.ResourceBlocker(self, rules)
+
+    @classmethod
+    def start_fleet(cls, count, browser_options={"type": "undetectable", "profile": {"policy": "first_available"}}, type_speed=0.0, wait_speed=0.0, typeSlowly=False, pacing="human"):
+        """
+        Inicia `count` perfiles de Undetectable o Incogniton en paralelo, sin interacción.
+
+        Args:
+            count: Número de sesiones a iniciar
+            browser_options: Igual que en el constructor; `profile` indica la política de selección
+            type_speed, wait_speed, typeSlowly, pacing: Igual que en el constructor
+
+        Returns:
+            list: Lista de CustomDriver listos para usar
+        """
+        drivers = backends.get(browser_options.get("type")).start_many(count, browser_options)
+
+        return [
+            cls(browser_options={**browser_options, "driver": driver}, type_speed=type_speed, wait_speed=wait_speed, typeSlowly=typeSlowly, pacing=pacing)
+            for driver in drivers
+        ]
+
+    def _attach(self, backend, browser_options):
+        """Driver conectado a la sesión registrada con el nombre de `attach`, o None."""
+        entry = self._sessions.get(self._session_name)
+        if entry is None or backend.cdp:
+            return None
+        if entry.get("type") != browser_options.get("type", "seleniumbase"):
+            print(f"⚠️ Session {self._session_name} belongs to browser type {entry.get('type')}, launching a new one")
+            return None
+        driver = sessions.attach(entry, chrome_driver_path=browser_options.get("chrome_driver_path"))
+        if driver is None:
+            # El navegador ya no existe: se olvida la sesión y se lanza uno nuevo
+            self._sessions.remove(self._session_name, entry)
+            return None
+        print(f"🔗 Attached to running session {self._session_name}")
+        return driver
+
+    def detach(self, name=None):
+        """
+        Suelta el driver dejando el navegador abierto y lo registra para que otro
+        proceso se conecte con browser_options["attach"] = name, sin lanzar el perfil.
+
+        Solo deja el navegador vivo si el driver no es su dueño: perfiles de
+        Undetectable (conectados por puerto de depuración), sesiones Remote de
+        Incogniton o sesiones a las que ya se conectó con attach.
+
+        Args:
+            name: Nombre de la sesión (default: el de browser_options["attach"] o "tipo:perfil")
+
+        Returns:
+            dict: Entrada registrada
+
+        Example:
+            driver = CustomDriver(browser_options={"type": "undetectable", "profile": "a1b2", "attach": "ventas"})
+            ...
+            driver.detach()  # el siguiente proceso reutiliza "ventas" en menos de un segundo
+        """
+        if self.cdp:
+            raise Exception("Detach is not supported for CDP backends")
+        name = name or self._session_name or sessions.default_name(self._browser_options)
+        entry = {**sessions.describe(self.driver), "type": self._browser_options.get("type", "seleniumbase")}
+        self._sessions.put(name, entry)
+        sessions.release(self.driver)
+        self._session_name = name
+        print(f"✅ Session {name} detached, browser left running")
+        return entry
 
     def quit(self):
         """
         Cierra el navegador y finaliza la sesión del driver.
         """
-        self.driver.quit()
+        if self._session_name:
+            # El navegador deja de existir: que nadie intente volver a conectarse
+            try:
+                self._sessions.remove(self._session_name, sessions.describe(self.driver))
+            except Exception:
+                pass
+        try:
+            self.driver.quit()
+        finally:
+            if self.artifacts is not None:
+                # Que las capturas de los últimos fallos lleguen a disco
+                self.artifacts.close()
+
+    def cache_stats(self):
+        """
+        Estadísticas de la caché de elementos.
+
+        Returns:
+            dict: hits, misses, invalidations, size y hit_rate, o None si la caché está desactivada
+        """
+        return self.element_cache.stats() if self.element_cache is not None else None
+
+    def blocking_stats(self):
+        """
+        Recursos bloqueados por browser_options["block"] en esta sesión.
+
+        Returns:
+            dict: requests, bytes_saved_estimate y by_type, o None si no hay bloqueo
+        """
+        return self.blocker.stats() if self.blocker is not None else None
+
+    def artifact_stats(self):
+        """
+        Estadísticas de la captura de artefactos.
+
+        Returns:
+            dict: calls, captured, written, dropped, errors y queued, o None si está desactivada
+        """
+        return self.artifacts.stats() if self.artifacts is not None else None
+
+    def capture_artifacts(self, label="manual"):
+        """
+        Captura ahora pantalla, DOM y red de la página actual (en segundo plano).
+
+        Returns:
+            bool: False si la captura está desactivada, falló o se descartó
+        """
+        if self.artifacts is None:
+            return False
+        return self.artifacts.capture(self, label)
+
+    def memory_stats(self):
+        """
+        Estado del watchdog de memoria.
+
+        Returns:
+            dict: pages, recycles por motivo y last_sample, o None si no hay watchdog
+        """
+        return self.watchdog.stats() if self.watchdog is not None else None
+
+    @instrumented("recycle")
+    def recycle(self, restore=True, reason="manual"):
+        """
+        Cierra el navegador y lanza uno nuevo por el mismo backend, volviendo a la
+        URL actual. Libera la memoria acumulada en sesiones largas; normalmente lo
+        llama el watchdog de memoria (ver memory_watchdog.py).
+
+        Args:
+            restore: Si True, guarda cookies y storage antes de cerrar y los restaura
+                en la sesión nueva (ver session_state); si False solo vuelve a la URL
+            reason: Motivo, para las métricas (default: "manual")
+
+        Raises:
+            Exception: Si hay un TabGroup abierto sobre la sesión (sus pestañas usan el navegador)
+        """
+        if self._tab_groups:
+            raise Exception("Cannot recycle the session while a TabGroup has tabs open; close it first")
+        url = None
+        state_path = None
+        try:
+            url = self.get_current_url()
+            if restore and url.startswith("http"):
+                fd, state_path = tempfile.mkstemp(prefix="customdriver-state-", suffix=".json.gz")
+                os.close(fd)
+                indexeddb = self.watchdog.indexeddb if self.watchdog is not None else False
+                session_state.save(self, state_path, indexeddb=indexeddb)
+        except Exception as e:
+            print(f"⚠️ Could not save session state before recycling: {e}")
+
+        # El backend cierra también el perfil si el navegador no es del driver (Undetectable, Incogniton)
+        self.driver = self._backend.recycle(self.driver, proxy=self._proxy, browser_options=self._browser_options)
+        self._invalidate_elements()
+        self._network_idle_tracker = None
+        if self.blocker is not None:
+            blocked = self.blocker.blocked
+            self.blocker = blocking.ResourceBlocker(self, self.blocker.rules)
+            self.blocker.blocked = blocked
+        if self.watchdog is not None:
+            self.watchdog.on_recycle(self, reason)
+
+        try:
+            if state_path is not None and session_state.load(self, state_path):
+                return
+            if url is not None and url.startswith("http"):
+                self.get(url)
+        finally:
+            if state_path is not None and os.path.exists(state_path):
+                os.remove(state_path)
+
+    def is_alive(self):
+        """
+        Comprueba que la sesión del navegador sigue respondiendo.
+
+        Returns:
+            bool: True si el driver responde a un comando simple
+        """
+        try:
+            self.get_current_url()
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """
+        Deja la sesión limpia para reutilizarla: cierra las pestañas extra,
+        borra cookies y storage y navega a about:blank.
+        """
+        self._invalidate_elements()
+        if self.cdp:
+            tabs = self.driver.get_tabs()
+            for tab in tabs[1:]:
+                self.driver.switch_to_tab(tab)
+                self.driver.close_active_tab()
+            self.driver.switch_to_tab(tabs[0])
+            self.driver.evaluate("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            self.driver.clear_cookies()
+            self.driver.open("about:blank")
+            return
+
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        try:
+            # delete_all_cookies solo borra las del dominio actual; vía CDP se borran todas
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
 
     def pause(self):
         """
@@ -61,27 +348,101 @@ class CustomDriver:
         """
         input("Paused. Press Enter to continue...")
 
-    def get(self, url):
+    @instrumented("get")
+    def get(self, url, wait_until=None, timeout=30, humanize=None):
         """
         Navega a la URL especificada.
         
         Args:
             url: URL completa a la que navegar (ej: "https://example.com")
+            wait_until: Estrategia de readiness para esta navegación (default: la de la sesión).
+                Ver readiness.normalize: "load", "interactive", "networkidle",
+                {"selector": ...}, {"js": ...} o un callable.
+            timeout: Tiempo máximo esperando la readiness en segundos (default: 30)
+            humanize: Si True, añade el delay humanizado después de la readiness.
+                Por defecto solo se añade cuando no hay estrategia de readiness.
         """
+        if self.watchdog is not None:
+            # Si el navegador pasó algún umbral de memoria se recicla antes de navegar
+            self.watchdog.before_navigation(self)
+        strategy = readiness.normalize(wait_until) if wait_until is not None else self.wait_until
+        if strategy is not None and strategy["kind"] == "networkidle" and self.cdp:
+            # Los handlers de red deben estar registrados antes de navegar
+            self._network_tracker()
+
+        self._invalidate_elements()
         if self.cdp:
             self.driver.open(url)
-            return
-        self.driver.get(url)
-        time.sleep(random.uniform(1.0, 3.0) + self.wait_speed)
+        else:
+            self.driver.get(url)
+        self._after_navigation(strategy, timeout, humanize, "after_get")
+        self._collect_blocked()
 
-    def change_to_new_tab(self):
+    @instrumented("change_to_new_tab")
+    def change_to_new_tab(self, wait_until=None, timeout=30, humanize=None):
         """
         Cambia el foco del driver a la última pestaña abierta.
         Útil cuando se abre un enlace en nueva pestaña y necesitas interactuar con ella.
+
+        Args:
+            wait_until, timeout, humanize: Igual que en get()
         """
         self.driver.switch_to.window(self.driver.window_handles[-1])
-        time.sleep(random.uniform(0.8, 2.0) + self.wait_speed)
+        self._invalidate_elements()
+        if self.blocker is not None:
+            self.blocker.apply()
+        strategy = readiness.normalize(wait_until) if wait_until is not None else self.wait_until
+        self._after_navigation(strategy, timeout, humanize, "after_new_tab")
+
+    def _after_navigation(self, strategy, timeout, humanize, action):
+        if strategy is None:
+            # Comportamiento clásico: delay fijo (salvo en CDP, donde open() ya espera la carga)
+            if humanize is not False and not (self.cdp and action == "after_get"):
+                self.pacer.sleep(action)
+            return
+        readiness.wait_until_ready(self, strategy, timeout=timeout)
+        if humanize:
+            self.pacer.sleep(action)
+
+    def _collect_blocked(self):
+        if self.blocker is not None:
+            self.blocker.collect()
+
+    def _execute_js(self, script, *args):
+        """
+        Ejecuta JavaScript en la página con la semántica de execute_script
+        (`return` y `arguments`) en ambos backends. En CDP los argumentos
+        deben ser serializables a JSON.
+        """
+        if self.cdp:
+            expression = f"(function() {{ {script} }}).apply(null, {json.dumps(list(args))})"
+            return self.driver.evaluate(expression)
+        return self.driver.execute_script(script, *args)
+
+    def _execute_cdp(self, cmd, params=None):
+        """
+        Ejecuta un comando CDP ("Dominio.metodo") en la pestaña actual en ambos backends.
+        En webdriver.Remote (Incogniton) se usa el endpoint goog/cdp/execute de chromedriver.
+        """
+        params = params or {}
+        if self.cdp:
+            def command():
+                # Mismo protocolo que los comandos generados de mycdp: se cede
+                # {"method", "params"} y se recibe el resultado
+                result = yield {"method": cmd, "params": params}
+                return result
+            return self.driver.loop.run_until_complete(self.driver.page.send(command()))
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            return self.driver.execute_cdp_cmd(cmd, params)
+        self.driver.command_executor._commands["executeCdpCommand"] = ("POST", "/session/$sessionId/goog/cdp/execute")
+        return self.driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+    def _network_tracker(self):
+        if self._network_idle_tracker is None:
+            self._network_idle_tracker = readiness.NetworkIdleTracker(self.driver)
+        return self._network_idle_tracker
 
+    @instrumented("type")
     def type(self, element_selector, text, scroll=False, clickOutside=True):
         """
         Escribe texto en un elemento input/textarea.
@@ -97,11 +458,16 @@ class CustomDriver:
             - Si typeSlowly=True: Escribe carácter por carácter con delays
             - Si typeSlowly=False: Escribe todo el texto instantáneamente
         """
+        # Solo se reintenta hasta enfocar el campo: escribir no es idempotente y un
+        # reintento después de enviar teclas duplicaría el texto
+        element = self._with_retry("type", element_selector, lambda timeout: self._focus_for_typing(element_selector, scroll))
         if not self.typeSlowly:
-            self._type_instantly(element_selector, text, scroll, clickOutside)
+            self._type_instantly(element_selector, element, text, clickOutside)
         else:
-            self._type_slowly(element_selector, text, scroll, clickOutside)
+            self._type_slowly(element_selector, element, text, clickOutside)
+        self._check_navigation()
     
+    @instrumented("click")
     def click(self, element_selector, scroll=False, radio=False):
         """
         Hace clic en un elemento.
@@ -115,49 +481,35 @@ class CustomDriver:
             Si mobileEmulation=True, usa eventos táctiles en lugar de clics de mouse.
         """
         if self.mobileEmulation:
-            self._touch_element(element_selector, scroll, radio)
+            self._with_retry("click", element_selector, lambda timeout: self._touch_element(element_selector, scroll, radio))
         else:
             self._clickAndWait(element_selector)
+        self._check_navigation()
 
-    def _clickAndWait(self, element_selector, max_retries=3, retry_delay=4):
+    def _clickAndWait(self, element_selector):
         """
-        Hace clic en un elemento y espera, con reintentos.
+        Hace clic en un elemento y espera, con los reintentos de self.retry_policy.
         
         Args:
-            driver: WebDriver instance
             element_selector: CSS selector del elemento
-            max_retries: Número máximo de intentos (default: 3)
-            retry_delay: Tiempo de espera entre intentos en segundos (default: 4)
         
         Raises:
             Exception: Si todos los intentos fallan
         """
-        if self.cdp:
-            self.driver.click(element_selector)
-            time.sleep(random.uniform(0.4, 1.6) + self.wait_speed)
-            return
+        def attempt(timeout):
+            if self.cdp:
+                self.driver.click(element_selector, timeout=timeout)
+                self.pacer.sleep("after_cdp_click")
+                return
+            self.pacer.sleep("before_click")
+            # Esperar que el elemento sea clickeable
+            button = self.wait_for_clickable_element(element_selector, timeout=timeout)
+            ActionChains(self.driver).move_to_element(button).click().perform()
+            self.pacer.sleep("after_click")
 
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                time.sleep(random.uniform(0.3, 1.4))            
-                # Esperar que el elemento sea clickeable
-                button = self.wait_for_clickable_element(element_selector)
-                ActionChains(self.driver).move_to_element(button).click().perform()
-                time.sleep(random.uniform(0.3, 1.6) + self.wait_speed)
-                return  # Éxito - salir de la función
-                
-            except Exception as e:
-                last_exception = e            
-                if attempt < max_retries - 1:  # Si no es el último intento
-                    time.sleep(retry_delay)
-                else:
-                    print(f"🔥 All {max_retries} attempts failed for {element_selector}")
-        
-        # Si llegamos aquí, todos los intentos fallaron
-        raise Exception(f"Failed to click element {element_selector} after {max_retries} attempts. Last error: {last_exception}")
+        self._with_retry("click", element_selector, attempt)
     
+    @instrumented("wait_for_clickable_element")
     def wait_for_clickable_element(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
         """
         Espera hasta que un elemento sea clickeable (visible y habilitado).
@@ -174,25 +526,25 @@ class CustomDriver:
             Exception: Si el elemento no se vuelve clickeable dentro del timeout
         """
         try:
-            if self.cdp:
-                element = self.driver.find_element(element_selector, timeout=timeout)
-                time.sleep(random.uniform(0.8, 1.6))
-                return element
-            wait = WebDriverWait(self.driver, timeout)
-            return wait.until(EC.element_to_be_clickable((by, element_selector)))
+            return self._wait_element(element_selector, "clickable", timeout, by)
         except Exception as e:
             raise Exception(f"Error waiting for clickable element {element_selector}: {e}")
 
-    def _type_instantly(self, element_selector, text, scroll=False, clickOutside=True):
+    def _focus_for_typing(self, element_selector, scroll=False):
         try:
             element = self._find(element_selector)
             if scroll:
                 self.scroll_to_element(element_selector if not self.cdp else element)
             if not self.cdp and not self.mobileEmulation:
                 ActionChains(self.driver).click(element).perform()
+            return element
+        except Exception as e:
+            raise Exception(f"Error typing {element_selector}: {e}")
 
+    def _type_instantly(self, element_selector, element, text, clickOutside=True):
+        try:
             element.send_keys(text)
-            time.sleep(random.uniform(0.3, 2.0))
+            self.pacer.sleep("after_type")
 
             if clickOutside and not self.cdp and not self.mobileEmulation:
                 body = self.driver.find_element(By.TAG_NAME, "body")
@@ -200,28 +552,22 @@ class CustomDriver:
         except Exception as e:
             raise Exception(f"Error typing {element_selector}: {e}")
         
-    def _type_slowly(self, element_selector, text, scroll=False, clickOutside=True):
+    def _type_slowly(self, element_selector, element, text, clickOutside=True):
         try:
-            element = self._find(element_selector)
-            
-            if (scroll):
-                self.scroll_to_element(element_selector)
-
-            if not self.cdp and not self.mobileEmulation:
-                ActionChains(self.driver).click(element).perform()
-
-            for char in text:
-                element.send_keys(char)
-                # type_speed es ahora un multiplicador de la velocidad base
-                # type_speed = 0 -> velocidad base (0.3-1.0s)
-                # type_speed = 1 -> 2x más lento (0.6-2.0s)
-                # type_speed = 2 -> 3x más lento (0.9-3.0s)
-                base_min = 0.1
-                base_max = 0.5
-                multiplier = 1.0 if self.type_speed == 0.0 else (1.0 + self.type_speed)
-                delay = random.uniform(base_min * multiplier, base_max * multiplier)
-                time.sleep(delay)
-            time.sleep(random.uniform(0.8, 2.0))
+            # Toda la secuencia (delays, erratas y ráfagas) se calcula de antemano. El pacer
+            # escala el delay entre teclas con type_speed: 0 -> base, 1 -> 2x más lento...
+            schedule = typing_engine.build_schedule(text, self.pacer, self.typing_options)
+            if self.typing_options["engine"] == "send_keys":
+                typing_engine.dispatch_send_keys(element, schedule, time.sleep)
+            elif self.cdp:
+                element.focus()
+                typing_engine.dispatch_cdp(self.driver, schedule)
+            else:
+                if self.mobileEmulation:
+                    self.driver.execute_script("arguments[0].focus();", element)
+                typing_engine.dispatch_actions(self.driver, schedule)
+            note_sleep(typing_engine.total_delay(schedule))
+            self.pacer.sleep("after_type_slowly")
 
             if clickOutside and not self.cdp and not self.mobileEmulation:
                 body = self.driver.find_element(By.TAG_NAME, "body")
@@ -235,14 +581,14 @@ class CustomDriver:
                 el = element_selector if type(element_selector) != str else self.driver.find_element(element_selector)
                 if scroll:
                     el.scroll_into_view()
-                    time.sleep(random.uniform(0.5, 1.6))
+                    self.pacer.sleep("after_scroll")
                 
                 if radio:
                     self.driver.click(element_selector) if type(element_selector) == str else None
                     return
                 
                 el.click()
-                time.sleep(random.uniform(0.4, 1.0))
+                self.pacer.sleep("after_touch")
                 return
             else:
                 el = self._find(element_selector)
@@ -265,13 +611,77 @@ class CustomDriver:
             raise Exception(f"Error touching element {element_selector}: {e}")
         
     def _find(self, selector,):
+        if not isinstance(selector, str):
+            # Ya es un elemento resuelto (ej: desde fill_form)
+            return selector
         if self.cdp:
             return self.driver.find_element(selector)
-        if selector.strip().startswith("//"):
-            return self.driver.find_element(By.XPATH, selector)
+        key = element_cache.cache_key(selector)
+        if self.element_cache is not None:
+            element = self.element_cache.get(key)
+            if element is not None:
+                return element
+        element = self.driver.find_element(*key)
+        self._cache_element(selector, key[0], element)
+        return element
+
+    def _cache_element(self, selector, by, element):
+        if self.element_cache is not None and isinstance(selector, str) and not self.cdp:
+            if self.element_cache.url is None:
+                # Primera entrada de la página: se anota su URL (una petición por página)
+                self.element_cache.sync_url(self.driver.current_url)
+            self.element_cache.put(element_cache.cache_key(selector, by), element)
+
+    def _check_navigation(self):
+        """
+        Tras las acciones que pueden navegar sin get() (clicks, Enter en un formulario,
+        rutas de SPAs) descarta la caché de elementos si la URL cambió. Solo cuesta una
+        petición cuando hay elementos cacheados.
+        """
+        if self.element_cache is None or self.cdp or not len(self.element_cache):
+            return
+        try:
+            self.element_cache.sync_url(self.driver.current_url)
+        except Exception:
+            self.element_cache.invalidate()
+
+    def _cached_in_state(self, selector, by, state):
+        """
+        Devuelve el elemento cacheado si sigue en el estado pedido (una sola petición
+        en lugar de una espera completa). Si está stale se descarta de la caché.
+        """
+        if self.element_cache is None or not isinstance(selector, str) or self.cdp:
+            return None
+        key = element_cache.cache_key(selector, by)
+        element = self.element_cache.get(key)
+        if element is None:
+            return None
+        try:
+            if state == "present":
+                element.is_enabled()
+                return element
+            if element.is_displayed() and (state != "clickable" or element.is_enabled()):
+                return element
+        except StaleElementReferenceException:
+            self.element_cache.invalidate(key)
+        return None
+
+    def _invalidate_elements(self, selector=None, by=By.CSS_SELECTOR):
+        if self.element_cache is None:
+            return
+        if selector is None or not isinstance(selector, str):
+            self.element_cache.invalidate()
         else:
-            return self.driver.find_element(By.CSS_SELECTOR, selector)
-        
+            # Misma clave que _cache_element: un selector buscado con By.XPATH se guarda así
+            self.element_cache.invalidate(element_cache.cache_key(selector, by))
+
+    def _with_retry(self, action, selector, fn, retry_on=None, by=By.CSS_SELECTOR):
+        """
+        Ejecuta `fn(timeout)` con self.retry_policy (ver retry.RetryPolicy.run).
+        """
+        return self.retry_policy.run(self, action, fn, selector, retry_on, by=by)
+
+    @instrumented("select_option_by_value")
     def select_option_by_value(self, element_selector, value):
         """
         Selecciona una opción en un elemento <select> dropdown por su valor.
@@ -286,21 +696,87 @@ class CustomDriver:
         """
         try:
             if self.cdp:
-                self.driver.select_option_by_value(element_selector, value)
-                time.sleep(random.uniform(0.3, 1.2))
+                self._with_retry("select", element_selector, lambda timeout: self.driver.select_option_by_value(element_selector, value, timeout=timeout))
+                self.pacer.sleep("after_cdp_select")
                 return
-            element = self._find(element_selector)
-            select = Select(element)
-            select.select_by_value(value)
+            self._with_retry("select", element_selector, lambda timeout: Select(self._find(element_selector)).select_by_value(value))
+            self._check_navigation()
             
             # self.driver.execute_script("""
             #     arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
             #     arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
             # """, element)
-            time.sleep(random.uniform(0.6, 1.8))
+            self.pacer.sleep("after_select")
         except Exception as e:
             print(f"Error selecting option: {e}")
         
+    @instrumented("fill_form")
+    def fill_form(self, fields, scroll=False, clickOutside=True):
+        """
+        Rellena varios campos de un formulario de una vez.
+
+        Con typeSlowly=False todos los campos se resuelven y rellenan en un único
+        script (disparando los eventos input/change). Con typeSlowly=True se mantiene
+        la escritura humanizada campo a campo, pero todos los elementos se resuelven
+        en una sola pasada previa.
+
+        Args:
+            fields: Diccionario {selector: valor}. Para <select> el valor es el atributo
+                value de la opción; para checkbox/radio, un bool.
+            scroll: Si True, hace scroll a cada campo antes de rellenarlo (default: False)
+            clickOutside: Si True, hace clic fuera del formulario al terminar (default: True)
+
+        Raises:
+            Exception: Si algún selector no existe o no se puede rellenar
+
+        Example:
+            driver.fill_form({
+                "#first-name": "John",
+                "#email": "john@example.com",
+                "#country": "US",
+                "#terms": True,
+            })
+        """
+        items = list(fields.items())
+        selectors = [selector for selector, _ in items]
+
+        if not self.typeSlowly:
+            try:
+                result = self._execute_js(forms.FILL_JS, [[selector, value] for selector, value in items], scroll)
+            except Exception as e:
+                raise Exception(f"Error filling form: {e}")
+            if result["missing"] or result["errors"]:
+                raise Exception(f"Error filling form. Missing: {result['missing']}. Errors: {result['errors']}")
+            if scroll:
+                self.pacer.sleep("after_scroll")
+            self.pacer.sleep("after_type")
+        else:
+            try:
+                infos = self._execute_js(forms.DESCRIBE_JS, selectors)
+            except Exception as e:
+                raise Exception(f"Error filling form: {e}")
+            missing = [selector for selector, info in zip(selectors, infos) if info is None]
+            if missing:
+                raise Exception(f"Error filling form. Missing: {missing}")
+
+            for (selector, value), info in zip(items, infos):
+                # En CDP los elementos no vuelven del script: se usa el selector
+                target = selector if self.cdp else info["element"]
+                match info["kind"]:
+                    case "select":
+                        self.select_option_by_value(target, str(value))
+                    case "check":
+                        if bool(value) != info["checked"]:
+                            self.click(selector)
+                    case _:
+                        self.type(target, str(value), scroll=scroll, clickOutside=False)
+
+        if clickOutside and not self.cdp and not self.mobileEmulation:
+            body = self.driver.find_element(By.TAG_NAME, "body")
+            ActionChains(self.driver).move_to_element(body).click().perform()
+        self._check_navigation()
+
+    @instrumented("wait_for_visible_element")
     def wait_for_visible_element(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
         """
         Espera hasta que un elemento sea visible en la página.
@@ -317,15 +793,11 @@ class CustomDriver:
             Exception: Si el elemento no se vuelve visible dentro del timeout
         """
         try:
-            if self.cdp:
-                element = self.driver.find_element(element_selector, timeout=timeout)
-                time.sleep(random.uniform(0.8, 1.6))
-                return element
-            wait = WebDriverWait(self.driver, timeout)
-            return wait.until(EC.visibility_of_element_located((by, element_selector)))
+            return self._wait_element(element_selector, "visible", timeout, by)
         except Exception as e:
             raise Exception(f"Error waiting for element {element_selector}: {e}")
         
+    @instrumented("scroll_to_element")
     def scroll_to_element(self, element):
         """
         Hace scroll suave hasta que un elemento sea visible en el viewport.
@@ -339,18 +811,24 @@ class CustomDriver:
         Raises:
             Exception: Si hay un error al hacer scroll
         """
+        el = element
         try:
             is_selector = True if type(element) == str else False
-            el = self._find(element) if is_selector else element
             if self.cdp:
+                el = self._find(element) if is_selector else element
                 el.scroll_into_view()
             else:
-                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth'})", el)
-            time.sleep(random.uniform(0.5, 1.6))
+                def scroll():
+                    target = self._find(element) if is_selector else element
+                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth'})", target)
+                    return target
+                el = self._with_retry("scroll to", element, lambda timeout: scroll(), retry_on=("stale",))
+            self.pacer.sleep("after_scroll")
             return el
         except Exception as e:
             raise Exception(f"Error scrolling to element {el}: {e}")
         
+    @instrumented("getElement")
     def getElement(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
         """
         Obtiene un elemento del DOM esperando a que esté presente.
@@ -371,14 +849,11 @@ class CustomDriver:
             no garantiza que sea visible o clickeable.
         """
         try:
-            if self.cdp:
-                return self.driver.find_element(element_selector, timeout=timeout)
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.presence_of_element_located((by, element_selector)))
-            return self.driver.find_element(by, element_selector)
+            return self._wait_element(element_selector, "present", timeout, by)
         except Exception:
             raise Exception(f"Error getting element {element_selector}")
         
+    @instrumented("get_current_url")
     def get_current_url(self):
         """
         Obtiene la URL actual del navegador.
@@ -394,6 +869,7 @@ class CustomDriver:
             return self.driver.get_current_url()
         return self.driver.current_url
     
+    @instrumented("wait_for_element_to_disappear")
     def wait_for_element_to_disappear(self, element_selector, timeout=20, by=By.CSS_SELECTOR):
         """
         Espera hasta que un elemento desaparezca del DOM o se vuelva invisible.
@@ -404,24 +880,245 @@ class CustomDriver:
             by: Tipo de selector (By.CSS_SELECTOR, By.XPATH, etc.) (default: By.CSS_SELECTOR)
         """
         try:
-            if self.cdp:
+            # En CDP no hay equivalente de WebDriverWait: siempre se usa el observer
+            if self.cdp or self._use_observer(by):
+                self._observe(element_selector, "hidden", timeout, by)
                 return
             wait = WebDriverWait(self.driver, timeout)
             wait.until(EC.invisibility_of_element_located((by, element_selector)))
         except Exception as e:
             raise Exception(f"Error waiting for element {element_selector} to disappear: {e}")
+
+    @instrumented("wait_for")
+    def wait_for(self, element_selector, state="visible", timeout=20, by=By.CSS_SELECTOR, text=None):
+        """
+        Espera a que un elemento alcance un estado, usando el motor de esperas por observer.
+
+        Args:
+            element_selector: Selector CSS o XPath del elemento
+            state: "present", "visible", "clickable", "detached" (fuera del DOM),
+                "hidden" (fuera del DOM o invisible) o "text" (default: "visible")
+            timeout: Tiempo máximo de espera en segundos (default: 20)
+            by: By.CSS_SELECTOR o By.XPATH (default: By.CSS_SELECTOR)
+            text: Regex que debe cumplir el texto del elemento (solo para state="text")
+
+        Returns:
+            WebElement: El elemento, o None para los estados "detached" y "hidden"
+
+        Example:
+            driver.wait_for(".status", state="text", text="Completed|Done")
+        """
+        try:
+            return self._observe(element_selector, state, timeout, by, text)
+        except Exception as e:
+            raise Exception(f"Error waiting for element {element_selector} to be {state}: {e}")
+
+    @instrumented("wait_for_any")
+    def wait_for_any(self, conditions, timeout=20):
+        """
+        Espera a que se cumpla la primera de varias condiciones, con una única espera
+        en la página en lugar de un getElement (y un timeout) por candidato.
+
+        Args:
+            conditions: Diccionario {nombre: condición}. Cada condición puede ser:
+                - un selector CSS/XPath (se espera a que sea visible)
+                - {"selector": ..., "state": ..., "text": ...} (estados de wait_for)
+                - {"url_contains": "..."} o {"url_matches": "regex"}
+            timeout: Tiempo máximo de espera en segundos (default: 20)
+
+        Returns:
+            tuple: (nombre de la condición cumplida, elemento o None)
+
+        Raises:
+            Exception: Si ninguna condición se cumple dentro del timeout
+
+        Example:
+            outcome, element = driver.wait_for_any({
+                "success": ".alert-success",
+                "error": {"selector": ".alert-danger", "state": "text", "text": "."},
+                "captcha": "iframe[src*='captcha']",
+                "redirect": {"url_contains": "/dashboard"},
+            })
+        """
+        names = list(conditions)
+        try:
+            specs = [wait_engine.from_condition(conditions[name]) for name in names]
+            index, element = wait_engine.wait_any(self, specs, timeout)
+            return names[index], element
+        except Exception as e:
+            raise Exception(f"Error waiting for any of {names}: {e}")
+
+    @instrumented("extract")
+    def extract(self, root_selector, fields, limit=None):
+        """
+        Extrae datos estructurados de todos los elementos que coinciden con `root_selector`
+        en un único script ejecutado en la página.
+
+        Args:
+            root_selector: Selector CSS o XPath de cada fila/registro
+            fields: Diccionario {campo: selector}. Ver extraction.normalize_fields:
+                "h2" (texto), "a@href" (atributo), "@data-id" (atributo de la fila),
+                "." (texto de la fila) o {"selector": ..., "attr": ..., "all": True}
+            limit: Número máximo de filas a devolver (default: todas)
+
+        Returns:
+            list: Lista de diccionarios, lista para serializar a JSON
+
+        Example:
+            products = driver.extract(".product", {
+                "title": "h2",
+                "url": "a@href",
+                "price": ".price",
+                "sku": "@data-sku",
+            })
+        """
+        try:
+            return self._execute_js(extraction.EXTRACT_JS, root_selector, extraction.normalize_fields(fields), limit or 0)
+        except Exception as e:
+            raise Exception(f"Error extracting {root_selector}: {e}")
+
+    @instrumented("extract_table")
+    def extract_table(self, table_selector):
+        """
+        Extrae una tabla HTML como lista de diccionarios usando las cabeceras
+        (<thead> o la primera fila) como claves.
+
+        Args:
+            table_selector: Selector CSS o XPath del elemento <table>
+
+        Returns:
+            list: Una entrada por fila de datos
+        """
+        try:
+            rows = self._execute_js(extraction.EXTRACT_TABLE_JS, table_selector)
+        except Exception as e:
+            raise Exception(f"Error extracting table {table_selector}: {e}")
+        if rows is None:
+            raise Exception(f"Table {table_selector} not found")
+        return rows
+
+    @instrumented("extract_list")
+    def extract_list(self, selector, attr=None):
+        """
+        Devuelve el texto (o el atributo `attr`) de todos los elementos que coinciden.
+
+        Args:
+            selector: Selector CSS o XPath
+            attr: Atributo a leer (default: texto visible)
+
+        Returns:
+            list: Valores en orden de documento
+        """
+        try:
+            return self._execute_js(extraction.EXTRACT_LIST_JS, selector, attr)
+        except Exception as e:
+            raise Exception(f"Error extracting list {selector}: {e}")
+
+    @instrumented("save_state")
+    def save_state(self, path, indexeddb=True):
+        """
+        Guarda cookies, localStorage, sessionStorage e IndexedDB (del origen actual)
+        para saltarse el login en las siguientes sesiones.
+
+        Args:
+            path: Fichero de destino (con extensión .gz se comprime)
+            indexeddb: Si True, incluye IndexedDB (default: True)
+
+        Returns:
+            dict: Resumen de lo guardado
+
+        Example:
+            if not driver.load_state("state.json.gz", max_age=86400, required_cookies=["sessionid"]):
+                login(driver)
+                driver.save_state("state.json.gz")
+        """
+        try:
+            return session_state.save(self, path, indexeddb=indexeddb)
+        except Exception as e:
+            raise Exception(f"Error saving session state to {path}: {e}")
+
+    @instrumented("load_state")
+    def load_state(self, path, max_age=None, required_cookies=None, url=None):
+        """
+        Restaura un estado guardado con save_state y abre la página guardada (o `url`).
+
+        Args:
+            path: Fichero guardado con save_state
+            max_age: Antigüedad máxima del estado en segundos (default: sin límite)
+            required_cookies: Cookies que deben seguir vigentes (ej: ["sessionid"])
+            url: URL a abrir tras restaurar (default: la URL guardada)
+
+        Returns:
+            bool: False si no hay estado válido y hay que hacer el login completo
+        """
+        self._invalidate_elements()
+        return session_state.load(self, path, max_age=max_age, required_cookies=required_cookies, url=url)
+
+    def _wait_element(self, element_selector, state, timeout, by=By.CSS_SELECTOR):
+        """
+        Espera común de wait_for_clickable_element, wait_for_visible_element y getElement.
+        Un timeout no se reintenta (ya se esperó); un elemento stale sí, al instante.
+        """
+        def attempt(_):
+            cached = self._cached_in_state(element_selector, by, state)
+            if cached is not None:
+                return cached
+            if self._use_observer(by):
+                element = self._observe(element_selector, state, timeout, by)
+            elif self.cdp:
+                element = self.driver.find_element(element_selector, timeout=timeout)
+            else:
+                wait = WebDriverWait(self.driver, timeout)
+                element = wait.until(_EXPECTED_CONDITIONS[state]((by, element_selector)))
+            if self.cdp and state != "present":
+                self.pacer.sleep("after_wait")
+            self._cache_element(element_selector, by, element)
+            return element
+
+        return self._with_retry("wait for", element_selector, attempt, retry_on=("stale",), by=by)
+
+    def _use_observer(self, by):
+        return self.wait_engine == "observer" and wait_engine.supports(by)
+
+    def _observe(self, element_selector, state, timeout, by=By.CSS_SELECTOR, text=None):
+        _, element = wait_engine.wait_any(self, [wait_engine.spec(element_selector, state, by, text)], timeout)
+        return element
     
+_EXPECTED_CONDITIONS = {
+    "present": EC.presence_of_element_located,
+    "visible": EC.visibility_of_element_located,
+    "clickable": EC.element_to_be_clickable,
+}
+
+
 class DriverMethods(Protocol):
-    def get(self, url: str) -> None: ...
+    def get(self, url: str, wait_until=None, timeout: int = 30, humanize: bool = None) -> None: ...
     def quit(self) -> None: ...
-    def change_to_new_tab(self) -> None: ...
+    def change_to_new_tab(self, wait_until=None, timeout: int = 30, humanize: bool = None) -> None: ...
     def type(self, element_selector: str, text: str, scroll: bool = False, clickOutside: bool = True) -> None: ...
     def click(self, element_selector: str, scroll: bool = False, radio: bool = False) -> None: ...
     def select_option_by_value(self, element_selector: str, value: str) -> None: ...
+    def fill_form(self, fields: dict, scroll: bool = False, clickOutside: bool = True) -> None: ...
     def wait_for_visible_element(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
     def get_current_url(self) -> str: ...
     def getElement(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
     def scroll_to_element(self, element: any) -> any: ...
     def wait_for_clickable_element(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> any: ...
     def wait_for_element_to_disappear(self, element_selector: str, timeout: int = 20, by=By.CSS_SELECTOR) -> None: ...
+    def wait_for(self, element_selector: str, state: str = "visible", timeout: int = 20, by=By.CSS_SELECTOR, text: str = None) -> any: ...
+    def wait_for_any(self, conditions: dict, timeout: int = 20) -> tuple: ...
+    def extract(self, root_selector: str, fields: dict, limit: int = None) -> list: ...
+    def extract_table(self, table_selector: str) -> list: ...
+    def extract_list(self, selector: str, attr: str = None) -> list: ...
+    def save_state(self, path: str, indexeddb: bool = True) -> dict: ...
+    def load_state(self, path: str, max_age: float = None, required_cookies: list = None, url: str = None) -> bool: ...
+    def is_alive(self) -> bool: ...
+    def recycle(self, restore: bool = True, reason: str = "manual") -> None: ...
+    def detach(self, name: str = None) -> dict: ...
+    def memory_stats(self) -> dict: ...
+    def artifact_stats(self) -> dict: ...
+    def capture_artifacts(self, label: str = "manual") -> bool: ...
+    def cache_stats(self) -> dict: ...
+    def blocking_stats(self) -> dict: ...
+    def reset(self) -> None: ...
     mobileEmulation: bool
\ No newline at end of file
@@ -0,0 +1,724 @@
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.timeouts import Timeouts
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+from backends import Backend
+from collections import Counter
+import artifacts
+import blocking
+import extraction
+import forms
+import readiness
+import recorder
+import session_state
+import wait_engine
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+# Página por defecto para cualquier URL sin entrada en `pages`. Cada elemento se
+# describe con: tag, text, value, visible, enabled, checked, options (select),
+# items (textos de una lista), rows (filas para extract/extract_table),
+# appear_after / remove_after (segundos desde la carga), href (navega al hacer click).
+DEFAULT_PAGE = {
+    "body": {"tag": "body"},
+    "#input": {"tag": "input"},
+    "#email": {"tag": "input"},
+    "#button": {"tag": "button", "text": "Enviar"},
+    "#select": {"tag": "select", "options": ["US", "ES", "MX"], "value": "US"},
+    "#checkbox": {"tag": "input", "type": "checkbox"},
+    ".item": {"tag": "li", "items": [f"Item {i}" for i in range(20)]},
+    ".product": {"tag": "div", "rows": [{"title": f"Producto {i}", "price": f"{i}.99"} for i in range(20)]},
+    "#results": {"tag": "table", "rows": [{"name": f"Fila {i}", "value": str(i)} for i in range(10)]},
+}
+
+_FAULTS = {
+    "stale": StaleElementReferenceException,
+    "intercepted": ElementClickInterceptedException,
+    "not_found": NoSuchElementException,
+    "timeout": TimeoutException,
+    "session_dead": InvalidSessionIdException,
+}
+
+_KEY_BACKSPACE = Keys.BACKSPACE
+_SPECIAL_KEYS = {Keys.ENTER: "\n", Keys.RETURN: "\n", Keys.TAB: "\t"}
+
+# PNG de 1x1 para las capturas de pantalla
+_PIXEL_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+
+_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+_WRAPPED_JS = re.compile(r"^\(function\(\) \{ (.*) \}\)\.apply\(null, (.*)\)$", re.S)
+_OPTION_VALUE = re.compile(r"value\s*=\s*[\"'](.*)[\"']\]")
+
+
+class FakeElement(WebElement):
+    def __init__(self, dom, selector, spec):
+        """
+        Elemento del DOM en memoria. Implementa la parte de la API de WebElement y de
+        los elementos de sb_cdp que usa CustomDriver. Queda stale al navegar.
+        """
+        super().__init__(None, uuid.uuid4().hex)
+        self.dom = dom
+        self.selector = selector
+        self.spec = spec
+        self.generation = dom.generation
+        self.value = str(spec.get("value", ""))
+        self.checked = bool(spec.get("checked", False))
+        self.clicks = 0
+
+    def _alive(self, op=None):
+        if op is not None:
+            self.dom.browser.command(op)
+        if self.generation != self.dom.generation or not self.dom.exists(self.selector):
+            raise StaleElementReferenceException(f"stale element reference: {self.selector}")
+
+    def __repr__(self):
+        return f"<FakeElement {self.selector} ({self.id})>"
+
+    @property
+    def tag_name(self):
+        return self.spec.get("tag", "div")
+
+    @property
+    def text(self):
+        self._alive("element")
+        return self.spec.get("text", self.value)
+
+    def is_displayed(self):
+        self._alive("element")
+        return self.spec.get("visible", True) and self.dom.exists(self.selector)
+
+    def is_enabled(self):
+        self._alive("element")
+        return self.spec.get("enabled", True)
+
+    def is_selected(self):
+        self._alive("element")
+        return self.checked
+
+    def get_attribute(self, name):
+        self._alive("element")
+        if name == "value":
+            return self.value
+        return self.spec.get("attrs", {}).get(name)
+
+    get_dom_attribute = get_attribute
+
+    def click(self):
+        self._alive("click")
+        self.clicks += 1
+        if self.spec.get("type") == "checkbox":
+            self.checked = not self.checked
+        self.dom.focused = self
+        if self.spec.get("href"):
+            self.dom.load(self.spec["href"])
+
+    def focus(self):
+        self._alive("element")
+        self.dom.focused = self
+
+    def scroll_into_view(self):
+        self._alive("element")
+
+    def clear(self):
+        self._alive("element")
+        self.value = ""
+
+    def send_keys(self, *values):
+        self._alive("send_keys")
+        self.type_text("".join(str(v) for v in values))
+
+    def type_text(self, text):
+        for char in text:
+            if char == _KEY_BACKSPACE or char == "\b":
+                self.value = self.value[:-1]
+            elif char in _SPECIAL_KEYS:
+                continue
+            else:
+                self.value += char
+
+    def find_elements(self, by=By.ID, value=None):
+        """Solo lo que usa Select: las opciones de un <select>."""
+        self._alive("find")
+        options = self.spec.get("options", [])
+        match = _OPTION_VALUE.search(value or "")
+        if match:
+            options = [o for o in options if o == match.group(1)]
+        return [_FakeOption(self, option) for option in options]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"no such element: {value}")
+        return elements[0]
+
+
+class _FakeOption:
+    def __init__(self, select, value):
+        self.select = select
+        self.value = value
+
+    def is_selected(self):
+        return self.select.value == self.value
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.select._alive("click")
+        self.select.value = self.value
+
+
+class FakeDOM:
+    def __init__(self, browser):
+        """Documento de una pestaña: URL, elementos, storage y momento de la carga."""
+        self.browser = browser
+        self.url = "about:blank"
+        self.generation = 0
+        self.loaded_at = time.monotonic()
+        self.time_origin = time.time() * 1000
+        self.elements = {}
+        self.focused = None
+        self.local = {}
+        self.session = {}
+
+    def load(self, url):
+        self.browser.loads += 1
+        self.url = url
+        self.generation += 1
+        self.loaded_at = time.monotonic()
+        self.time_origin = time.time() * 1000
+        self.focused = None
+        self.session = {}
+        page = self.browser.page_for(url)
+        self.elements = {selector: FakeElement(self, selector, dict(spec)) for selector, spec in page.items()}
+
+    def exists(self, selector):
+        element = self.elements.get(selector)
+        if element is None:
+            return False
+        age = time.monotonic() - self.loaded_at
+        if age < element.spec.get("appear_after", 0):
+            return False
+        remove_after = element.spec.get("remove_after")
+        return remove_after is None or age < remove_after
+
+    def by_id(self, element_id):
+        for element in self.elements.values():
+            if element.id == element_id:
+                return element
+        raise StaleElementReferenceException(f"stale element reference: {element_id}")
+
+    def find(self, selector):
+        return self.elements[selector] if self.exists(selector) else None
+
+    def check(self, spec):
+        """Evalúa una condición de wait_engine; devuelve el elemento, True o None."""
+        if spec["state"] == "url":
+            return True if re.search(spec["pattern"], self.url) else None
+        element = self.find(spec["selector"])
+        visible = element is not None and element.spec.get("visible", True)
+        match spec["state"]:
+            case "present":
+                return element
+            case "visible":
+                return element if visible else None
+            case "clickable":
+                return element if visible and element.spec.get("enabled", True) else None
+            case "detached":
+                return True if element is None else None
+            case "hidden":
+                return True if not visible else None
+            case "text":
+                return element if element is not None and re.search(spec["text"], element.spec.get("text", element.value)) else None
+        return None
+
+    def wait(self, specs, timeout_ms):
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            for index, spec in enumerate(specs):
+                result = self.check(spec)
+                if result:
+                    return {"index": index, "element": None if result is True else result}
+            if time.monotonic() >= deadline:
+                return {"index": -1, "element": None}
+            time.sleep(0.01)
+
+
+class FakeBrowser:
+    def __init__(self, pages=None, latency=0.0, faults=None, seed=None, honor_pauses=True, heap_growth=0):
+        """
+        Navegador en memoria compartido por las pestañas de un driver falso.
+
+        Args:
+            pages: {url: {selector: spec}}; las URLs sin entrada usan DEFAULT_PAGE
+            latency: Latencia inyectada por comando en segundos, o (min, max)
+            faults: {operación: {tipo: probabilidad}} con operación en get, find, click,
+                send_keys, element, script, actions, cdp y tipo en stale, intercepted,
+                not_found, timeout, session_dead (ej: {"click": {"stale": 0.1}})
+            seed: Semilla para que latencias y fallos sean reproducibles
+            honor_pauses: Si True, las pausas y movimientos de W3C Actions duran lo pedido
+            heap_growth: Bytes que crece el heap de JS (Performance.getMetrics) por navegación
+        """
+        self.pages = pages or {}
+        self.latency = latency
+        self.faults = faults or {}
+        self.random = random.Random(seed)
+        self.honor_pauses = honor_pauses
+        self.heap_growth = heap_growth
+        self.loads = 0
+        self.commands = Counter()
+        self.cookies = []
+        self.alive = True
+        self._handles = itertools.count()
+        self.tabs = {}
+        self.current = self.new_tab()
+
+    def new_tab(self):
+        handle = f"fake-{next(self._handles)}"
+        self.tabs[handle] = FakeDOM(self)
+        return handle
+
+    @property
+    def dom(self):
+        if self.current not in self.tabs:
+            raise NoSuchWindowException("no such window: target window already closed")
+        return self.tabs[self.current]
+
+    def page_for(self, url):
+        if url in self.pages:
+            return self.pages[url]
+        if url.startswith("about:"):
+            return {"body": {"tag": "body"}}
+        return self.pages.get("*", DEFAULT_PAGE)
+
+    def command(self, op):
+        """Cuenta el comando, aplica la latencia y, si toca, lanza un fallo inyectado."""
+        if not self.alive:
+            raise InvalidSessionIdException("invalid session id")
+        self.commands[op] += 1
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+        for kind, rate in self.faults.get(op, {}).items():
+            if self.random.random() < rate:
+                raise _FAULTS[kind](f"injected {kind} fault on {op}")
+
+    def run_script(self, script, args):
+        """Ejecuta los scripts conocidos de CustomDriver contra el DOM en memoria."""
+        self.command("script")
+        dom = self.dom
+        if script in ("return document.readyState;",):
+            return "complete"
+        if script == readiness._RESOURCES_JS:
+            return ["complete", 0]
+        if script == extraction.EXTRACT_LIST_JS:
+            element = dom.find(args[0])
+            if element is None:
+                return []
+            return list(element.spec.get("items", [element.spec.get("text", "")]))
+        if script == extraction.EXTRACT_JS:
+            element = dom.find(args[0])
+            rows = element.spec.get("rows", []) if element is not None else []
+            rows = rows[: args[2]] if args[2] else rows
+            return [{field["name"]: row.get(field["name"]) for field in args[1]} for row in rows]
+        if script == extraction.EXTRACT_TABLE_JS:
+            element = dom.find(args[0])
+            return None if element is None else [dict(row) for row in element.spec.get("rows", [])]
+        if script == forms.FILL_JS:
+            return self._fill(dom, args[0])
+        if script == forms.DESCRIBE_JS:
+            described = []
+            for selector in args[0]:
+                element = dom.find(selector)
+                if element is None:
+                    described.append(None)
+                    continue
+                kind = "select" if element.tag_name == "select" else ("check" if element.spec.get("type") == "checkbox" else "text")
+                described.append({"element": element, "kind": kind, "checked": element.checked})
+            return described
+        if script == recorder.FINGERPRINT_JS:
+            element = dom.find(args[1])
+            if element is None:
+                return None
+            classes = str(element.spec.get("attrs", {}).get("class", "")).split()
+            return {"tag": element.tag_name, "id": element.spec.get("attrs", {}).get("id"), "name": element.spec.get("attrs", {}).get("name"),
+                    "classes": classes[:5],
+                    "text": "" if element.tag_name in ("input", "textarea", "select") else str(element.spec.get("text", "")).strip()[:40]}
+        if script == artifacts._DOM_JS:
+            return "<html><body>" + "".join(f'<{e.tag_name} data-selector="{s}"></{e.tag_name}>' for s, e in dom.elements.items()) + "</body></html>"
+        if script == artifacts._NETWORK_JS:
+            return [{"url": dom.url, "type": "navigation", "start": 0, "duration": 0, "transferSize": 0, "status": 200}]
+        if script == blocking._SCAN_JS:
+            return [[], []]
+        if script == session_state._STORAGE_JS:
+            origin = "/".join(dom.url.split("/")[:3]) if dom.url.startswith("http") else "null"
+            return {"url": dom.url, "origin": origin, "local": dict(dom.local), "session": dict(dom.session)}
+        if "localStorage.clear()" in script:
+            dom.local.clear()
+            dom.session.clear()
+            return None
+        if "window.location.href = arguments[0]" in script:
+            origin = dom.time_origin
+            target = dom.url.split("#")[0] + args[0] if args[0].startswith("#") else args[0]
+            if "#" in target and target.split("#")[0] == dom.url.split("#")[0]:
+                # Solo cambia el fragmento: mismo documento
+                dom.url = target
+                return [origin, target]
+            dom.load(target)
+            return [origin, None]
+        if "performance.timeOrigin" in script:
+            return [dom.time_origin, "complete", dom.url]
+        if ".focus()" in script and args:
+            args[0].focus()
+            return None
+        # scrollIntoView, cierre de overlays y cualquier otro script: sin efecto
+        return None
+
+    def _fill(self, dom, fields):
+        missing, errors = [], []
+        for selector, value in fields:
+            element = dom.find(selector)
+            if element is None:
+                missing.append(selector)
+            elif element.tag_name == "select":
+                if str(value) in element.spec.get("options", []):
+                    element.value = str(value)
+                else:
+                    errors.append(f"{selector}: option {value} not found")
+            elif element.spec.get("type") == "checkbox":
+                element.checked = bool(value)
+            else:
+                element.value = str(value)
+        return {"missing": missing, "errors": errors}
+
+    def run_async_script(self, fn, args):
+        """Scripts asíncronos (Promise): esperas de wait_engine e IndexedDB de session_state."""
+        if fn == wait_engine._WAIT_FN:
+            self.command("script")
+            return self.dom.wait(args[0], args[1])
+        if fn == session_state._IDB_DUMP_FN:
+            self.command("script")
+            return []
+        if fn == session_state._IDB_RESTORE_FN:
+            self.command("script")
+            return 0
+        return self.run_script(fn, args)
+
+    def run_cdp(self, method, params):
+        self.command("cdp")
+        match method:
+            case "Network.getAllCookies":
+                return {"cookies": list(self.cookies)}
+            case "Network.setCookies":
+                self.cookies.extend(params.get("cookies", []))
+            case "Network.clearBrowserCookies":
+                self.cookies = []
+            case "Page.captureScreenshot":
+                return {"data": _PIXEL_PNG}
+            case "Performance.getMetrics":
+                return {"metrics": [{"name": "JSHeapUsedSize", "value": 10 * 1024 * 1024 + self.loads * self.heap_growth}]}
+            case "Page.addScriptToEvaluateOnNewDocument":
+                return {"identifier": "1"}
+            case "Input.dispatchKeyEvent":
+                focused = self.dom.focused
+                if focused is not None and params.get("type") in ("keyDown", "char"):
+                    focused.type_text(params.get("text", ""))
+                elif focused is not None and params.get("key") == "Backspace" and params.get("type") == "rawKeyDown":
+                    focused.type_text("\b")
+        return {}
+
+    def perform_actions(self, sources):
+        """Ejecuta un comando W3C Actions: clics sobre elementos, teclas y pausas."""
+        self.command("actions")
+        dom = self.dom
+        pointer_target = None
+        elapsed = 0.0
+        for tick in itertools.zip_longest(*[source["actions"] for source in sources]):
+            duration = 0
+            for action in tick:
+                if action is None:
+                    continue
+                duration = max(duration, action.get("duration", 0))
+                match action["type"]:
+                    case "pointerMove":
+                        origin = action.get("origin")
+                        if isinstance(origin, dict) and _ELEMENT_KEY in origin:
+                            pointer_target = dom.by_id(origin[_ELEMENT_KEY])
+                        elif isinstance(origin, FakeElement):
+                            pointer_target = origin
+                    case "pointerUp":
+                        if pointer_target is not None:
+                            self.command("click")
+                            pointer_target.click()
+                    case "keyDown":
+                        if dom.focused is not None:
+                            dom.focused.type_text(action["value"])
+            elapsed += duration / 1000
+        if self.honor_pauses and elapsed > 0:
+            time.sleep(elapsed)
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+
+    def new_window(self, type_hint=None):
+        handle = self._driver.execute(Command.NEW_WINDOW, {"type": type_hint})["value"]["handle"]
+        self.window(handle)
+
+
+class FakeWebDriver:
+    def __init__(self, **options):
+        """
+        Stand-in de selenium WebDriver sobre FakeBrowser (ver sus argumentos).
+        Los comandos de ventana pasan por execute() como en selenium, para que
+        TabGroup pueda enrutarlos.
+        """
+        self.browser = FakeBrowser(**options)
+        self.session_id = uuid.uuid4().hex
+        self.switch_to = _SwitchTo(self)
+        self.script_timeout = 30
+
+    def execute(self, driver_command, params=None):
+        params = params or {}
+        browser = self.browser
+        match driver_command:
+            case Command.W3C_ACTIONS:
+                browser.perform_actions(params["actions"])
+            case Command.SWITCH_TO_WINDOW:
+                if params["handle"] not in browser.tabs:
+                    raise NoSuchWindowException(f"no such window: {params['handle']}")
+                browser.current = params["handle"]
+            case Command.NEW_WINDOW:
+                return {"value": {"handle": browser.new_tab(), "type": "tab"}}
+            case Command.CLOSE:
+                browser.tabs.pop(browser.current, None)
+            case _:
+                raise Exception(f"Command {driver_command} is not implemented by the fake backend")
+        return {"value": None}
+
+    @property
+    def current_url(self):
+        self.browser.command("element")
+        return self.browser.dom.url
+
+    @property
+    def title(self):
+        return self.browser.dom.url
+
+    @property
+    def window_handles(self):
+        return list(self.browser.tabs)
+
+    @property
+    def current_window_handle(self):
+        return self.browser.current
+
+    def get(self, url):
+        self.browser.command("get")
+        self.browser.dom.load(url)
+
+    def find_element(self, by=By.ID, value=None):
+        self.browser.command("find")
+        selector = "body" if by == By.TAG_NAME and value == "body" else value
+        element = self.browser.dom.find(selector)
+        if element is None:
+            raise NoSuchElementException(f"no such element: Unable to locate element: {value}")
+        return element
+
+    def find_elements(self, by=By.ID, value=None):
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
+
+    def execute_script(self, script, *args):
+        return self.browser.run_script(script, list(args))
+
+    def execute_async_script(self, script, *args):
+        if script == wait_engine._SELENIUM_JS:
+            return self.browser.run_async_script(wait_engine._WAIT_FN, list(args))
+        for fn in (session_state._IDB_DUMP_FN, session_state._IDB_RESTORE_FN):
+            if fn in script:
+                return {"result": self.browser.run_async_script(fn, list(args))}
+        return self.browser.run_script(script, list(args))
+
+    def get_screenshot_as_base64(self):
+        self.browser.command("screenshot")
+        return _PIXEL_PNG
+
+    @property
+    def timeouts(self):
+        self.browser.command("timeouts")
+        return Timeouts(implicit_wait=0, page_load=300, script=self.script_timeout)
+
+    def set_script_timeout(self, seconds):
+        self.browser.command("timeouts")
+        self.script_timeout = seconds
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self.browser.run_cdp(cmd, params)
+
+    def delete_all_cookies(self):
+        self.browser.cookies = []
+
+    def close(self):
+        self.execute(Command.CLOSE)
+
+    def quit(self):
+        self.browser.alive = False
+
+
+class FakePage:
+    def __init__(self, browser, handle):
+        """Stand-in del Tab de nodriver: evaluate y send asíncronos."""
+        self.browser = browser
+        self.handle = handle
+
+    async def evaluate(self, expression, await_promise=False):
+        return self.browser.evaluate(expression)
+
+    async def send(self, cdp_obj):
+        # Mismo protocolo que los comandos de mycdp: el generador cede {"method", "params"}
+        request = next(cdp_obj)
+        result = self.browser.run_cdp(request["method"], request.get("params", {}))
+        try:
+            cdp_obj.send(result)
+        except StopIteration as stop:
+            return stop.value
+        return None
+
+    async def close(self):
+        self.browser.tabs.pop(self.handle, None)
+
+
+class _FakeCDPBrowser(FakeBrowser):
+    def evaluate(self, expression):
+        """Desenvuelve las expresiones que genera CustomDriver para CDP."""
+        prefix = "(" + wait_engine._WAIT_FN + ")("
+        if expression.startswith(prefix):
+            specs, timeout_ms = expression[len(prefix):].split(").then")[0].rsplit(", ", 1)
+            result = self.run_async_script(wait_engine._WAIT_FN, [json.loads(specs), int(timeout_ms)])
+            return {key: value for key, value in result.items() if key in ("index", "error")}
+        for fn in (session_state._IDB_DUMP_FN, session_state._IDB_RESTORE_FN):
+            if expression.startswith("(" + fn + ")"):
+                return self.run_async_script(fn, [])
+        match = _WRAPPED_JS.match(expression)
+        if match:
+            return self.run_script(match.group(1), json.loads(match.group(2)))
+        return self.run_script(expression, [])
+
+
+class FakeCDP:
+    def __init__(self, **options):
+        """
+        Stand-in de sb_cdp (CDPMethods) sobre un FakeBrowser, con un loop propio para
+        las llamadas que CustomDriver hace con loop.run_until_complete.
+        """
+        self.browser = _FakeCDPBrowser(**options)
+        self.loop = asyncio.new_event_loop()
+        self.page = FakePage(self.browser, self.browser.current)
+        self.driver = self
+        self._lock = threading.Lock()
+
+    def _wait_for(self, selector, timeout=None):
+        deadline = time.monotonic() + (7 if timeout is None else timeout)
+        while True:
+            self.browser.command("find")
+            element = self.browser.dom.find(selector)
+            if element is not None:
+                return element
+            if time.monotonic() >= deadline:
+                raise Exception(f"Element {{{selector}}} was not found after {timeout} seconds!")
+            time.sleep(0.01)
+
+    def open(self, url):
+        self.browser.command("get")
+        self.browser.dom.load(url)
+
+    def get_current_url(self):
+        self.browser.command("element")
+        return self.browser.dom.url
+
+    def find_element(self, selector, best_match=None, timeout=None):
+        return self._wait_for(selector, timeout)
+
+    def click(self, selector, timeout=None):
+        self._wait_for(selector, timeout).click()
+
+    def select_option_by_value(self, dropdown_selector, option, timeout=None):
+        element = self._wait_for(dropdown_selector, timeout)
+        if option not in element.spec.get("options", []):
+            raise Exception(f"Option {option} was not found in {dropdown_selector}")
+        element.value = option
+
+    def evaluate(self, expression):
+        return self.browser.evaluate(expression)
+
+    def add_handler(self, event, handler):
+        pass
+
+    def get_tabs(self):
+        return list(self.browser.tabs)
+
+    def switch_to_tab(self, tab):
+        self.browser.current = tab
+        self.page = FakePage(self.browser, tab)
+
+    def close_active_tab(self):
+        self.browser.tabs.pop(self.browser.current, None)
+
+    def clear_cookies(self):
+        self.browser.cookies = []
+
+    def quit(self):
+        self.browser.alive = False
+        self.loop.close()
+
+
+class FakeBackend(Backend):
+    """browser_options={"type": "fake", ...}: WebDriver en memoria (ver FakeBrowser)."""
+
+    def start(self, proxy=None, browser_options=None):
+        return FakeWebDriver(**_fake_options(browser_options))
+
+    def start_many(self, count, browser_options=None):
+        return [self.start(browser_options=browser_options) for _ in range(count)]
+
+
+class FakeCDPBackend(Backend):
+    """browser_options={"type": "fake_cdp", ...}: sb_cdp en memoria (ver FakeBrowser)."""
+    cdp = True
+    mobile_emulation = False
+
+    def start(self, proxy=None, browser_options=None):
+        return FakeCDP(**_fake_options(browser_options))
+
+    def start_many(self, count, browser_options=None):
+        return [self.start(browser_options=browser_options) for _ in range(count)]
+
+
+def _fake_options(browser_options):
+    browser_options = browser_options or {}
+    keys = ("pages", "latency", "faults", "seed", "honor_pauses", "heap_growth")
+    return {key: browser_options[key] for key in keys if key in browser_options}
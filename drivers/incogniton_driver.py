@@ -1,20 +1,52 @@
 from incogniton import IncognitonClient
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from drivers.profile_scheduler import ProfileScheduler, from_incogniton
 import asyncio
 
 class IncognitonDriver:
-    def __init__(self):
+    def __init__(self, scheduler=None):
         self.client = IncognitonClient()
+        self.scheduler = scheduler or ProfileScheduler()
+        self.profile_id = None
     
     async def get_profiles(self):
         """Obtiene todos los perfiles desde Incogniton"""
         response = await self.client.profile.list()
         return response
     
-    async def list_and_select_profile(self):
+    def _connect(self, response):
+        """Conecta un webdriver.Remote a la URL devuelta por launch_selenium."""
+        if response.get("status") != "ok" or not response.get("url"):
+            raise RuntimeError("Invalid Selenium launch response from Incogniton")
+
+        selenium_url = f"http://{response['url']}"
+
+        options = Options()
+        options.add_argument("--start-maximized")
+
+        return webdriver.Remote(
+            command_executor=selenium_url,
+            options=options
+        )
+
+    async def stop(self, profile_id=None):
+        """
+        Cierra el perfil indicado (default: el último iniciado con list_and_select_profile).
+        """
+        profile_id = profile_id or self.profile_id
+        if profile_id is not None:
+            await self.client.profile.stop(profile_id)
+            self.scheduler.release([profile_id])
+
+    async def list_and_select_profile(self, profile=None):
         """
         Lista todos los perfiles disponibles y permite al usuario seleccionar uno.
+
+        Args:
+            profile: Selección no interactiva del perfil: ID, lista de IDs o
+                diccionario {"policy": ..., "id": ..., "match": ...} (ver ProfileScheduler).
+                Si es None se pide el perfil por consola.
         
         Returns:
             IncognitonBrowser: Driver del navegador con el perfil seleccionado
@@ -35,6 +67,17 @@ class IncognitonDriver:
             if not profiles or len(profiles) == 0:
                 print("❌ No profiles found in Incogniton.")
                 return None
+
+            if profile is not None:
+                selected = self.scheduler.select_from_option(from_incogniton(profiles), profile)[0]
+                print(f"🚀 Starting profile {selected['name']} ({selected['id']})...")
+                try:
+                    response = await self.client.automation.launch_selenium(selected["id"])
+                except Exception:
+                    self.scheduler.release([selected["id"]])
+                    raise
+                self.profile_id = selected["id"]
+                return await asyncio.to_thread(self._connect, response)
             
             # Mostrar lista de perfiles
             print("\n" + "="*70)
@@ -100,19 +143,9 @@ class IncognitonDriver:
             print("🚀 Starting browser...")
             response = await self.client.automation.launch_selenium(profile_id)
             print("🚀 ~ response:", response)
+            self.profile_id = profile_id
 
-            if response.get("status") != "ok" or not response.get("url"):
-                raise RuntimeError("Invalid Selenium launch response from Incogniton")
-
-            selenium_url = f"http://{response['url']}"
-
-            options = Options()
-            options.add_argument("--start-maximized")
-
-            driver = webdriver.Remote(
-                command_executor=selenium_url,
-                options=options
-            )
+            driver = self._connect(response)
 
             print("✅ Browser started successfully!\n")
 
@@ -124,7 +157,57 @@ class IncognitonDriver:
             traceback.print_exc()
             raise e
     
-    def start_driver(self):
+    async def start_many(self, count, profile={"policy": "first_available"}):
+        """
+        Inicia `count` perfiles a la vez sin interacción.
+
+        Los `launch_selenium` se lanzan concurrentemente con asyncio.gather y los
+        webdriver.Remote se conectan en hilos, también en paralelo.
+
+        Args:
+            count: Número de perfiles a iniciar
+            profile: Política de selección (ver list_and_select_profile)
+
+        Returns:
+            list: Tuplas (browser_id, driver) en el orden de selección
+        """
+        response = await self.get_profiles()
+        if response.get("status") != "ok":
+            raise RuntimeError(f"Error fetching profiles: {response}")
+
+        selected = self.scheduler.select_from_option(from_incogniton(response.get("profileData", [])), profile, count=count)
+        print(f"🚀 Starting {count} Incogniton profiles...")
+
+        launches = await asyncio.gather(
+            *(self.client.automation.launch_selenium(p["id"]) for p in selected),
+            return_exceptions=True,
+        )
+        launched = [(p, launch) for p, launch in zip(selected, launches) if not isinstance(launch, Exception)]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._connect, launch) for _, launch in launched),
+            return_exceptions=True,
+        )
+
+        drivers = [r for r in results if not isinstance(r, Exception)]
+        errors = [r for r in list(launches) + list(results) if isinstance(r, Exception)]
+        if errors:
+            for driver in drivers:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            # Cerrar los perfiles que sí se lanzaron, conectara o no su webdriver
+            stops = await asyncio.gather(*(self.client.profile.stop(p["id"]) for p, _ in launched), return_exceptions=True)
+            for (p, _), stop in zip(launched, stops):
+                if isinstance(stop, Exception):
+                    print(f"⚠️ Could not stop profile {p['id']}: {stop}")
+            self.scheduler.release([p["id"] for p in selected])
+            raise RuntimeError(f"{len(errors)} of {count} profiles failed to start: {errors[0]}")
+
+        print(f"✅ {count} browsers started successfully!\n")
+        return [(p["id"], driver) for p, driver in zip(selected, drivers)]
+
+    def start_driver(self, profile=None):
         """
         Método sincrónico para iniciar el driver con selección de perfil.
         Wrapper para usar con código sincrónico.
@@ -132,7 +215,7 @@ class IncognitonDriver:
         Returns:
             IncognitonBrowser: Driver del navegador
         """
-        return asyncio.run(self.list_and_select_profile())
+        return asyncio.run(self.list_and_select_profile(profile))
 
 
 async def main():
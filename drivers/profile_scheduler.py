@@ -0,0 +1,234 @@
+import json
+import os
+import re
+import threading
+import time
+
+# Archivo donde se guarda la última vez que se usó cada perfil (para la política LRU)
+DEFAULT_USAGE_FILE = os.path.join(os.path.expanduser("~"), ".customdriver", "profile_usage.json")
+
+POLICIES = ("id", "first_available", "lru", "match")
+
+# Segundos que un perfil queda reservado para el proceso que lo eligió: basta para
+# iniciarlo, y después la API ya lo lista como 'Started' y first_available no lo elige
+CLAIM_TTL = 120
+
+
+def from_undetectable(list_data):
+    """
+    Normaliza la respuesta de `/list` de Undetectable ({id: info}) a una lista de perfiles.
+    """
+    profiles = []
+    for pid, info in list_data.items():
+        profiles.append({
+            "id": pid,
+            "name": info.get('name') or info.get('title') or info.get('folder') or '',
+            # Sin estado no se sabe si está libre: no lo elige first_available
+            "status": info.get('status') or 'Unknown',
+            "notes": info.get('notes') or '',
+            "tags": info.get('tags') or [],
+            "raw": info,
+        })
+    return profiles
+
+
+def from_incogniton(profile_data):
+    """
+    Normaliza `profileData` de Incogniton a una lista de perfiles.
+    """
+    profiles = []
+    for profile in profile_data:
+        general_info = profile.get('general_profile_information', {})
+        profiles.append({
+            "id": general_info.get('browser_id'),
+            "name": general_info.get('profile_name', 'Unnamed Profile'),
+            "status": profile.get('status') or general_info.get('profile_status') or 'Unknown',
+            "notes": general_info.get('profile_notes', '') or '',
+            "tags": [general_info['profile_group']] if general_info.get('profile_group') else [],
+            "raw": profile,
+        })
+    return profiles
+
+
+def normalize_profile_option(profile):
+    """
+    Acepta `browser_options["profile"]` como ID (str), lista de IDs o diccionario
+    {"policy": ..., "id": ..., "match": ...} y devuelve siempre el diccionario.
+    """
+    if profile is None:
+        return None
+    if isinstance(profile, (str, list, tuple)):
+        return {"policy": "id", "id": profile}
+    return dict(profile)
+
+
+class ProfileScheduler:
+    def __init__(self, usage_file=DEFAULT_USAGE_FILE, claim_ttl=CLAIM_TTL):
+        """
+        Selección programática (sin `input()`) de perfiles de Undetectable/Incogniton.
+
+        Políticas disponibles:
+            - id: el/los ID explícitos indicados en `id`
+            - first_available: el primer perfil con estado 'Available'
+            - lru: el perfil usado hace más tiempo (según `usage_file`)
+            - match: perfiles cuyo nombre, notas o tags coinciden con la regex `match`
+
+        Los perfiles con estado 'Locked' nunca se seleccionan, y los de estado desconocido
+        ('Unknown') no cuentan como disponibles.
+
+        Con todas las políticas salvo "id", cada perfil elegido se reserva con un fichero
+        en la carpeta `claims` junto a `usage_file` (creado de forma atómica), de modo que
+        varios procesos (ej: los workers de jobs.JobRunner) no inicien el mismo perfil
+        aunque la API aún lo liste como 'Available'. La reserva caduca a los `claim_ttl`
+        segundos o al liberarla con `release`.
+
+        Args:
+            usage_file: Ruta del JSON con la última fecha de uso de cada perfil
+            claim_ttl: Segundos que dura la reserva de un perfil (default: 120)
+        """
+        self.usage_file = usage_file
+        self.claims_dir = os.path.join(os.path.dirname(usage_file), "claims")
+        self.claim_ttl = claim_ttl
+        self._lock = threading.Lock()
+
+    def _load_usage(self):
+        try:
+            with open(self.usage_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def mark_used(self, profile_ids):
+        """
+        Registra el uso de los perfiles indicados (para la política LRU).
+        """
+        with self._lock:
+            usage = self._load_usage()
+            now = time.time()
+            for pid in profile_ids:
+                usage[pid] = now
+            os.makedirs(os.path.dirname(self.usage_file), exist_ok=True)
+            tmp_path = self.usage_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(usage, f)
+            os.replace(tmp_path, self.usage_file)
+
+    def _claim_path(self, profile_id):
+        return os.path.join(self.claims_dir, re.sub(r"[^\w.-]", "_", str(profile_id)) + ".claim")
+
+    def claim(self, profile_id):
+        """
+        Reserva un perfil para este proceso.
+
+        Returns:
+            bool: False si ya estaba reservado (por otro proceso o por otro hilo de este)
+                hace menos de `claim_ttl` segundos
+        """
+        path = self._claim_path(profile_id)
+        os.makedirs(self.claims_dir, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) <= self.claim_ttl:
+                        return False
+                    # Reserva caducada (ej: el proceso que la hizo murió sin liberarla)
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def release(self, profile_ids):
+        """
+        Libera las reservas de este proceso sobre los perfiles indicados.
+        """
+        for pid in [profile_ids] if isinstance(profile_ids, str) else profile_ids:
+            path = self._claim_path(pid)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    if f.read().strip() != str(os.getpid()):
+                        continue
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def select(self, profiles, policy="first_available", profile_id=None, match=None, count=1):
+        """
+        Elige `count` perfiles distintos según la política indicada.
+
+        Args:
+            profiles: Lista de perfiles normalizados (ver from_undetectable / from_incogniton)
+            policy: Nombre de la política (default: "first_available")
+            profile_id: ID o lista de IDs para la política "id"
+            match: Regex (case-insensitive) para la política "match"
+            count: Número de perfiles a devolver (default: 1)
+
+        Returns:
+            list: Perfiles seleccionados, marcados como usados (y reservados salvo con "id")
+
+        Raises:
+            RuntimeError: Si no hay suficientes perfiles que cumplan la política
+        """
+        usable = [p for p in profiles if p["status"] != 'Locked']
+
+        match policy:
+            case "id":
+                wanted = [profile_id] if isinstance(profile_id, str) else list(profile_id or [])
+                by_id = {p["id"]: p for p in profiles}
+                for pid in wanted:
+                    if pid not in by_id:
+                        raise RuntimeError(f"Profile {pid} not found")
+                    if by_id[pid]["status"] == 'Locked':
+                        raise RuntimeError(f"Profile {pid} is locked")
+                candidates = [by_id[pid] for pid in wanted]
+            case "first_available":
+                candidates = [p for p in usable if p["status"] == 'Available']
+            case "lru":
+                usage = self._load_usage()
+                # Los 'Available' primero; dentro de cada grupo, el menos usado recientemente
+                candidates = sorted(usable, key=lambda p: (p["status"] != 'Available', usage.get(p["id"], 0)))
+            case "match":
+                pattern = re.compile(match or "", re.IGNORECASE)
+                candidates = [
+                    p for p in usable
+                    if pattern.search(p["name"]) or pattern.search(p["notes"]) or any(pattern.search(str(t)) for t in p["tags"])
+                ]
+            case _:
+                raise RuntimeError(f"Unknown profile policy {policy}. Use one of {POLICIES}")
+
+        if policy == "id":
+            selected = candidates[:count]
+        else:
+            # La reserva en disco cubre también a los demás procesos, no solo a los hilos de este
+            selected = []
+            for p in candidates:
+                if len(selected) == count:
+                    break
+                if self.claim(p["id"]):
+                    selected.append(p)
+
+        if len(selected) < count:
+            if policy != "id":
+                self.release([p["id"] for p in selected])
+            raise RuntimeError(f"Only {len(selected)} profiles match policy '{policy}', {count} requested")
+
+        self.mark_used([p["id"] for p in selected])
+        return selected
+
+    def select_from_option(self, profiles, profile, count=1):
+        """
+        Igual que `select`, pero a partir de `browser_options["profile"]`.
+        """
+        profile = normalize_profile_option(profile) or {}
+        return self.select(
+            profiles,
+            policy=profile.get("policy", "first_available"),
+            profile_id=profile.get("id"),
+            match=profile.get("match"),
+            count=count,
+        )
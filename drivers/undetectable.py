@@ -1,4 +1,6 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from drivers.profile_scheduler import ProfileScheduler, from_undetectable
+from drivers.undetectable_client import get_client
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -27,19 +29,24 @@ def print_profiles_table(profiles):
         print(f"{idx:>{widths[0]}}  {pid_short:{widths[1]}}  {label_short:{widths[2]}}  {status:{widths[3]}}")
 
 
-def open_profile_browser(profile_id, profile_info, address, port_from_settings_browser, chrome_driver_path, timeout=5):
+def open_profile_browser(profile_id, profile_info, address, port_from_settings_browser, chrome_driver_path, timeout=5, client=None):
     """Inicia el perfil si es necesario, conecta Selenium al puerto de depuración y retorna (driver, debug_port).
 
-    Lanza el perfil vía la API si está en 'Available', usa el puerto si está 'Started'.
+    Lanza el perfil vía la API si está en 'Available', usa el puerto si está 'Started'
+    y espera a que arranque si se está iniciando. Las llamadas a la API pasan por el
+    UndetectableClient compartido (conexiones keep-alive).
     Levanta el WebDriver conectado al puerto remoto y devuelve el `driver` y `debug_port`.
     """
+    client = client or get_client(address, port_from_settings_browser, timeout=timeout)
     debug_port = None
-    if profile_info.get('status') == 'Available':
-        resp = requests.get(f'http://{address}:{port_from_settings_browser}/profile/start/{profile_id}', timeout=timeout)
-        resp.raise_for_status()
-        debug_port = resp.json().get('data', {}).get('debug_port')
-    elif profile_info.get('status') == 'Started':
-        debug_port = profile_info.get('debug_port')
+    status = profile_info.get('status')
+    if status == 'Available':
+        debug_port = client.start(profile_id).get('debug_port')
+    elif status == 'Started':
+        debug_port = profile_info.get('debug_port') or client.status(profile_id).get('debug_port')
+    elif status != 'Locked':
+        # Perfil arrancando (p. ej. lanzado por otro proceso): esperar a su puerto
+        debug_port = client.wait_until_started(profile_id).get('debug_port')
 
     if not debug_port:
         raise RuntimeError('El perfil no expone un puerto de depuración (WebEngine) o no se pudo obtener el puerto.')
@@ -52,26 +59,22 @@ def open_profile_browser(profile_id, profile_info, address, port_from_settings_b
 
 
 class Undetectable:
-    def __init__(self, address=address, port=port_from_settings_browser, chrome_driver_path=chrome_driver_path):
+    def __init__(self, address=address, port=port_from_settings_browser, chrome_driver_path=chrome_driver_path, scheduler=None, client=None):
         self.address = address
         self.port = port
         self.chrome_driver_path = chrome_driver_path
+        self.scheduler = scheduler or ProfileScheduler()
+        self.client = client or get_client(address, port)
         self.profile_id = None
         self.debug_port = None
 
-    def start_driver(self, timeout=5):
-        # obtener lista de perfiles
-        try:
-            resp = requests.get(f'http://{self.address}:{self.port}/list', timeout=timeout)
-            resp.raise_for_status()
-            list_data = resp.json().get('data', {})
-        except Exception as e:
-            raise RuntimeError(f"Error al obtener la lista de perfiles: {e}")
-
-        profiles = list(list_data.items())
-        if not profiles:
+    def _list_profiles(self, timeout=5):
+        list_data = self.client.list_profiles(timeout=timeout)
+        if not list_data:
             raise RuntimeError("No hay perfiles disponibles.")
+        return list_data
 
+    def _ask_profile(self, profiles):
         # mostrar tabla y pedir selección
         print_profiles_table(profiles)
         while True:
@@ -89,10 +92,83 @@ class Undetectable:
             if profile_info.get('status') == 'Locked':
                 print("Perfil bloqueado. Elige otro perfil.")
                 continue
-            break
+            return profile_id, profile_info
+
+    def start_driver(self, timeout=5, profile=None):
+        """
+        Inicia un perfil y devuelve el WebDriver conectado a él.
+
+        Args:
+            timeout: Timeout de las llamadas a la API local (default: 5)
+            profile: Selección no interactiva del perfil: ID, lista de IDs o
+                diccionario {"policy": ..., "id": ..., "match": ...} (ver ProfileScheduler).
+                Si es None se pide el perfil por consola.
+        """
+        list_data = self._list_profiles(timeout=timeout)
+
+        if profile is None:
+            profile_id, profile_info = self._ask_profile(list(list_data.items()))
+        else:
+            selected = self.scheduler.select_from_option(from_undetectable(list_data), profile)[0]
+            profile_id, profile_info = selected["id"], selected["raw"]
 
         # iniciar el profile y conectar webdriver
-        driver, debug_port = open_profile_browser(profile_id, profile_info, self.address, self.port, self.chrome_driver_path, timeout=timeout)
+        try:
+            driver, debug_port = open_profile_browser(profile_id, profile_info, self.address, self.port, self.chrome_driver_path, timeout=timeout, client=self.client)
+        except Exception:
+            self.scheduler.release([profile_id])
+            raise
         self.profile_id = profile_id
         self.debug_port = debug_port
-        return driver
\ No newline at end of file
+        return driver
+
+    def stop(self, profile_id=None):
+        """
+        Cierra el perfil indicado (default: el último iniciado con start_driver).
+        """
+        profile_id = profile_id or self.profile_id
+        if profile_id is not None:
+            self.client.stop(profile_id)
+            self.scheduler.release([profile_id])
+
+    def start_many(self, count, profile={"policy": "first_available"}, timeout=5):
+        """
+        Inicia `count` perfiles en paralelo sin interacción.
+
+        Args:
+            count: Número de perfiles a iniciar
+            profile: Política de selección (ver start_driver)
+            timeout: Timeout de las llamadas a la API local (default: 5)
+
+        Returns:
+            list: Tuplas (profile_id, driver, debug_port) en el orden de selección
+        """
+        list_data = self._list_profiles(timeout=timeout)
+        selected = self.scheduler.select_from_option(from_undetectable(list_data), profile, count=count)
+        launched = {p["id"] for p in selected if p["status"] == 'Available'}
+
+        def start(p):
+            driver, debug_port = open_profile_browser(p["id"], p["raw"], self.address, self.port, self.chrome_driver_path, timeout=timeout, client=self.client)
+            return p["id"], driver, debug_port
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(start, p) for p in selected]
+            results, errors = [], []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            # No dejar navegadores huérfanos si parte de la flota falla
+            for _, driver, _ in results:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            # Cerrar también los perfiles que esta llamada inició
+            self.client.stop_many([pid for pid, _, _ in results if pid in launched])
+            self.scheduler.release([p["id"] for p in selected])
+            raise RuntimeError(f"{len(errors)} of {count} profiles failed to start: {errors[0]}")
+        return results
@@ -0,0 +1,207 @@
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# Clientes compartidos por (address, port): todas las instancias de Undetectable
+# del proceso reutilizan las mismas conexiones keep-alive y la misma caché de /list.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(address, port, timeout=5):
+    """
+    Devuelve el UndetectableClient compartido para la API local en address:port.
+    """
+    key = (address, str(port))
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = UndetectableClient(address, port, timeout=timeout)
+        return _clients[key]
+
+
+class UndetectableClient:
+    def __init__(self, address="127.0.0.1", port="25325", timeout=5, list_ttl=5.0, pool_size=16, session=None):
+        """
+        Cliente HTTP de la API local de Undetectable.
+
+        Usa un requests.Session con pool de conexiones keep-alive (sin handshake TCP por
+        llamada) y cachea la lista de perfiles durante `list_ttl` segundos; la caché se
+        invalida al iniciar o cerrar un perfil. Las llamadas concurrentes a /list
+        comparten una única petición.
+
+        Args:
+            address: Host de la API local (default: "127.0.0.1")
+            port: Puerto de la API configurado en Undetectable (default: "25325")
+            timeout: Timeout de cada petición en segundos (default: 5)
+            list_ttl: Segundos que se reutiliza la lista de perfiles (default: 5; 0 desactiva la caché)
+            pool_size: Conexiones máximas abiertas con la API (default: 16)
+            session: requests.Session propia (ej: para tests); por defecto se crea una
+
+        Example:
+            client = UndetectableClient()
+            info = client.start("3f1c...")   # {"debug_port": "9222", ...}
+            client.stop("3f1c...")
+        """
+        self.base_url = f"http://{address}:{port}"
+        self.timeout = timeout
+        self.list_ttl = list_ttl
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+        self._profiles = None
+        self._profiles_at = 0.0
+        self._list_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Cierra las conexiones del pool."""
+        self.session.close()
+
+    def _get(self, path, timeout=None):
+        resp = self.session.get(self.base_url + path, timeout=timeout or self.timeout)
+        resp.raise_for_status()
+        body = resp.json()
+        # La API responde {"code": 0, "status": "success", "data": {...}}
+        if body.get("code", 0) != 0:
+            raise RuntimeError(f"Undetectable API error on {path}: {body.get('data') or body.get('status')}")
+        return body.get("data") or {}
+
+    def list_profiles(self, refresh=False, timeout=None):
+        """
+        Lista de perfiles {id: info}, desde la caché si tiene menos de `list_ttl` segundos.
+
+        Args:
+            refresh: Si True, ignora la caché
+            timeout: Timeout de la petición (default: el del cliente)
+
+        Raises:
+            RuntimeError: Si la API no responde
+        """
+        with self._list_lock:
+            fresh = self._profiles is not None and time.monotonic() - self._profiles_at < self.list_ttl
+            if refresh or not fresh:
+                try:
+                    self._profiles = self._get("/list", timeout=timeout)
+                except Exception as e:
+                    raise RuntimeError(f"Error al obtener la lista de perfiles: {e}")
+                self._profiles_at = time.monotonic()
+            return self._profiles
+
+    def invalidate(self):
+        """Descarta la lista de perfiles cacheada."""
+        with self._list_lock:
+            self._profiles = None
+
+    def status(self, profile_id, refresh=True):
+        """
+        Información actual de un perfil (status, debug_port, ...).
+
+        Raises:
+            RuntimeError: Si el perfil no existe
+        """
+        profiles = self.list_profiles(refresh=refresh)
+        if profile_id not in profiles:
+            raise RuntimeError(f"Profile {profile_id} not found")
+        return profiles[profile_id]
+
+    def wait_until_started(self, profile_id, timeout=60, poll_interval=0.5):
+        """
+        Espera a que un perfil que se está iniciando exponga su puerto de depuración.
+
+        Returns:
+            dict: Información del perfil con `debug_port`
+
+        Raises:
+            RuntimeError: Si no arranca en `timeout` segundos o queda bloqueado
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            info = self.status(profile_id, refresh=True)
+            if info.get("status") == "Started" and info.get("debug_port"):
+                return info
+            if info.get("status") == "Locked":
+                raise RuntimeError(f"Profile {profile_id} is locked")
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Profile {profile_id} did not start after {timeout} seconds (status: {info.get('status')})")
+            time.sleep(poll_interval)
+
+    def start(self, profile_id, start_timeout=60, poll_interval=0.5):
+        """
+        Inicia un perfil y devuelve su información con `debug_port`. Si la API
+        responde antes de que el navegador esté listo, se consulta su estado
+        hasta que lo esté.
+
+        Args:
+            profile_id: ID del perfil
+            start_timeout: Espera máxima del arranque en segundos (default: 60)
+            poll_interval: Intervalo entre consultas de estado (default: 0.5)
+        """
+        try:
+            data = self._get(f"/profile/start/{profile_id}", timeout=max(self.timeout, start_timeout))
+        finally:
+            self.invalidate()
+        if data.get("debug_port"):
+            return data
+        return self.wait_until_started(profile_id, timeout=start_timeout, poll_interval=poll_interval)
+
+    def stop(self, profile_id):
+        """Cierra un perfil iniciado."""
+        try:
+            self._get(f"/profile/close/{profile_id}")
+        finally:
+            self.invalidate()
+
+    def start_many(self, profile_ids, start_timeout=60, max_workers=None):
+        """
+        Inicia varios perfiles en paralelo sobre el mismo pool de conexiones.
+
+        Returns:
+            dict: {profile_id: información con debug_port}, en el orden de `profile_ids`
+
+        Raises:
+            RuntimeError: Si alguno falla; los que sí arrancaron se vuelven a cerrar
+        """
+        profile_ids = list(profile_ids)
+        if not profile_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(profile_ids)) as executor:
+            futures = {pid: executor.submit(self.start, pid, start_timeout) for pid in profile_ids}
+        started, errors = {}, []
+        for pid, future in futures.items():
+            try:
+                started[pid] = future.result()
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            self.stop_many(started)
+            raise RuntimeError(f"{len(errors)} of {len(profile_ids)} profiles failed to start: {errors[0]}")
+        return started
+
+    def stop_many(self, profile_ids, max_workers=None):
+        """
+        Cierra varios perfiles en paralelo.
+
+        Returns:
+            list: IDs que no se pudieron cerrar
+        """
+        profile_ids = list(profile_ids)
+        if not profile_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=max_workers or len(profile_ids)) as executor:
+            futures = {pid: executor.submit(self.stop, pid) for pid in profile_ids}
+        failed = []
+        for pid, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️ Could not stop profile {pid}: {e}")
+                failed.append(pid)
+        return failed
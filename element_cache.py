@@ -0,0 +1,115 @@
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException
+import re
+import threading
+
+# Regla única para detectar XPath, compartida con el JavaScript de extraction.py:
+# empieza con / (//, /html...), con ./ (relativo) o con paréntesis delante ((//a)[1])
+XPATH_PATTERN = r"^\(*\.?/"
+_XPATH = re.compile(XPATH_PATTERN)
+
+
+def is_xpath(selector):
+    """Indica si un selector es XPath (ver XPATH_PATTERN)."""
+    return _XPATH.match(selector.strip()) is not None
+
+
+def cache_key(selector, by=By.CSS_SELECTOR):
+    """Clave de caché: (estrategia, selector), detectando XPath igual que _find."""
+    if is_xpath(selector):
+        by = By.XPATH
+    return (by, selector)
+
+
+def caused_by(exception, exception_type):
+    """
+    Indica si `exception_type` aparece en la cadena de excepciones. Los métodos del
+    driver re-lanzan como Exception genérica, así que hay que seguir __cause__/__context__.
+    """
+    seen = set()
+    while exception is not None and id(exception) not in seen:
+        if isinstance(exception, exception_type):
+            return True
+        seen.add(id(exception))
+        exception = exception.__cause__ or exception.__context__
+    return False
+
+
+def is_stale(exception):
+    return caused_by(exception, StaleElementReferenceException)
+
+
+class ElementCache:
+    def __init__(self):
+        """
+        Caché de WebElements de la página actual, por (estrategia, selector).
+
+        Se vacía al navegar (get, change_to_new_tab, reset) o al cambiar la URL de
+        la página a la que pertenecen las entradas (navegaciones por click o de SPAs,
+        ver sync_url), y las entradas se descartan cuando su elemento lanza
+        StaleElementReferenceException, para volver a resolverlo de forma transparente.
+        """
+        self.url = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            element = self._entries.get(key)
+            if element is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return element
+
+    def put(self, key, element):
+        if element is None:
+            return
+        with self._lock:
+            self._entries[key] = element
+
+    def invalidate(self, key=None):
+        """
+        Descarta una entrada, o toda la caché si `key` es None (navegación).
+        """
+        with self._lock:
+            if key is None:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.url = None
+            elif self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def sync_url(self, url):
+        """
+        Asocia la caché a la URL actual de la página; si las entradas se guardaron
+        con otra URL, se descartan todas.
+        """
+        with self._lock:
+            if self.url is not None and url != self.url and self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self.url = url
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, invalidations, tamaño actual y tasa de aciertos
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,109 @@
+# Extracción estructurada en un único script ejecutado en la página: una sola
+# petición a WebDriver/CDP en lugar de una por elemento y otra por cada atributo.
+
+from element_cache import XPATH_PATTERN
+import json
+
+_HELPERS = r"""
+    function isXPath(sel) {
+        return new RegExp(""" + json.dumps(XPATH_PATTERN) + r""").test(sel.trim());
+    }
+    function queryAll(ctx, sel) {
+        if (isXPath(sel)) {
+            var snapshot = document.evaluate(sel, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        }
+        return Array.prototype.slice.call(ctx.querySelectorAll(sel));
+    }
+    function queryOne(ctx, sel) {
+        if (isXPath(sel)) {
+            return document.evaluate(sel, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return ctx.querySelector(sel);
+    }
+    function read(node, attr) {
+        if (!node) return null;
+        if (!attr || attr === 'text') return (node.innerText || node.textContent || '').trim();
+        if (attr === 'html') return node.innerHTML;
+        if (attr === 'href' || attr === 'src' || attr === 'value' || attr === 'checked') {
+            // Propiedades DOM: URLs absolutas y valores actuales de los inputs
+            return node[attr] === undefined ? node.getAttribute(attr) : node[attr];
+        }
+        return node.getAttribute(attr);
+    }
+"""
+
+EXTRACT_JS = "return (function (rootSelector, fields, limit) {" + _HELPERS + r"""
+    var roots = queryAll(document, rootSelector);
+    if (limit) roots = roots.slice(0, limit);
+    return roots.map(function (root) {
+        var row = {};
+        fields.forEach(function (field) {
+            if (!field.selector) {
+                row[field.name] = read(root, field.attr);
+            } else if (field.all) {
+                row[field.name] = queryAll(root, field.selector).map(function (n) { return read(n, field.attr); });
+            } else {
+                row[field.name] = read(queryOne(root, field.selector), field.attr);
+            }
+        });
+        return row;
+    });
+}).apply(null, arguments);
+"""
+
+EXTRACT_TABLE_JS = "return (function (tableSelector) {" + _HELPERS + r"""
+    var table = queryOne(document, tableSelector);
+    if (!table) return null;
+    var rows = Array.prototype.slice.call(table.rows || []);
+    if (!rows.length) return [];
+    var headerRow = table.tHead && table.tHead.rows.length ? table.tHead.rows[0] : rows[0];
+    var headers = Array.prototype.map.call(headerRow.cells, function (cell, idx) {
+        return read(cell) || ('column_' + idx);
+    });
+    return rows.filter(function (row) { return row !== headerRow; }).map(function (row) {
+        var record = {};
+        Array.prototype.forEach.call(row.cells, function (cell, idx) {
+            record[headers[idx] || ('column_' + idx)] = read(cell);
+        });
+        return record;
+    });
+}).apply(null, arguments);
+"""
+
+EXTRACT_LIST_JS = "return (function (selector, attr) {" + _HELPERS + r"""
+    return queryAll(document, selector).map(function (node) { return read(node, attr); });
+}).apply(null, arguments);
+"""
+
+
+def normalize_fields(fields):
+    """
+    Normaliza la especificación de campos de `extract` a una lista de diccionarios.
+
+    Cada campo puede ser:
+        - "selector": texto del primer elemento que coincide dentro de la fila
+        - "selector@attr": atributo del elemento (ej: "a@href"); solo CSS
+        - "@attr": atributo de la propia fila; "" o ".": texto de la propia fila
+        - {"selector": ..., "attr": ..., "all": True}: forma explícita (necesaria para
+          leer atributos con XPath); con all=True devuelve la lista de todos los elementos
+
+    Los XPath que empiezan con // se hacen relativos a la fila (.//).
+    """
+    normalized = []
+    for name, field in fields.items():
+        if isinstance(field, str):
+            selector, attr = field.strip(), None
+            # Los XPath usan @ en sus predicados: solo se separa el atributo en CSS
+            if not selector.startswith(("/", "./", "(/", "(./")) and "@" in selector:
+                selector, attr = selector.rsplit("@", 1)
+            field = {"selector": selector, "attr": attr}
+        selector = (field.get("selector") or "").strip()
+        if selector == ".":
+            selector = ""
+        if selector.startswith("//"):
+            selector = "." + selector
+        normalized.append({"name": name, "selector": selector, "attr": field.get("attr"), "all": bool(field.get("all"))})
+    return normalized
@@ -0,0 +1,71 @@
+# Scripts para rellenar formularios en bloque.
+
+_HELPERS = r"""
+    function find(sel) {
+        if (/^\(*\//.test(sel.trim())) {
+            return document.evaluate(sel, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(sel);
+    }
+    function kind(el) {
+        var tag = el.tagName.toLowerCase();
+        if (tag === 'select') return 'select';
+        if (tag === 'input' && (el.type === 'checkbox' || el.type === 'radio')) return 'check';
+        return 'text';
+    }
+"""
+
+# Rellena todos los campos y dispara input/change como lo haría el usuario. El valor se
+# asigna con el setter nativo del prototipo para que frameworks como React lo detecten.
+# Con `scroll` cada campo se lleva al viewport antes de rellenarlo.
+FILL_JS = "return (function (fields, scroll) {" + _HELPERS + r"""
+    var missing = [], errors = [];
+    fields.forEach(function (field) {
+        var sel = field[0], value = field[1];
+        var el = find(sel);
+        if (!el) { missing.push(sel); return; }
+        try {
+            if (scroll && el.scrollIntoView) el.scrollIntoView({block: 'center'});
+            el.focus && el.focus();
+            switch (kind(el)) {
+                case 'select':
+                    var option = Array.prototype.find.call(el.options, function (o) { return o.value === String(value); });
+                    if (!option) { errors.push(sel + ': option ' + value + ' not found'); return; }
+                    el.value = option.value;
+                    break;
+                case 'check':
+                    el.checked = !!value;
+                    break;
+                default:
+                    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+                        : (el instanceof HTMLInputElement ? HTMLInputElement.prototype : null);
+                    var descriptor = proto && Object.getOwnPropertyDescriptor(proto, 'value');
+                    if (descriptor && descriptor.set) {
+                        descriptor.set.call(el, String(value));
+                    } else if (el.isContentEditable) {
+                        el.textContent = String(value);
+                    } else {
+                        el.value = String(value);
+                    }
+            }
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+            el.blur && el.blur();
+        } catch (e) {
+            errors.push(sel + ': ' + e);
+        }
+    });
+    return { missing: missing, errors: errors };
+}).apply(null, arguments);
+"""
+
+# Resuelve todos los selectores en una sola pasada. En selenium `element` vuelve como
+# WebElement; en CDP no se puede devolver por valor y solo se usan kind/checked.
+DESCRIBE_JS = "return (function (selectors) {" + _HELPERS + r"""
+    return selectors.map(function (sel) {
+        var el = find(sel);
+        if (!el) return null;
+        return { element: el, kind: kind(el), checked: !!el.checked };
+    });
+}).apply(null, arguments);
+"""
@@ -0,0 +1,407 @@
+from driver import CustomDriver
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 5
+IDLE_POLL = 1.0
+# Espera máxima entre intentos de arrancar el navegador de un worker
+MAX_STARTUP_BACKOFF = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_until REAL,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+
+class JobQueue:
+    def __init__(self, path):
+        """
+        Cola de tareas persistente en SQLite, compartida entre procesos.
+
+        Entrega al menos una vez: cada tarea se presta (lease) a un worker durante
+        `lease_seconds`; si el worker muere sin completarla, el lease caduca y la
+        tarea vuelve a entregarse. Tras `max_attempts` intentos queda como "failed".
+
+        Args:
+            path: Ruta del fichero SQLite (se crea si no existe)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def put(self, payload, key=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Encola una tarea. Si se indica `key` y ya existe una tarea con esa clave, se ignora.
+
+        Args:
+            payload: Datos de la tarea (serializables a JSON)
+            key: Clave única opcional para no encolar dos veces lo mismo (ej: la URL)
+            max_attempts: Intentos máximos antes de marcarla como fallida
+
+        Returns:
+            bool: True si se encoló
+        """
+        return self.put_many([payload], key=(lambda _: key) if key is not None else None, max_attempts=max_attempts) == 1
+
+    def put_many(self, payloads, key=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Encola muchas tareas en una sola transacción.
+
+        Args:
+            payloads: Iterable de payloads
+            key: Función payload -> clave única (opcional)
+            max_attempts: Intentos máximos por tarea
+
+        Returns:
+            int: Número de tareas nuevas encoladas
+        """
+        now = time.time()
+        rows = [(key(p) if key else None, json.dumps(p), max_attempts, now, now) for p in payloads]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (key, payload, max_attempts, available_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    def lease(self, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Toma la siguiente tarea disponible (pendiente o con el lease caducado).
+
+        Returns:
+            tuple: (id, payload, intento) o None si no hay tareas disponibles
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Leases caducados sin intentos restantes: el worker murió en el último intento
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', last_error = 'lease expired', updated_at = ? "
+                    "WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+                    (now, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs "
+                    "WHERE (status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_until < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (owner, now + lease_seconds, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0], json.loads(row[1]), row[2] + 1
+
+    def heartbeat(self, job_id, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Alarga el lease de una tarea en curso. Devuelve False si otro worker ya la tomó."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + lease_seconds, time.time(), job_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, result=None, owner=None):
+        """
+        Marca la tarea como hecha y guarda su resultado (checkpoint).
+
+        Args:
+            owner: Worker que la tiene prestada; si se indica y el lease ya es de otro
+                (caducó y se volvió a entregar), no se toca la tarea
+
+        Returns:
+            bool: True si se marcó como hecha
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, lease_until = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND (? IS NULL OR (status = 'leased' AND lease_owner = ?))",
+                (json.dumps(result, default=str), time.time(), job_id, owner, owner),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, error, retry_delay=DEFAULT_RETRY_DELAY, owner=None):
+        """
+        Registra un intento fallido. Si quedan intentos la tarea vuelve a la cola con
+        backoff exponencial (retry_delay * 2^(intento-1)); si no, queda como "failed".
+        Con `owner`, igual que en complete(): solo si el lease sigue siendo suyo.
+
+        Returns:
+            bool: True si se registró el fallo
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET "
+                "status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "available_at = ? + ? * (1 << (attempts - 1)), "
+                "lease_owner = NULL, lease_until = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND (? IS NULL OR (status = 'leased' AND lease_owner = ?))",
+                (now, retry_delay, str(error), now, job_id, owner, owner),
+            )
+            return cursor.rowcount == 1
+
+    def retry_failed(self):
+        """Devuelve a la cola las tareas fallidas con los intentos a cero. Returns: int"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, last_error = NULL, available_at = ?, updated_at = ? WHERE status = 'failed'",
+                (time.time(), time.time()),
+            )
+            return cursor.rowcount
+
+    def stats(self):
+        """
+        Returns:
+            dict: Número de tareas por estado (pending, leased, done, failed)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self, status="done"):
+        """
+        Itera los resultados guardados.
+
+        Yields:
+            dict: {"id", "payload", "result", "error", "attempts"}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload, result, last_error, attempts FROM jobs WHERE status = ? ORDER BY id", (status,)
+            ).fetchall()
+        for job_id, payload, result, error, attempts in rows:
+            yield {
+                "id": job_id,
+                "payload": json.loads(payload),
+                "result": json.loads(result) if result is not None else None,
+                "error": error,
+                "attempts": attempts,
+            }
+
+
+def _resolve_task(task):
+    """Acepta una función de nivel de módulo o su ruta "modulo:funcion"."""
+    if callable(task):
+        return task
+    module, _, name = task.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _drained(queue):
+    counts = queue.stats()
+    # Las pendientes en backoff y las prestadas a otros workers aún pueden volver
+    return counts["pending"] == 0 and counts["leased"] == 0
+
+
+def _worker_main(queue_path, task, driver_kwargs, options, jsonl_lock, stop):
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    task = _resolve_task(task)
+    queue = JobQueue(queue_path)
+    lease_seconds = options["lease_seconds"]
+    driver = None
+    startup_failures = 0
+
+    while not stop.is_set():
+        if driver is None:
+            # El navegador se arranca antes de tomar una tarea: si el backend, el perfil o
+            # el proxy fallan, no se gasta el intento de ninguna tarea
+            if options["until_empty"] and _drained(queue):
+                break
+            try:
+                driver = CustomDriver(**driver_kwargs)
+                startup_failures = 0
+            except Exception as e:
+                startup_failures += 1
+                delay = min(options["retry_delay"] * 2 ** (startup_failures - 1), MAX_STARTUP_BACKOFF)
+                print(f"❌ Could not start the browser of {owner} (attempt {startup_failures}): {e}. Retrying in {delay}s")
+                stop.wait(delay)
+                continue
+
+        job = queue.lease(owner, lease_seconds)
+        if job is None:
+            if options["until_empty"] and _drained(queue):
+                break
+            time.sleep(IDLE_POLL)
+            continue
+        job_id, payload, attempt = job
+
+        # Mantiene el lease vivo mientras la tarea corre
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(lease_seconds / 3):
+                queue.heartbeat(job_id, owner, lease_seconds)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            result = task(driver, payload)
+            if not queue.complete(job_id, result, owner=owner):
+                print(f"⚠️ Job {job_id} finished by {owner} after its lease expired, result discarded")
+            else:
+                if options["jsonl"]:
+                    with jsonl_lock:
+                        with open(options["jsonl"], "a", encoding="utf-8") as f:
+                            f.write(json.dumps({"id": job_id, "payload": payload, "result": result}, default=str) + "\n")
+                print(f"✅ Job {job_id} done by {owner}")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed on attempt {attempt} ({owner}): {e}")
+            queue.fail(job_id, e, options["retry_delay"], owner=owner)
+            if not driver.is_alive():
+                print(f"⚠️ Session of {owner} is dead, starting a new one")
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+        finally:
+            done.set()
+            beat.join()
+
+        if driver is not None and options["reset_between"]:
+            try:
+                driver.reset()
+            except Exception as e:
+                print(f"⚠️ Error resetting session of {owner}: {e}")
+
+    if driver is not None:
+        driver.quit()
+    queue.close()
+
+
+class JobRunner:
+    def __init__(self, queue_path, task, workers=1, driver_kwargs=None, results_jsonl=None,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, retry_delay=DEFAULT_RETRY_DELAY, reset_between=True):
+        """
+        Reparte las tareas de una JobQueue entre procesos worker, cada uno con su propio
+        CustomDriver. Como la cola es persistente, basta con volver a lanzar el runner tras
+        una caída para continuar donde se quedó: las tareas hechas no se repiten y las que
+        estaban en curso se vuelven a entregar al caducar su lease.
+
+        Args:
+            queue_path: Ruta de la cola SQLite
+            task: Función task(driver, payload) -> resultado serializable a JSON, de nivel de
+                módulo (se importa en cada proceso) o su ruta "modulo:funcion"
+            workers: Número de workers, o lista de kwargs de CustomDriver (uno por worker) para
+                repartir backends, proxies y perfiles
+            driver_kwargs: kwargs de CustomDriver comunes cuando `workers` es un número
+            results_jsonl: Fichero JSONL donde añadir además cada resultado (opcional). Con
+                entrega al menos una vez, una tarea reintentada puede aparecer dos veces.
+            lease_seconds: Duración del lease; se renueva mientras la tarea corre
+            retry_delay: Delay base del backoff entre reintentos
+            reset_between: Si True, resetea la sesión entre tareas
+
+        Example:
+            queue = JobQueue("jobs.db")
+            queue.put_many([{"url": u} for u in urls], key=lambda p: p["url"])
+            runner = JobRunner("jobs.db", "scrapers:scrape_product", workers=[
+                {"browser_options": {"type": "undetectable", "profile": {"policy": "lru"}}},
+                {"proxy": "1.2.3.4:1080", "browser_options": {"type": "seleniumbase"}},
+            ])
+            runner.run()
+        """
+        if isinstance(workers, int):
+            workers = [dict(driver_kwargs or {}) for _ in range(workers)]
+        self.queue_path = queue_path
+        self.task = task
+        self.workers = workers
+        self.options = {
+            "lease_seconds": lease_seconds,
+            "retry_delay": retry_delay,
+            "reset_between": reset_between,
+            "jsonl": results_jsonl,
+            "until_empty": True,
+        }
+        # spawn: los procesos no heredan hilos ni conexiones del padre
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = []
+        JobQueue(queue_path).close()
+
+    def run(self, until_empty=True):
+        """
+        Lanza los workers y bloquea hasta que terminan.
+
+        Args:
+            until_empty: Si True, los workers salen cuando no quedan tareas pendientes;
+                si False siguen esperando tareas nuevas hasta llamar a stop()
+
+        Returns:
+            dict: Tareas por estado al terminar
+        """
+        options = dict(self.options, until_empty=until_empty)
+        jsonl_lock = self._context.Lock()
+        self._stop.clear()
+        self._processes = [
+            self._context.Process(
+                target=_worker_main,
+                args=(self.queue_path, self.task, kwargs, options, jsonl_lock, self._stop),
+                name=f"customdriver-worker-{idx}",
+            )
+            for idx, kwargs in enumerate(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        try:
+            for process in self._processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.stop()
+        queue = JobQueue(self.queue_path)
+        try:
+            return queue.stats()
+        finally:
+            queue.close()
+
+    def stop(self, timeout=60):
+        """
+        Pide a los workers que terminen tras la tarea en curso.
+        """
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
@@ -0,0 +1,244 @@
+import time
+
+MB = 1024 * 1024
+
+
+def _debugger_port(driver):
+    """Puerto de depuración del navegador según las capabilities de la sesión, o None."""
+    caps = getattr(driver, "caps", None) or {}
+    address = (caps.get("goog:chromeOptions") or {}).get("debuggerAddress")
+    if not address:
+        return None
+    try:
+        return int(address.rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _listening_pid(psutil, port):
+    """PID del proceso que escucha en el puerto TCP local `port`, o None."""
+    def listening(conn):
+        return conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port
+
+    try:
+        return next((conn.pid for conn in psutil.net_connections(kind="tcp") if listening(conn) and conn.pid), None)
+    except psutil.AccessDenied:
+        pass
+    # macOS solo deja ver las conexiones de todos los procesos a root: se recorren una a una
+    for process in psutil.process_iter():
+        try:
+            # net_connections en psutil >= 6, connections en versiones anteriores
+            connections = getattr(process, "net_connections", None) or process.connections
+            if any(listening(conn) for conn in connections(kind="tcp")):
+                return process.pid
+        except psutil.Error:
+            pass
+    return None
+
+
+def _browser_pid(custom_driver, psutil):
+    """
+    PID raíz del navegador. Con un puerto de depuración (perfiles de Undetectable o
+    Incogniton conectados por debugger_address, o Chrome lanzado por chromedriver) es
+    el proceso que escucha en ese puerto: el navegador no tiene por qué ser hijo de
+    chromedriver. Si no, el de chromedriver (selenium) o el de Chrome (sb_cdp).
+    """
+    driver = custom_driver.driver
+    port = _debugger_port(driver)
+    if port is not None:
+        pid = _listening_pid(psutil, port)
+        if pid is not None:
+            return pid
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is not None:
+        return process.pid
+    # sb_cdp: CDPMethods.driver es el Browser de nodriver, que guarda el PID que lanzó
+    return getattr(getattr(driver, "driver", None), "_process_pid", None)
+
+
+class MemoryWatchdog:
+    def __init__(self, max_rss_mb=None, max_heap_mb=None, max_pages=None, sample_every=10, restore_state=True, indexeddb=False, pid=None):
+        """
+        Vigila la memoria del navegador en sesiones largas y recicla la sesión
+        (quit + relanzar por el mismo backend + restaurar URL y estado) en la
+        siguiente navegación cuando se pasa un umbral.
+
+        La muestra se toma en get(), cada `sample_every` navegaciones, así que no hay
+        hilos ni comandos concurrentes con el driver. El RSS es el del árbol de procesos
+        del navegador (requiere psutil); el heap de JS es el de la pestaña actual
+        (Performance.getMetrics por CDP).
+
+        Args:
+            max_rss_mb: RSS máximo del árbol de procesos del navegador en MB
+            max_heap_mb: Heap de JS usado máximo de la pestaña en MB
+            max_pages: Reciclar cada `max_pages` navegaciones, pase lo que pase con la memoria
+            sample_every: Navegaciones entre muestras (default: 10)
+            restore_state: Si True, guarda cookies y storage antes de reciclar y los restaura
+                (ver session_state); si False solo se vuelve a abrir la URL
+            indexeddb: Si True, el estado restaurado incluye IndexedDB
+            pid: PID del navegador, o función (custom_driver) -> PID, para backends en los
+                que no se puede deducir (ej: perfiles remotos de Incogniton)
+
+        Example:
+            driver = CustomDriver(memory_watchdog={"max_rss_mb": 2500, "max_heap_mb": 800, "max_pages": 2000})
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_heap_mb = max_heap_mb
+        self.max_pages = max_pages
+        self.sample_every = max(1, sample_every)
+        self.restore_state = restore_state
+        self.indexeddb = indexeddb
+        self.pid = pid
+        self.pages = 0
+        self.last_sample = None
+        self.recycles = {}
+        self._performance_enabled_for = None
+        self._pid_for = (None, None)
+        self._psutil_missing = False
+        self._recycling = False
+
+    @classmethod
+    def from_option(cls, option):
+        """
+        Construye el watchdog a partir del parámetro `memory_watchdog` del driver:
+        None (desactivado), True (solo muestras, sin umbrales), un diccionario de
+        argumentos o una instancia (una por driver).
+        """
+        if option is None or option is False:
+            return None
+        if option is True:
+            return cls()
+        if isinstance(option, MemoryWatchdog):
+            return option
+        if isinstance(option, dict):
+            return cls(**option)
+        raise Exception(f"Invalid memory_watchdog {option}. Use a MemoryWatchdog or a dict of its arguments")
+
+    def _rss_bytes(self, custom_driver):
+        try:
+            import psutil
+        except ImportError:
+            if not self._psutil_missing:
+                print("⚠️ psutil is not installed: browser RSS will not be sampled")
+                self._psutil_missing = True
+            return None
+        pid = self.pid(custom_driver) if callable(self.pid) else self.pid or self._resolve_pid(custom_driver, psutil)
+        if pid is None:
+            return None
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+
+    def _resolve_pid(self, custom_driver, psutil):
+        # Buscar el puerto entre las conexiones del sistema es caro: una vez por sesión
+        driver, pid = self._pid_for
+        if driver is not custom_driver.driver or pid is None:
+            pid = _browser_pid(custom_driver, psutil)
+            self._pid_for = (custom_driver.driver, pid)
+        return pid
+
+    def _heap_bytes(self, custom_driver):
+        try:
+            if self._performance_enabled_for is not custom_driver.driver:
+                custom_driver._execute_cdp("Performance.enable", {})
+                self._performance_enabled_for = custom_driver.driver
+            result = custom_driver._execute_cdp("Performance.getMetrics", {}) or {}
+        except Exception as e:
+            print(f"⚠️ Could not read JS heap metrics: {e}")
+            return None
+        for metric in result.get("metrics", []):
+            if metric["name"] == "JSHeapUsedSize":
+                return metric["value"]
+        return None
+
+    def sample(self, custom_driver):
+        """
+        Toma una muestra de memoria y la publica en las métricas del driver (si tiene).
+
+        Returns:
+            dict: rss_bytes y heap_bytes (None si no se pudieron medir), pages y time
+        """
+        sample = {
+            "rss_bytes": self._rss_bytes(custom_driver),
+            "heap_bytes": self._heap_bytes(custom_driver),
+            "pages": self.pages,
+            "time": time.time(),
+        }
+        self.last_sample = sample
+        if custom_driver.metrics is not None:
+            for name, key in (("browser_rss_bytes", "rss_bytes"), ("js_heap_bytes", "heap_bytes")):
+                if sample[key] is not None:
+                    custom_driver.metrics.set_gauge(name, sample[key])
+        return sample
+
+    def _reason(self, sample):
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return "pages"
+        if sample is None:
+            return None
+        if self.max_rss_mb is not None and sample["rss_bytes"] is not None and sample["rss_bytes"] > self.max_rss_mb * MB:
+            return "rss"
+        if self.max_heap_mb is not None and sample["heap_bytes"] is not None and sample["heap_bytes"] > self.max_heap_mb * MB:
+            return "heap"
+        return None
+
+    def before_navigation(self, custom_driver):
+        """
+        Lo llama CustomDriver.get antes de navegar: cuenta la navegación, muestrea
+        cuando toca y recicla la sesión si se pasó algún umbral.
+
+        Returns:
+            str: Motivo del reciclado ("pages", "rss" o "heap"), o None
+        """
+        if self._recycling:
+            return None
+        self.pages += 1
+        sample = self.sample(custom_driver) if self.pages % self.sample_every == 0 else None
+        reason = self._reason(sample)
+        if reason is None:
+            return None
+        if custom_driver._tab_groups:
+            # Las pestañas de un TabGroup usan el navegador: se recicla tras cerrarlo
+            return None
+        print(f"♻️ Recycling browser session ({reason}): {self._describe(sample)}")
+        self._recycling = True
+        try:
+            custom_driver.recycle(restore=self.restore_state, reason=reason)
+        finally:
+            self._recycling = False
+        return reason
+
+    def _describe(self, sample):
+        if sample is None:
+            return f"{self.pages} pages"
+        parts = [f"{self.pages} pages"]
+        if sample["rss_bytes"] is not None:
+            parts.append(f"rss {sample['rss_bytes'] / MB:.0f} MB")
+        if sample["heap_bytes"] is not None:
+            parts.append(f"heap {sample['heap_bytes'] / MB:.0f} MB")
+        return ", ".join(parts)
+
+    def on_recycle(self, custom_driver, reason):
+        """Reinicia los contadores tras un reciclado y lo cuenta en las métricas."""
+        self.pages = 0
+        self._performance_enabled_for = None
+        self._pid_for = (None, None)
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+        if custom_driver.metrics is not None:
+            custom_driver.metrics.increment("memory_recycles", labels={"reason": reason})
+
+    def stats(self):
+        """
+        Returns:
+            dict: pages desde el último reciclado, recycles por motivo y last_sample
+        """
+        return {"pages": self.pages, "recycles": dict(self.recycles), "last_sample": self.last_sample}
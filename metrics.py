@@ -0,0 +1,261 @@
+from collections import deque
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# Límites (en segundos) de los buckets de los histogramas
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PHASES = ("total", "driver", "sleep")
+
+# Registro de la llamada instrumentada en curso. contextvars funciona tanto por
+# hilo como por tarea de asyncio, así que sirve para CustomDriver y AsyncCustomDriver.
+_current = contextvars.ContextVar("customdriver_current_record", default=None)
+
+
+def note_sleep(seconds):
+    """Suma tiempo de espera deliberada a la llamada instrumentada en curso (si la hay)."""
+    record = _current.get()
+    if record is not None:
+        record["sleep"] += seconds
+
+
+def note_retry():
+    """Cuenta un reintento en la llamada instrumentada en curso (si la hay)."""
+    record = _current.get()
+    if record is not None:
+        record["retries"] += 1
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Percentil aproximado (límite superior del bucket que lo contiene)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[idx] if idx < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts)},
+        }
+
+
+class DriverMetrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS, keep_last=1000):
+        """
+        Métricas de latencia por método público de CustomDriver.
+
+        Para cada llamada separa el tiempo de WebDriver/CDP del tiempo de espera
+        deliberada (delays del Pacer y esperas entre reintentos) y cuenta los
+        reintentos. Se puede compartir una misma instancia entre varias sesiones.
+
+        Args:
+            buckets: Límites de los buckets de los histogramas, en segundos
+            keep_last: Número de llamadas individuales que se conservan (con selector)
+        """
+        self.buckets = buckets
+        self.histograms = {}
+        self.retries = {}
+        self.errors = {}
+        self.calls = deque(maxlen=keep_last)
+        self.gauges = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, record):
+        method = record["method"]
+        total = record["total"]
+        sleep = min(record["sleep"], total)
+        with self._lock:
+            if method not in self.histograms:
+                self.histograms[method] = {phase: Histogram(self.buckets) for phase in PHASES}
+                self.retries[method] = 0
+                self.errors[method] = 0
+            histograms = self.histograms[method]
+            histograms["total"].observe(total)
+            histograms["driver"].observe(total - sleep)
+            histograms["sleep"].observe(sleep)
+            self.retries[method] += record["retries"]
+            self.errors[method] += 1 if record["error"] else 0
+            self.calls.append(record)
+
+    def set_gauge(self, name, value):
+        """Guarda el último valor de una medida de la sesión (ej: browser_rss_bytes)."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def increment(self, name, amount=1, labels=None):
+        """Suma `amount` a un contador de eventos de la sesión (ej: memory_recycles)."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def _counter_dict(self):
+        return {
+            name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+            for (name, labels), value in self.counters.items()
+        }
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                method: {
+                    **{phase: histogram.to_dict() for phase, histogram in histograms.items()},
+                    "retries": self.retries[method],
+                    "errors": self.errors[method],
+                }
+                for method, histograms in self.histograms.items()
+            }
+
+    def dump_json(self, path, include_calls=False):
+        """
+        Guarda los histogramas (y opcionalmente las últimas llamadas) en JSON.
+        """
+        data = {"methods": self.to_dict()}
+        with self._lock:
+            data["gauges"] = dict(self.gauges)
+            data["counters"] = self._counter_dict()
+            if include_calls:
+                data["calls"] = list(self.calls)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def to_prometheus(self, prefix="customdriver"):
+        """
+        Devuelve las métricas en formato de texto de Prometheus.
+        """
+        lines = [
+            f"# HELP {prefix}_action_seconds Duración de los métodos de CustomDriver por fase (total, driver, sleep).",
+            f"# TYPE {prefix}_action_seconds histogram",
+        ]
+        with self._lock:
+            for method, histograms in self.histograms.items():
+                for phase, histogram in histograms.items():
+                    labels = f'method="{method}",phase="{phase}"'
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f'{prefix}_action_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{prefix}_action_seconds_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{prefix}_action_seconds_count{{{labels}}} {histogram.count}")
+            lines.append(f"# HELP {prefix}_action_retries_total Reintentos por método.")
+            lines.append(f"# TYPE {prefix}_action_retries_total counter")
+            for method, retries in self.retries.items():
+                lines.append(f'{prefix}_action_retries_total{{method="{method}"}} {retries}')
+            lines.append(f"# HELP {prefix}_action_errors_total Llamadas que terminaron en excepción.")
+            lines.append(f"# TYPE {prefix}_action_errors_total counter")
+            for method, errors in self.errors.items():
+                lines.append(f'{prefix}_action_errors_total{{method="{method}"}} {errors}')
+            for name, value in self.gauges.items():
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (counter, labels), value in self.counters.items():
+                    if counter == name:
+                        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                        lines.append(f"{prefix}_{name}_total{{{label_text}}} {value}" if labels else f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump_prometheus(self, path, prefix="customdriver"):
+        """
+        Escribe las métricas en un fichero de texto para el textfile collector de Prometheus.
+        La escritura es atómica para que el collector nunca lea un fichero a medias.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+
+def _new_record(method, args):
+    target = args[0] if args and isinstance(args[0], str) else None
+    return {"method": method, "selector": target, "start": time.time(), "total": 0.0, "sleep": 0.0, "retries": 0, "error": None}
+
+
+def instrumented(method):
+    """
+    Decorador para los métodos públicos del driver. Si el driver no tiene métricas
+    ni captura de artefactos (`self.metrics` y `self.artifacts` a None) no añade
+    ningún coste. Solo se registra la llamada más externa: un `click` que llama
+    internamente a `wait_for_clickable_element` cuenta como un único `click`.
+    Al terminar la llamada se avisa al ArtifactCollector (ver artifacts.py).
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                artifacts = getattr(self, "artifacts", None)
+                if (self.metrics is None and artifacts is None) or _current.get() is not None:
+                    return await fn(self, *args, **kwargs)
+                record = _new_record(method, args)
+                token = _current.set(record)
+                started = time.perf_counter()
+                try:
+                    return await fn(self, *args, **kwargs)
+                except Exception as e:
+                    record["error"] = str(e)
+                    raise
+                finally:
+                    record["total"] = time.perf_counter() - started
+                    _current.reset(token)
+                    if self.metrics is not None:
+                        self.metrics.observe(record)
+                    if artifacts is not None:
+                        # La captura habla con el navegador: en el executor de la sesión y
+                        # con su lock, para no solaparse con el siguiente comando
+                        await self._run(artifacts.after_call, self._sync, record)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            artifacts = getattr(self, "artifacts", None)
+            if (self.metrics is None and artifacts is None) or _current.get() is not None:
+                return fn(self, *args, **kwargs)
+            record = _new_record(method, args)
+            token = _current.set(record)
+            started = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception as e:
+                record["error"] = str(e)
+                raise
+            finally:
+                record["total"] = time.perf_counter() - started
+                _current.reset(token)
+                if self.metrics is not None:
+                    self.metrics.observe(record)
+                if artifacts is not None:
+                    artifacts.after_call(self, record)
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+from metrics import note_sleep
+import contextvars
+import random
+import threading
+import time
+
+# Distribuciones por acción, en segundos. Una tupla (min, max) es uniforme, un número
+# es un delay fijo y un callable devuelve el delay en cada llamada.
+HUMAN = {
+    "after_get": (1.0, 3.0),
+    "after_new_tab": (0.8, 2.0),
+    "before_click": (0.3, 1.4),
+    "after_click": (0.3, 1.6),
+    "after_cdp_click": (0.4, 1.6),
+    "after_touch": (0.4, 1.0),
+    "after_wait": (0.8, 1.6),
+    "after_type": (0.3, 2.0),
+    "after_type_slowly": (0.8, 2.0),
+    "keystroke": (0.1, 0.5),
+    "after_select": (0.6, 1.8),
+    "after_cdp_select": (0.3, 1.2),
+    "after_scroll": (0.5, 1.6),
+}
+
+BRISK = {action: (low / 4, high / 4) for action, (low, high) in HUMAN.items()}
+
+NONE = {action: 0.0 for action in HUMAN}
+
+PROFILES = {"human": HUMAN, "brisk": BRISK, "none": NONE}
+
+# Lista donde Pacer.sleep acumula los delays en lugar de dormirlos. AsyncCustomDriver
+# la activa al ejecutar un método síncrono en el executor y duerme después el total
+# con await asyncio.sleep, sin ocupar el hilo.
+deferred_sleeps = contextvars.ContextVar("customdriver_deferred_sleeps", default=None)
+
+# Delays que dejan terminar algo en la página antes del siguiente comando (el scroll
+# suave): no se aplazan nunca
+SETTLE_ACTIONS = ("after_scroll",)
+
+# Acciones a las que se suma `wait_speed` (las que ya lo sumaban antes del pacer)
+WAIT_SPEED_ACTIONS = ("after_get", "after_new_tab", "after_click", "after_cdp_click")
+
+
+class Pacer:
+    def __init__(self, profile="human", overrides=None, budget=None, wait_speed=0.0, type_speed=0.0):
+        """
+        Política central de delays humanizados de una sesión.
+
+        Args:
+            profile: Perfil base ("human", "brisk" o "none"). Con "none" todos los
+                delays son 0 y se ignoran wait_speed/type_speed.
+            overrides: Diccionario {acción: distribución} que sustituye al perfil base
+            budget: Segundos totales de espera deliberada permitidos en la sesión;
+                al agotarse, el resto de delays son 0 (default: sin límite)
+            wait_speed: Tiempo extra sumado a las acciones de WAIT_SPEED_ACTIONS
+            type_speed: Multiplicador de los delays entre teclas (0 -> base, 1 -> 2x, ...)
+
+        Example:
+            pacer = Pacer("brisk", overrides={"after_get": (0.2, 0.5)}, budget=120)
+        """
+        if profile not in PROFILES:
+            raise Exception(f"Unknown pacing profile {profile}. Use one of {list(PROFILES)}")
+        self.profile = profile
+        self.distributions = {**PROFILES[profile], **(overrides or {})}
+        self.budget = budget
+        self.wait_speed = wait_speed
+        self.type_speed = type_speed
+        self.slept = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_option(cls, pacing, wait_speed=0.0, type_speed=0.0):
+        """
+        Construye un Pacer a partir del argumento `pacing` de CustomDriver:
+        nombre de perfil, diccionario {"profile", "overrides", "budget"} o un Pacer.
+        """
+        if isinstance(pacing, Pacer):
+            return pacing
+        if pacing is None or isinstance(pacing, str):
+            return cls(pacing or "human", wait_speed=wait_speed, type_speed=type_speed)
+        return cls(
+            pacing.get("profile", "human"),
+            overrides=pacing.get("overrides"),
+            budget=pacing.get("budget"),
+            wait_speed=wait_speed,
+            type_speed=type_speed,
+        )
+
+    def _sample(self, action):
+        distribution = self.distributions.get(action, 0.0)
+        if callable(distribution):
+            return distribution()
+        if isinstance(distribution, (tuple, list)):
+            return random.uniform(*distribution)
+        return distribution
+
+    def delay(self, action):
+        """
+        Calcula (y descuenta del presupuesto) el delay de una acción sin dormir.
+        Útil para código asíncrono, que duerme con `await asyncio.sleep`.
+
+        Args:
+            action: Nombre de la acción (ver HUMAN)
+
+        Returns:
+            float: Segundos a esperar
+        """
+        seconds = self._sample(action)
+        if action == "keystroke" and self.profile != "none":
+            seconds *= 1.0 if self.type_speed == 0.0 else (1.0 + self.type_speed)
+        if action in WAIT_SPEED_ACTIONS and self.profile != "none":
+            seconds += self.wait_speed
+
+        with self._lock:
+            if self.budget is not None:
+                seconds = max(0.0, min(seconds, self.budget - self.slept))
+            self.slept += seconds
+        return seconds
+
+    def sleep(self, action):
+        """
+        Duerme el delay correspondiente a la acción (o lo aplaza, ver deferred_sleeps).
+
+        Returns:
+            float: Segundos dormidos
+        """
+        seconds = self.delay(action)
+        deferred = deferred_sleeps.get()
+        if deferred is not None and action not in SETTLE_ACTIONS:
+            deferred.append(seconds)
+        elif seconds > 0:
+            time.sleep(seconds)
+            note_sleep(seconds)
+        return seconds
+
+    @property
+    def remaining(self):
+        """Segundos de presupuesto restantes (None si no hay presupuesto)."""
+        if self.budget is None:
+            return None
+        return max(0.0, self.budget - self.slept)
@@ -0,0 +1,217 @@
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from driver import CustomDriver
+import queue
+import threading
+import time
+
+# Espera máxima por defecto de lease() y tramo de cada espera en la cola, para
+# comprobar entre medias si los arranques en segundo plano están fallando
+DEFAULT_LEASE_TIMEOUT = 120
+LEASE_POLL = 1.0
+
+
+class DriverPool:
+    def __init__(self, sizes={"seleniumbase": 1}, driver_kwargs=None, health_interval=30, max_starting=2, max_spawn_failures=3):
+        """
+        Pool de sesiones CustomDriver pre-calentadas por tipo de backend.
+
+        El arranque del navegador (Brave vía CDP o un perfil de Undetectable/Incogniton)
+        cuesta varios segundos; el pool lo saca del camino crítico de cada job
+        manteniendo `N` sesiones listas y reponiendo en segundo plano las que mueren.
+
+        Args:
+            sizes: Diccionario {tipo de backend: número de sesiones listas}
+                (ej: {"seleniumbase": 4, "undetectable": 2})
+            driver_kwargs: Diccionario {tipo de backend: kwargs de CustomDriver} con
+                proxy, velocidades o browser_options extra para ese backend
+            health_interval: Segundos entre comprobaciones de las sesiones ociosas (default: 30)
+            max_starting: Arranques de navegador simultáneos en segundo plano (default: 2)
+            max_spawn_failures: Arranques fallidos seguidos de un backend tras los que
+                lease() deja de esperar y lanza el último error (default: 3)
+
+        Example:
+            pool = DriverPool({"seleniumbase": 2})
+            with pool.lease("seleniumbase") as driver:
+                driver.get("https://example.com")
+        """
+        self.sizes = dict(sizes)
+        self.driver_kwargs = driver_kwargs or {}
+        self.health_interval = health_interval
+        self._idle = {backend: queue.Queue() for backend in self.sizes}
+        # Sesiones vivas por backend: ociosas + prestadas + arrancando
+        self._count = {backend: 0 for backend in self.sizes}
+        self.max_spawn_failures = max_spawn_failures
+        # Arranques fallidos seguidos y último error, por backend
+        self._failures = {backend: 0 for backend in self.sizes}
+        self._last_error = {backend: None for backend in self.sizes}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._starter = ThreadPoolExecutor(max_workers=max_starting, thread_name_prefix="driverpool")
+        self._stop = threading.Event()
+
+        self._refill()
+        self._monitor = threading.Thread(target=self._health_loop, name="driverpool-health", daemon=True)
+        self._monitor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _build(self, backend):
+        kwargs = dict(self.driver_kwargs.get(backend, {}))
+        browser_options = dict(kwargs.pop("browser_options", {}))
+        browser_options["type"] = backend
+        return CustomDriver(browser_options=browser_options, **kwargs)
+
+    def _spawn(self, backend):
+        try:
+            driver = self._build(backend)
+        except Exception as e:
+            print(f"❌ Error starting {backend} session for pool: {e}")
+            with self._lock:
+                self._count[backend] -= 1
+                self._failures[backend] += 1
+                self._last_error[backend] = e
+            return
+        with self._lock:
+            self._failures[backend] = 0
+        if self._closed:
+            self._discard(backend, driver)
+            return
+        self._idle[backend].put(driver)
+
+    def _refill(self):
+        """Lanza en segundo plano los arranques necesarios para volver al tamaño configurado."""
+        with self._lock:
+            if self._closed:
+                return
+            missing = []
+            for backend, size in self.sizes.items():
+                for _ in range(size - self._count[backend]):
+                    self._count[backend] += 1
+                    missing.append(backend)
+        for backend in missing:
+            self._starter.submit(self._spawn, backend)
+
+    def _discard(self, backend, driver):
+        with self._lock:
+            self._count[backend] -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            for backend, idle in self._idle.items():
+                for _ in range(idle.qsize()):
+                    try:
+                        driver = idle.get_nowait()
+                    except queue.Empty:
+                        break
+                    if driver.is_alive():
+                        idle.put(driver)
+                    else:
+                        print(f"⚠️ Dead {backend} session found in pool, replacing it")
+                        self._discard(backend, driver)
+            self._refill()
+
+    @contextmanager
+    def lease(self, backend="seleniumbase", timeout=DEFAULT_LEASE_TIMEOUT):
+        """
+        Presta una sesión lista del backend indicado.
+
+        Al salir del bloque la sesión se resetea (cookies, pestañas, about:blank)
+        y vuelve al pool; si está muerta o el reset falla se descarta y se
+        repone en segundo plano.
+
+        Args:
+            backend: Tipo de backend configurado en `sizes`
+            timeout: Segundos máximos esperando una sesión libre (default: 120;
+                None espera mientras los arranques no agoten max_spawn_failures)
+
+        Yields:
+            CustomDriver: Sesión lista para usar
+
+        Raises:
+            Exception: Si no hay una sesión disponible dentro del timeout o los
+                arranques del backend fallan max_spawn_failures veces seguidas
+        """
+        if backend not in self._idle:
+            raise Exception(f"Backend {backend} is not configured in this pool")
+        if self._closed:
+            raise Exception("DriverPool is closed")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = LEASE_POLL if deadline is None else min(LEASE_POLL, max(0.0, deadline - time.monotonic()))
+            try:
+                driver = self._idle[backend].get(timeout=remaining)
+            except queue.Empty:
+                with self._lock:
+                    failures, last_error = self._failures[backend], self._last_error[backend]
+                if failures >= self.max_spawn_failures:
+                    raise Exception(f"No {backend} session available: {failures} starts failed in a row ({last_error})")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise Exception(f"No {backend} session available after {timeout} seconds")
+                # Reponer lo que falló sin esperar al monitor de salud
+                self._refill()
+                continue
+            if driver.is_alive():
+                break
+            self._discard(backend, driver)
+            self._refill()
+
+        try:
+            yield driver
+        finally:
+            self._release(backend, driver)
+
+    def _release(self, backend, driver):
+        if self._closed:
+            self._discard(backend, driver)
+            return
+        try:
+            driver.reset()
+            healthy = driver.is_alive()
+        except Exception as e:
+            print(f"⚠️ Error resetting {backend} session: {e}")
+            healthy = False
+        if healthy:
+            self._idle[backend].put(driver)
+        else:
+            self._discard(backend, driver)
+            self._refill()
+
+    def stats(self):
+        """
+        Devuelve el estado del pool por backend.
+
+        Returns:
+            dict: {backend: {"size", "alive", "idle"}}
+        """
+        with self._lock:
+            return {
+                backend: {"size": size, "alive": self._count[backend], "idle": self._idle[backend].qsize()}
+                for backend, size in self.sizes.items()
+            }
+
+    def close(self):
+        """
+        Cierra el pool: detiene el monitor y cierra las sesiones ociosas.
+        Las sesiones prestadas se cierran al devolverse.
+        """
+        self._closed = True
+        self._stop.set()
+        self._monitor.join()
+        self._starter.shutdown(wait=True)
+        for backend, idle in self._idle.items():
+            while True:
+                try:
+                    driver = idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._discard(backend, driver)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+POLL_INTERVAL = 0.1
+DEFAULT_IDLE_MS = 500
+
+# Red inactiva en selenium: sin nuevas entradas de Resource Timing durante `idle` ms
+# y con el documento cargado. Devuelve [readyState, número de recursos].
+_RESOURCES_JS = "return [document.readyState, performance.getEntriesByType('resource').length];"
+
+
+def normalize(wait_until):
+    """
+    Normaliza la estrategia de espera de navegación a un diccionario {"kind": ...}.
+
+    Formatos aceptados:
+        - "load": document.readyState == "complete"
+        - "interactive": document.readyState es "interactive" o "complete"
+        - "networkidle" o {"networkidle": ms}: sin peticiones de red durante `ms` ms
+        - {"selector": "#id"}: el selector aparece en el DOM
+        - {"js": "return ..."}: un predicado JavaScript devuelve true
+        - callable(custom_driver): una función Python devuelve un valor truthy
+    """
+    if wait_until is None:
+        return None
+    if callable(wait_until):
+        return {"kind": "callable", "fn": wait_until}
+    if isinstance(wait_until, str):
+        if wait_until not in ("load", "interactive", "networkidle"):
+            raise Exception(f"Unknown wait_until strategy {wait_until}")
+        return {"kind": wait_until, "idle_ms": DEFAULT_IDLE_MS}
+    if "selector" in wait_until:
+        return {"kind": "selector", "selector": wait_until["selector"]}
+    if "js" in wait_until:
+        return {"kind": "js", "js": wait_until["js"]}
+    if "networkidle" in wait_until:
+        return {"kind": "networkidle", "idle_ms": wait_until["networkidle"] or DEFAULT_IDLE_MS}
+    raise Exception(f"Unknown wait_until strategy {wait_until}")
+
+
+class NetworkIdleTracker:
+    def __init__(self, cdp_driver):
+        """
+        Cuenta las peticiones en vuelo de una página sb_cdp a partir de los
+        eventos Network de CDP (RequestWillBeSent / LoadingFinished / LoadingFailed).
+        """
+        import mycdp
+
+        self.driver = cdp_driver
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        cdp_driver.add_handler(mycdp.network.RequestWillBeSent, self._on_request)
+        cdp_driver.add_handler(mycdp.network.LoadingFinished, self._on_done)
+        cdp_driver.add_handler(mycdp.network.LoadingFailed, self._on_done)
+
+    def _on_request(self, event):
+        self.inflight.add(event.request_id)
+        self.last_activity = time.monotonic()
+
+    def _on_done(self, event):
+        self.inflight.discard(event.request_id)
+        self.last_activity = time.monotonic()
+
+    def wait(self, idle_ms, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            # Los eventos solo se procesan mientras el loop de sb_cdp está corriendo
+            self.driver.loop.run_until_complete(asyncio.sleep(POLL_INTERVAL))
+            if not self.inflight and (time.monotonic() - self.last_activity) * 1000 >= idle_ms:
+                return True
+        raise Exception(f"Network did not become idle after {timeout} seconds")
+
+
+def _poll(check, timeout, description):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if check():
+                return True
+        except Exception:
+            # La página puede estar a mitad de navegación; se reintenta
+            pass
+        if time.monotonic() >= deadline:
+            raise Exception(f"Timed out after {timeout} seconds waiting for {description}")
+        time.sleep(POLL_INTERVAL)
+
+
+def _wait_resources_idle(custom_driver, idle_ms, timeout):
+    state = {"count": -1, "since": time.monotonic()}
+
+    def check():
+        ready_state, count = custom_driver._execute_js(_RESOURCES_JS)
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return ready_state == "complete" and (now - state["since"]) * 1000 >= idle_ms
+
+    return _poll(check, timeout, "network idle")
+
+
+def wait_until_ready(custom_driver, strategy, timeout=30):
+    """
+    Bloquea hasta que se cumple la estrategia de readiness (ya normalizada).
+
+    Args:
+        custom_driver: Instancia de CustomDriver
+        strategy: Resultado de `normalize`
+        timeout: Tiempo máximo de espera en segundos
+
+    Raises:
+        Exception: Si la condición no se cumple dentro del timeout
+    """
+    match strategy["kind"]:
+        case "load":
+            return _poll(lambda: custom_driver._execute_js("return document.readyState;") == "complete", timeout, "document.readyState == complete")
+        case "interactive":
+            return _poll(lambda: custom_driver._execute_js("return document.readyState;") in ("interactive", "complete"), timeout, "document.readyState == interactive")
+        case "selector":
+            custom_driver.getElement(strategy["selector"], timeout=timeout)
+            return True
+        case "js":
+            return _poll(lambda: custom_driver._execute_js(strategy["js"]), timeout, "custom JS predicate")
+        case "callable":
+            return _poll(lambda: strategy["fn"](custom_driver), timeout, "custom predicate")
+        case "networkidle":
+            if custom_driver.cdp:
+                return custom_driver._network_tracker().wait(strategy["idle_ms"], timeout)
+            return _wait_resources_idle(custom_driver, strategy["idle_ms"], timeout)
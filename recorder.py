@@ -0,0 +1,269 @@
+from element_cache import cache_key
+from pacing import Pacer
+import gzip
+import json
+import time
+
+VERSION = 1
+
+# Métodos de CustomDriver que se graban. Los de SELECTOR_ACTIONS reciben un selector
+# como primer argumento y guardan además la huella del elemento resuelto: la de las
+# acciones de INTERACTIONS se toma antes de ejecutarlas (un click puede navegar o quitar
+# el elemento), la de las esperas al terminar (el elemento puede no existir aún).
+RECORDED_ACTIONS = (
+    "get", "change_to_new_tab", "fill_form", "wait_for_element_to_disappear", "wait_for_any",
+    "scroll_to_element", "extract", "extract_table", "extract_list",
+)
+SELECTOR_ACTIONS = (
+    "click", "type", "select_option_by_value", "wait_for_visible_element",
+    "wait_for_clickable_element", "getElement", "wait_for",
+)
+INTERACTIONS = ("click", "type", "select_option_by_value")
+
+# Espera máxima a que aparezca el elemento de una interacción antes de tomar su huella
+FINGERPRINT_WAIT = 10
+
+# Huella compacta del elemento: suficiente para detectar que el selector ya no
+# apunta al mismo elemento al reproducir.
+FINGERPRINT_JS = r"""
+    var by = arguments[0], value = arguments[1], el;
+    if (by === 'xpath') {
+        el = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } else {
+        el = document.querySelector(value);
+    }
+    if (!el) return null;
+    return {
+        tag: el.tagName.toLowerCase(),
+        id: el.id || null,
+        name: el.getAttribute('name'),
+        classes: (el.getAttribute('class') || '').trim().split(/\s+/).filter(Boolean).slice(0, 5),
+        // El valor de los campos cambia al escribir: no forma parte de la identidad
+        text: /^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName) ? '' : String(el.innerText || '').trim().slice(0, 40)
+    };
+"""
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def fingerprint(custom_driver, selector):
+    """Huella del elemento que resuelve `selector` en la página actual (o None)."""
+    by, value = cache_key(selector)
+    try:
+        return custom_driver._execute_js(FINGERPRINT_JS, by, value)
+    except Exception:
+        return None
+
+
+def fingerprint_before(custom_driver, selector, timeout=FINGERPRINT_WAIT):
+    """
+    Huella del elemento de una interacción antes de ejecutarla. Si aún no está en la
+    página se espera a que aparezca, como haría la propia acción.
+    """
+    result = fingerprint(custom_driver, selector)
+    if result is not None:
+        return result
+    try:
+        custom_driver.wait_for(selector, "present", timeout=timeout)
+    except Exception:
+        return None
+    return fingerprint(custom_driver, selector)
+
+
+def load(path):
+    """
+    Lee una grabación.
+
+    Returns:
+        tuple: (cabecera, lista de pasos)
+    """
+    with _open(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("version") != VERSION:
+        raise Exception(f"Invalid recording {path}")
+    return lines[0], lines[1:]
+
+
+class Recorder:
+    def __init__(self, custom_driver, path, fingerprints=True):
+        """
+        Envuelve un CustomDriver y graba cada acción (método, argumentos, huella del
+        elemento, tiempo de espera deliberada y duración) en un fichero JSONL
+        (comprimido si termina en .gz). Cada paso se escribe al terminar, así que una
+        grabación cortada por un error conserva todo hasta el paso que falló.
+
+        El resto de atributos y métodos se delegan en el driver sin grabarse.
+
+        Args:
+            custom_driver: Instancia de CustomDriver
+            path: Fichero de la grabación
+            fingerprints: Si True, guarda la huella del elemento de cada acción con
+                selector (un script por acción)
+
+        Example:
+            with Recorder(driver, "login.jsonl") as rec:
+                rec.get("https://example.com/login")
+                rec.type("#user", "demo")
+                rec.click("#submit")
+        """
+        self.custom_driver = custom_driver
+        self.path = path
+        self.fingerprints = fingerprints
+        self.steps = 0
+        self._started = time.monotonic()
+        self._file = _open(path, "w")
+        header = {"version": VERSION, "created": time.time(), "pacing": custom_driver.pacer.profile, "cdp": custom_driver.cdp}
+        self._write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _write(self, line):
+        self._file.write(json.dumps(line, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def __getattr__(self, name):
+        attr = getattr(self.custom_driver, name)
+        if name in RECORDED_ACTIONS or name in SELECTOR_ACTIONS:
+            return self._recorded(name, attr)
+        return attr
+
+    def _recorded(self, action, method):
+        def wrapper(*args, **kwargs):
+            try:
+                json.dumps([args, kwargs])
+            except TypeError:
+                # Ej: scroll_to_element con un elemento ya resuelto: no se puede reproducir
+                print(f"⚠️ {action} called with non-serializable arguments, not recorded")
+                return method(*args, **kwargs)
+
+            step = {"i": self.steps, "action": action, "args": list(args), "kwargs": kwargs}
+            selector = args[0] if self.fingerprints and action in SELECTOR_ACTIONS and args and isinstance(args[0], str) else None
+            if selector is not None and action in INTERACTIONS:
+                step["fingerprint"] = fingerprint_before(self.custom_driver, selector)
+            slept = self.custom_driver.pacer.slept
+            started = time.monotonic()
+            step["t"] = round(started - self._started, 4)
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                step["error"] = str(e)[:500]
+                raise
+            finally:
+                step["duration"] = round(time.monotonic() - started, 4)
+                step["sleep"] = round(self.custom_driver.pacer.slept - slept, 4)
+                if selector is not None and action not in INTERACTIONS and "error" not in step:
+                    step["fingerprint"] = fingerprint(self.custom_driver, selector)
+                self._write(step)
+                self.steps += 1
+            return result
+        return wrapper
+
+
+class Replayer:
+    def __init__(self, custom_driver, path, speed=1.0, verify=True):
+        """
+        Reproduce una grabación de Recorder sobre un CustomDriver.
+
+        Durante la reproducción el driver usa el perfil de pacing "none" y el
+        replayer duerme la espera deliberada grabada de cada paso y el tiempo entre
+        pasos, multiplicados por `speed`.
+
+        Args:
+            custom_driver: Instancia de CustomDriver
+            path: Fichero grabado con Recorder
+            speed: 1.0 velocidad original, 0.1 diez veces más rápido, 0 sin esperas
+            verify: Si True, compara la huella de cada elemento con la grabada y para
+                la reproducción si el selector ya apunta a otro elemento, antes de hacer
+                click o escribir en él; "warn" solo avisa; False no compara
+        """
+        self.custom_driver = custom_driver
+        self.header, self.steps = load(path)
+        self.speed = speed
+        self.verify = verify
+
+    def _sleep(self, seconds):
+        seconds *= self.speed
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _verify(self, step, results, started):
+        """Compara la huella actual del elemento del paso con la grabada (None si no toca)."""
+        if not self.verify or step.get("fingerprint") is None:
+            return None
+        selector = step["args"][0]
+        if step["action"] in INTERACTIONS:
+            current = fingerprint_before(self.custom_driver, selector)
+        else:
+            current = fingerprint(self.custom_driver, selector)
+        if current == step["fingerprint"]:
+            return True
+        message = f"Step {step['i']}: {selector} now resolves to a different element"
+        if self.verify != "warn":
+            results.append({"i": step["i"], "action": step["action"], "duration": time.monotonic() - started, "fingerprint_ok": False, "error": message})
+            raise Exception(f"Replay stopped at step {step['i']} ({step['action']} {step['args'][:1]}): {selector} now resolves to a different element")
+        print(f"⚠️ {message}")
+        return False
+
+    def run(self, start_at=0, stop_at=None):
+        """
+        Ejecuta los pasos [start_at, stop_at). Al parar en `stop_at` el navegador
+        queda en el estado de ese paso, listo para inspeccionarlo (ej: con pause()).
+
+        Returns:
+            list: Un resumen por paso: i, action, duration, fingerprint_ok (None si no
+                se comprobó) y error
+
+        Raises:
+            Exception: El error del primer paso que falle (con el número de paso) o,
+                con verify=True, el primer elemento cuya huella no coincide
+        """
+        results = []
+        original_pacer = self.custom_driver.pacer
+        self.custom_driver.pacer = Pacer("none")
+        previous_end = None
+        try:
+            for step in self.steps[start_at:stop_at]:
+                if step.get("error"):
+                    # La grabación terminó en este paso: se reproduce para ver si sigue fallando
+                    print(f"⚠️ Step {step['i']} ({step['action']}) failed while recording: {step['error']}")
+                if previous_end is not None:
+                    self._sleep(max(0.0, step["t"] - previous_end))
+                previous_end = step["t"] + step["duration"]
+
+                started = time.monotonic()
+                fingerprint_ok = None
+                if step["action"] in INTERACTIONS:
+                    fingerprint_ok = self._verify(step, results, started)
+                try:
+                    getattr(self.custom_driver, step["action"])(*step["args"], **step["kwargs"])
+                except Exception as e:
+                    results.append({"i": step["i"], "action": step["action"], "duration": time.monotonic() - started, "fingerprint_ok": fingerprint_ok, "error": str(e)})
+                    raise Exception(f"Replay failed at step {step['i']} ({step['action']} {step['args'][:1]}): {e}") from e
+                if step["action"] not in INTERACTIONS:
+                    fingerprint_ok = self._verify(step, results, started)
+                results.append({"i": step["i"], "action": step["action"], "duration": time.monotonic() - started, "fingerprint_ok": fingerprint_ok, "error": None})
+                self._sleep(step["sleep"])
+        finally:
+            self.custom_driver.pacer = original_pacer
+        if stop_at is not None and stop_at < len(self.steps):
+            print(f"⏸️ Replay stopped before step {stop_at}")
+        return results
+
+
+def replay(custom_driver, path, speed=1.0, start_at=0, stop_at=None, verify=True):
+    """
+    Atajo de Replayer(custom_driver, path, speed, verify).run(start_at, stop_at).
+    """
+    return Replayer(custom_driver, path, speed=speed, verify=verify).run(start_at=start_at, stop_at=stop_at)
@@ -0,0 +1,227 @@
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from element_cache import caused_by
+from metrics import note_retry, note_sleep
+import asyncio
+import random
+import time
+
+KINDS = ("stale", "intercepted", "not_found", "timeout", "session_dead", "other")
+
+# Mensajes de sesiones muertas que llegan como WebDriverException genérica o desde CDP
+_DEAD_SESSION_MESSAGES = (
+    "invalid session id", "no such session", "chrome not reachable", "disconnected",
+    "target window already closed", "connection refused", "connectionclosed", "websocket",
+)
+
+# Sin jQuery ni frameworks: clic por JS en el primer botón de cierre visible
+_CLOSE_OVERLAY_JS = r"""
+    var selectors = arguments[0];
+    for (var i = 0; i < selectors.length; i++) {
+        var el = document.querySelector(selectors[i]);
+        if (el && el.offsetParent !== null) { el.click(); return selectors[i]; }
+    }
+    document.dispatchEvent(new KeyboardEvent('keydown', {key: 'Escape', bubbles: true}));
+    return null;
+"""
+
+DEFAULT_OVERLAY_SELECTORS = (
+    "[aria-label='Close']", "[aria-label='close']", "button.close", ".modal .close",
+    "#onetrust-accept-btn-handler", "[data-testid='close-button']",
+)
+
+
+def classify(exception):
+    """
+    Clasifica un error de una acción del driver.
+
+    Los métodos del driver re-lanzan como Exception genérica, así que se revisa la
+    cadena de excepciones y, para CDP (que lanza Exception con texto), el mensaje.
+
+    Returns:
+        str: "stale", "intercepted", "not_found", "timeout", "session_dead" u "other"
+    """
+    message = str(exception).lower()
+    if caused_by(exception, (InvalidSessionIdException, NoSuchWindowException)) or any(m in message for m in _DEAD_SESSION_MESSAGES):
+        return "session_dead"
+    if caused_by(exception, StaleElementReferenceException) or "stale element" in message:
+        return "stale"
+    if caused_by(exception, (ElementClickInterceptedException, ElementNotInteractableException)) or "intercepted" in message:
+        return "intercepted"
+    if caused_by(exception, NoSuchElementException) or "not found" in message or "no such element" in message:
+        return "not_found"
+    if caused_by(exception, (TimeoutException, asyncio.TimeoutError)) or "timed out" in message or "timeout" in message:
+        return "timeout"
+    return "other"
+
+
+def close_overlays(selectors=DEFAULT_OVERLAY_SELECTORS):
+    """
+    Crea un overlay_hook que hace clic en el primer botón de cierre visible de
+    `selectors` y, si no hay ninguno, envía Escape a la página.
+
+    Example:
+        policy = RetryPolicy(overlay_hook=close_overlays(["#cookie-banner .accept", ".newsletter .close"]))
+    """
+    selectors = list(selectors)
+
+    def hook(custom_driver, exception):
+        closed = custom_driver._execute_js(_CLOSE_OVERLAY_JS, selectors)
+        if closed:
+            print(f"🧹 Closed overlay {closed}")
+
+    return hook
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=4.0, jitter=0.3, deadline=30.0,
+                 retry_on=("stale", "intercepted", "not_found", "timeout"), immediate=("stale",),
+                 overlay_hook=None, wait_timeout=20):
+        """
+        Política de reintentos para click, type, select y las esperas, en ambos backends.
+
+        Cada error se clasifica (ver classify): los stale se reintentan al instante
+        (el elemento se vuelve a resolver), los demás con backoff exponencial con jitter,
+        y nunca más allá de `deadline` segundos desde el primer intento. Las sesiones
+        muertas no se reintentan.
+
+        Args:
+            max_attempts: Intentos máximos por acción (default: 3)
+            base_delay: Delay del primer reintento en segundos; se duplica en cada uno (default: 0.5)
+            max_delay: Delay máximo entre intentos (default: 4)
+            jitter: Variación aleatoria relativa del delay, ±jitter (default: 0.3)
+            deadline: Tiempo total máximo de la acción con sus reintentos (default: 30)
+            retry_on: Tipos de error que se reintentan
+            immediate: Tipos de error que se reintentan sin delay
+            overlay_hook: Función (custom_driver, exception) llamada antes de reintentar un
+                clic interceptado, para cerrar banners o modales (ver close_overlays)
+            wait_timeout: Espera máxima del elemento en cada intento, acotada por el deadline
+
+        Example:
+            driver = CustomDriver(retry_policy=RetryPolicy(max_attempts=5, overlay_hook=close_overlays()))
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = tuple(retry_on)
+        self.immediate = tuple(immediate)
+        self.overlay_hook = overlay_hook
+        self.wait_timeout = wait_timeout
+
+    @classmethod
+    def from_option(cls, option):
+        """
+        Construye la política a partir del parámetro `retry_policy` del driver:
+        None (política por defecto), un diccionario de argumentos o una instancia.
+        """
+        if option is None:
+            return cls()
+        if isinstance(option, RetryPolicy):
+            return option
+        if isinstance(option, dict):
+            return cls(**option)
+        raise Exception(f"Invalid retry_policy {option}. Use a RetryPolicy or a dict of its arguments")
+
+    def backoff(self, attempt):
+        """Delay antes del intento `attempt + 1` (backoff exponencial con jitter)."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _next_delay(self, kind, attempt, elapsed, retry_on):
+        """Delay hasta el siguiente intento, o None si hay que rendirse."""
+        if kind not in retry_on or attempt >= self.max_attempts:
+            return None
+        delay = 0.0 if kind in self.immediate else self.backoff(attempt)
+        if elapsed + delay >= self.deadline:
+            return None
+        return delay
+
+    def _on_error(self, custom_driver, kind, selector, by):
+        if kind == "stale":
+            custom_driver._invalidate_elements(selector, by)
+
+    def _give_up(self, action, selector, attempt, kind, exception):
+        print(f"🔥 All {attempt} attempts failed for {action} {selector}")
+        return Exception(f"Failed to {action} {selector} after {attempt} attempts ({kind}): {exception}")
+
+    def run(self, custom_driver, action, fn, selector=None, retry_on=None, by=By.CSS_SELECTOR):
+        """
+        Ejecuta `fn(timeout)` con reintentos. `timeout` es la espera de elemento que
+        puede usar el intento (wait_timeout acotado por lo que queda de deadline).
+        Si un intento falla por un elemento stale, se descarta de la caché la entrada
+        (by, selector).
+
+        Raises:
+            Exception: Si se agotan los intentos o el deadline; la excepción original
+                queda encadenada (classify sigue funcionando sobre ella). Si el primer
+                error no se reintenta, se relanza tal cual.
+        """
+        retry_on = self.retry_on if retry_on is None else retry_on
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            elapsed = time.monotonic() - started
+            try:
+                return fn(max(1, min(self.wait_timeout, self.deadline - elapsed)))
+            except Exception as e:
+                kind = classify(e)
+                self._on_error(custom_driver, kind, selector, by)
+                delay = self._next_delay(kind, attempt, time.monotonic() - started, retry_on)
+                if delay is None:
+                    if attempt == 1:
+                        raise
+                    raise self._give_up(action, selector, attempt, kind, e) from e
+                if kind == "intercepted" and self.overlay_hook is not None:
+                    try:
+                        self.overlay_hook(custom_driver, e)
+                    except Exception as hook_error:
+                        print(f"⚠️ Overlay hook failed: {hook_error}")
+                note_retry()
+                if delay > 0:
+                    time.sleep(delay)
+                    note_sleep(delay)
+
+    async def arun(self, custom_driver, action, fn, selector=None, retry_on=None, run_blocking=None, by=By.CSS_SELECTOR):
+        """
+        Versión asíncrona de run: `fn(timeout)` es una corrutina y los delays usan
+        asyncio.sleep. `run_blocking` ejecuta el overlay_hook fuera del event loop.
+        """
+        retry_on = self.retry_on if retry_on is None else retry_on
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            elapsed = time.monotonic() - started
+            try:
+                return await fn(max(1, min(self.wait_timeout, self.deadline - elapsed)))
+            except Exception as e:
+                kind = classify(e)
+                self._on_error(custom_driver, kind, selector, by)
+                delay = self._next_delay(kind, attempt, time.monotonic() - started, retry_on)
+                if delay is None:
+                    if attempt == 1:
+                        raise
+                    raise self._give_up(action, selector, attempt, kind, e) from e
+                if kind == "intercepted" and self.overlay_hook is not None:
+                    try:
+                        if run_blocking is not None:
+                            await run_blocking(self.overlay_hook, custom_driver, e)
+                        else:
+                            self.overlay_hook(custom_driver, e)
+                    except Exception as hook_error:
+                        print(f"⚠️ Overlay hook failed: {hook_error}")
+                note_retry()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    note_sleep(delay)
@@ -0,0 +1,286 @@
+import gzip
+import json
+import os
+import time
+
+VERSION = 1
+
+_COOKIE_FIELDS = ("name", "value", "domain", "path", "expires", "httpOnly", "secure", "sameSite")
+
+_STORAGE_JS = r"""
+    function dump(storage) {
+        var items = {};
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            items[key] = storage.getItem(key);
+        }
+        return items;
+    }
+    return {url: location.href, origin: location.origin, local: dump(localStorage), session: dump(sessionStorage)};
+"""
+
+# Se instala con Page.addScriptToEvaluateOnNewDocument para que el storage esté
+# restaurado antes de que se ejecuten los scripts de la página.
+_RESTORE_STORAGE_JS = r"""
+(function (state) {
+    if (location.origin !== state.origin) return;
+    try {
+        Object.keys(state.local).forEach(function (k) { localStorage.setItem(k, state.local[k]); });
+        Object.keys(state.session).forEach(function (k) { sessionStorage.setItem(k, state.session[k]); });
+    } catch (e) {}
+})(%s);
+"""
+
+# Copia de IndexedDB del origen actual: por base de datos, sus object stores
+# (keyPath, autoIncrement, índices) y los registros serializables a JSON.
+_IDB_DUMP_FN = r"""
+function () {
+    if (!indexedDB.databases) return Promise.resolve([]);
+    function request(req) {
+        return new Promise(function (resolve, reject) {
+            req.onsuccess = function () { resolve(req.result); };
+            req.onerror = function () { reject(req.error); };
+        });
+    }
+    function dumpStore(tx, name) {
+        var store = tx.objectStore(name);
+        var indexes = Array.prototype.map.call(store.indexNames, function (idx) {
+            var index = store.index(idx);
+            return {name: idx, keyPath: index.keyPath, unique: index.unique, multiEntry: index.multiEntry};
+        });
+        return Promise.all([request(store.getAllKeys()), request(store.getAll())]).then(function (res) {
+            var records = [];
+            res[0].forEach(function (key, i) {
+                try { records.push([JSON.parse(JSON.stringify(key)), JSON.parse(JSON.stringify(res[1][i]))]); } catch (e) {}
+            });
+            return {name: name, keyPath: store.keyPath, autoIncrement: store.autoIncrement, indexes: indexes, records: records};
+        });
+    }
+    return indexedDB.databases().then(function (dbs) {
+        return Promise.all(dbs.map(function (info) {
+            return request(indexedDB.open(info.name)).then(function (db) {
+                var names = Array.prototype.slice.call(db.objectStoreNames);
+                if (!names.length) { db.close(); return {name: info.name, version: db.version, stores: []}; }
+                var tx = db.transaction(names, 'readonly');
+                return Promise.all(names.map(function (n) { return dumpStore(tx, n); })).then(function (stores) {
+                    db.close();
+                    return {name: info.name, version: db.version, stores: stores};
+                });
+            });
+        }));
+    });
+}
+"""
+
+_IDB_RESTORE_FN = r"""
+function (databases) {
+    function restore(dump) {
+        return new Promise(function (resolve, reject) {
+            var req = indexedDB.open(dump.name, dump.version);
+            req.onupgradeneeded = function () {
+                var db = req.result;
+                dump.stores.forEach(function (s) {
+                    if (db.objectStoreNames.contains(s.name)) return;
+                    var store = db.createObjectStore(s.name, {keyPath: s.keyPath, autoIncrement: s.autoIncrement});
+                    s.indexes.forEach(function (i) {
+                        store.createIndex(i.name, i.keyPath, {unique: i.unique, multiEntry: i.multiEntry});
+                    });
+                });
+            };
+            req.onerror = function () { reject(req.error); };
+            req.onsuccess = function () {
+                var db = req.result;
+                var names = dump.stores.map(function (s) { return s.name; })
+                    .filter(function (n) { return db.objectStoreNames.contains(n); });
+                if (!names.length) { db.close(); return resolve(0); }
+                var tx = db.transaction(names, 'readwrite'), count = 0;
+                dump.stores.forEach(function (s) {
+                    if (names.indexOf(s.name) === -1) return;
+                    var store = tx.objectStore(s.name);
+                    s.records.forEach(function (r) {
+                        if (s.keyPath === null) store.put(r[1], r[0]); else store.put(r[1]);
+                        count++;
+                    });
+                });
+                tx.oncomplete = function () { db.close(); resolve(count); };
+                tx.onerror = function () { db.close(); reject(tx.error); };
+            };
+        });
+    }
+    return Promise.all(databases.map(restore)).then(function (counts) {
+        return counts.reduce(function (a, b) { return a + b; }, 0);
+    });
+}
+"""
+
+
+def _run_promise(custom_driver, fn, *args):
+    """Ejecuta una función JS que devuelve una Promise y espera su resultado (ambos backends)."""
+    if custom_driver.cdp:
+        expression = "(" + fn + ").apply(null, " + json.dumps(list(args)) + ")"
+        page = custom_driver.driver.page
+        return custom_driver.driver.loop.run_until_complete(page.evaluate(expression, await_promise=True))
+    script = (
+        "var callback = arguments[arguments.length - 1];"
+        "(" + fn + ").apply(null, Array.prototype.slice.call(arguments, 0, -1))"
+        ".then(function (r) { callback({result: r}); }, function (e) { callback({error: String(e)}); });"
+    )
+    result = custom_driver.driver.execute_async_script(script, *args) or {}
+    if result.get("error"):
+        raise Exception(result["error"])
+    return result.get("result")
+
+
+def _write(path, state):
+    data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    if path.endswith(".gz"):
+        data = gzip.compress(data)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".gz"):
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def save(custom_driver, path, indexeddb=True):
+    """
+    Guarda el estado de la sesión: todas las cookies del navegador y el localStorage,
+    sessionStorage e IndexedDB del origen de la página actual.
+
+    Args:
+        custom_driver: Instancia de CustomDriver (en la página de la que guardar el storage)
+        path: Fichero de destino; con extensión .gz se comprime
+        indexeddb: Si True, incluye IndexedDB (solo registros serializables a JSON)
+
+    Returns:
+        dict: Resumen (origin, cookies, local, session, indexeddb)
+    """
+    now = time.time()
+    cookies = custom_driver._execute_cdp("Network.getAllCookies", {}).get("cookies", [])
+    # Las cookies de sesión tienen expires -1; las caducadas no se guardan
+    cookies = [
+        {field: cookie[field] for field in _COOKIE_FIELDS if field in cookie}
+        for cookie in cookies
+        if cookie.get("expires", -1) <= 0 or cookie["expires"] > now
+    ]
+    storage = custom_driver._execute_js(_STORAGE_JS)
+
+    databases = []
+    if indexeddb and storage["origin"].startswith("http"):
+        try:
+            databases = _run_promise(custom_driver, _IDB_DUMP_FN) or []
+        except Exception as e:
+            print(f"⚠️ Could not read IndexedDB of {storage['origin']}: {e}")
+
+    state = {
+        "version": VERSION,
+        "saved_at": now,
+        "url": storage["url"],
+        "origin": storage["origin"],
+        "cookies": cookies,
+        "local": storage["local"],
+        "session": storage["session"],
+        "indexeddb": databases,
+    }
+    _write(path, state)
+    return {
+        "origin": state["origin"],
+        "cookies": len(cookies),
+        "local": len(state["local"]),
+        "session": len(state["session"]),
+        "indexeddb": sum(len(store["records"]) for db in databases for store in db["stores"]),
+    }
+
+
+def is_valid(state, max_age=None, required_cookies=None):
+    """
+    Comprueba si un estado guardado sigue sirviendo.
+
+    Args:
+        state: Estado leído del fichero
+        max_age: Antigüedad máxima en segundos (default: sin límite)
+        required_cookies: Nombres de cookies que deben existir y no haber caducado
+            (ej: la cookie de sesión del login)
+
+    Returns:
+        bool
+    """
+    now = time.time()
+    if state.get("version") != VERSION:
+        return False
+    if max_age is not None and now - state["saved_at"] > max_age:
+        return False
+    alive = {c["name"] for c in state["cookies"] if c.get("expires", -1) <= 0 or c["expires"] > now}
+    return all(name in alive for name in (required_cookies or []))
+
+
+def _cookie_param(cookie):
+    """
+    Cookie guardada (ya reducida a _COOKIE_FIELDS) lista para Network.setCookies. Las
+    cookies de sesión se guardan con expires=-1, que setCookies tomaría como una fecha
+    pasada y descartaría: se envían sin expires para que sigan siendo cookies de sesión.
+    """
+    param = dict(cookie)
+    if param.get("expires", -1) <= 0:
+        param.pop("expires", None)
+    return param
+
+
+def load(custom_driver, path, max_age=None, required_cookies=None, url=None):
+    """
+    Restaura un estado guardado con `save` y navega a la página guardada (o a `url`).
+
+    Las cookies se restauran con CDP antes de navegar y el storage se inyecta antes de
+    que se ejecuten los scripts de la página, así que la página carga ya autenticada.
+
+    Args:
+        custom_driver: Instancia de CustomDriver
+        path: Fichero guardado con `save`
+        max_age, required_cookies: Ver is_valid
+        url: URL a abrir tras restaurar (default: la URL guardada)
+
+    Returns:
+        bool: False si no hay fichero o el estado caducó (hay que hacer el login completo)
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        state = _read(path)
+    except Exception as e:
+        print(f"⚠️ Could not read session state {path}: {e}")
+        return False
+    if not is_valid(state, max_age, required_cookies):
+        print(f"⚠️ Session state {path} is expired or outdated")
+        return False
+
+    now = time.time()
+    cookies = [_cookie_param(c) for c in state["cookies"] if c.get("expires", -1) <= 0 or c["expires"] > now]
+    if cookies:
+        custom_driver._execute_cdp("Network.setCookies", {"cookies": cookies})
+
+    script_id = None
+    if state["local"] or state["session"]:
+        source = _RESTORE_STORAGE_JS % json.dumps({"origin": state["origin"], "local": state["local"], "session": state["session"]})
+        script_id = custom_driver._execute_cdp("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+    try:
+        custom_driver.get(url or state["url"])
+    finally:
+        if script_id is not None:
+            custom_driver._execute_cdp("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+
+    if state["indexeddb"]:
+        try:
+            restored = _run_promise(custom_driver, _IDB_RESTORE_FN, state["indexeddb"])
+            if restored:
+                # La página ya leyó su IndexedDB vacío: se recarga para que vea los datos
+                custom_driver.get(url or state["url"])
+        except Exception as e:
+            print(f"⚠️ Could not restore IndexedDB of {state['origin']}: {e}")
+    return True
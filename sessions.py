@@ -0,0 +1,166 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+import json
+import os
+import threading
+import time
+import urllib.request
+
+# Registro de navegadores que siguen vivos tras un detach(), para que el siguiente
+# proceso se conecte a ellos en lugar de lanzar el perfil de nuevo.
+DEFAULT_SESSIONS_FILE = os.path.join(os.path.expanduser("~"), ".customdriver", "sessions.json")
+
+
+class SessionRegistry:
+    def __init__(self, path=DEFAULT_SESSIONS_FILE):
+        """
+        Fichero JSON con las sesiones reutilizables, por nombre:
+        {"kind": "debugger", "address": "127.0.0.1:9222"} o
+        {"kind": "remote", "url": "http://127.0.0.1:35000", "session_id": "..."},
+        más el tipo de backend y la fecha de registro.
+
+        Args:
+            path: Ruta del fichero (default: ~/.customdriver/sessions.json)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, sessions):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sessions, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, name):
+        with self._lock:
+            return self._load().get(name)
+
+    def put(self, name, entry):
+        with self._lock:
+            sessions = self._load()
+            sessions[name] = {**entry, "registered_at": time.time()}
+            self._save(sessions)
+
+    def remove(self, name, session=None):
+        """
+        Borra la sesión `name`. Con `session` (una entrada de describe), solo si
+        sigue apuntando al mismo navegador.
+        """
+        with self._lock:
+            sessions = self._load()
+            entry = sessions.get(name)
+            if entry is None or (session is not None and not _same_session(entry, session)):
+                return
+            del sessions[name]
+            self._save(sessions)
+
+    def list(self):
+        with self._lock:
+            return self._load()
+
+
+def _same_session(entry, session):
+    keys = ("kind", "address", "url", "session_id")
+    return all(entry.get(key) == session.get(key) for key in keys)
+
+
+def default_name(browser_options):
+    """Nombre de la sesión para browser_options["attach"] = True: "tipo:perfil"."""
+    profile = browser_options.get("profile")
+    return f"{browser_options.get('type', 'seleniumbase')}:{profile if isinstance(profile, str) else 'default'}"
+
+
+def debugger_alive(address, timeout=1.0):
+    """Comprueba que hay un navegador escuchando en el puerto de depuración `address`."""
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as resp:
+            return resp.status == 200
+    except Exception:
+        return False
+
+
+class _AttachedRemote(webdriver.Remote):
+    """webdriver.Remote que reutiliza una sesión existente en lugar de crear otra."""
+
+    def __init__(self, command_executor, session_id):
+        self._attach_session_id = session_id
+        super().__init__(command_executor=command_executor, options=Options())
+
+    def start_session(self, capabilities):
+        self.session_id = self._attach_session_id
+        self.caps = {}
+
+
+def attach(entry, chrome_driver_path=None):
+    """
+    Conecta un driver a una sesión registrada y comprueba que responde.
+
+    Args:
+        entry: Entrada del registro (ver SessionRegistry)
+        chrome_driver_path: Ruta de chromedriver para las sesiones "debugger"
+            (default: la que encuentre selenium)
+
+    Returns:
+        WebDriver conectado, o None si el navegador ya no existe
+    """
+    driver = None
+    try:
+        if entry["kind"] == "debugger":
+            if not debugger_alive(entry["address"]):
+                return None
+            options = Options()
+            options.debugger_address = entry["address"]
+            service = Service(chrome_driver_path) if chrome_driver_path else Service()
+            driver = webdriver.Chrome(service=service, options=options)
+        elif entry["kind"] == "remote":
+            driver = _AttachedRemote(entry["url"], entry["session_id"])
+        else:
+            raise Exception(f"Unknown session kind {entry['kind']}")
+        driver.window_handles
+        return driver
+    except Exception as e:
+        print(f"⚠️ Could not attach to session {entry.get('address') or entry.get('url')}: {e}")
+        if driver is not None and entry["kind"] == "debugger":
+            release(driver)
+        return None
+
+
+def describe(driver):
+    """
+    Entrada de registro con la que volver a conectarse a `driver`.
+
+    Raises:
+        Exception: Si el driver no es un WebDriver de Chrome ni un webdriver.Remote
+    """
+    if isinstance(driver, ChromiumDriver):
+        address = (driver.caps or {}).get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            raise Exception("The browser does not expose a debugger address")
+        return {"kind": "debugger", "address": address}
+    if isinstance(driver, webdriver.Remote):
+        executor = driver.command_executor
+        config = getattr(executor, "_client_config", None)
+        url = getattr(config, "remote_server_addr", None) or getattr(executor, "_url", None)
+        return {"kind": "remote", "url": url, "session_id": driver.session_id}
+    raise Exception(f"Sessions of {type(driver).__name__} cannot be detached")
+
+
+def release(driver):
+    """
+    Suelta el driver sin cerrar el navegador: para chromedriver conectado por
+    debugger_address (el navegador no es suyo) y cierra las conexiones HTTP.
+    """
+    if isinstance(driver, ChromiumDriver):
+        driver.service.stop()
+    else:
+        driver.command_executor.close()
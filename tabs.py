@@ -0,0 +1,344 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from driver import CustomDriver
+from element_cache import ElementCache
+from metrics import instrumented, note_sleep
+import blocking
+import readiness
+import asyncio
+import queue
+import threading
+import time
+
+POLL_INTERVAL = 0.1
+
+# Devuelve el timeOrigin del documento anterior y, si la URL solo cambia el fragmento
+# (#...), la URL de destino: esa navegación no crea documento nuevo ni cambia timeOrigin.
+_NAVIGATE_JS = r"""
+    var target = new URL(arguments[0], location.href).href;
+    var hashOnly = target.indexOf('#') !== -1 && target.split('#')[0] === location.href.split('#')[0];
+    var origin = performance.timeOrigin;
+    window.location.href = arguments[0];
+    return [origin, hashOnly ? target : null];
+"""
+_LOAD_STATE_JS = "return [performance.timeOrigin, document.readyState, location.href];"
+
+
+class _TabRouter:
+    def __init__(self, driver):
+        """
+        Enruta cada comando de WebDriver a la pestaña del hilo que lo envía.
+
+        Todos los comandos (también los de los WebElement) pasan por driver.execute,
+        así que se sustituye por uno que, bajo un lock, cambia de ventana solo si la
+        pestaña del hilo no es la actual. El lock se mantiene por comando, no por
+        tarea: las cargas de página y las pausas humanizadas de cada pestaña se solapan.
+        """
+        from selenium.webdriver.remote.command import Command
+
+        self._switch = Command.SWITCH_TO_WINDOW
+        self._close = Command.CLOSE
+        self.driver = driver
+        self.lock = threading.RLock()
+        self.local = threading.local()
+        self._execute = driver.execute
+        self.current = driver.current_window_handle
+        driver.execute = self.execute
+
+    def execute(self, driver_command, params=None):
+        handle = getattr(self.local, "handle", None)
+        with self.lock:
+            if handle is not None and handle != self.current:
+                self._execute(self._switch, {"handle": handle})
+                self.current = handle
+            result = self._execute(driver_command, params)
+            if driver_command == self._switch:
+                self.current = params["handle"]
+            elif driver_command == self._close:
+                self.current = None
+            return result
+
+    @contextmanager
+    def bind(self, handle):
+        previous = getattr(self.local, "handle", None)
+        self.local.handle = handle
+        try:
+            yield
+        finally:
+            self.local.handle = previous
+
+    def uninstall(self):
+        del self.driver.execute
+
+
+class _ThreadedLoop:
+    def __init__(self, loop):
+        """
+        Sustituye al loop de sb_cdp mientras hay pestañas en paralelo: el loop corre en
+        un hilo propio y cada run_until_complete se envía con run_coroutine_threadsafe,
+        de modo que varias pestañas pueden esperar a CDP a la vez.
+        """
+        self.loop = loop
+        self._thread = threading.Thread(target=loop.run_forever, name="customdriver-cdp-loop", daemon=True)
+        self._thread.start()
+
+    def run_until_complete(self, awaitable):
+        if not asyncio.iscoroutine(awaitable):
+            awaitable = self._wrap(awaitable)
+        return asyncio.run_coroutine_threadsafe(awaitable, self.loop).result()
+
+    @staticmethod
+    async def _wrap(awaitable):
+        return await awaitable
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+    def __getattr__(self, name):
+        return getattr(self.loop, name)
+
+
+class TabView(CustomDriver):
+    """
+    Vista de una pestaña con la misma API que CustomDriver. Comparte el navegador,
+    el pacer y las métricas de la sesión; tiene su propia caché de elementos.
+    Se crea con TabGroup, no directamente.
+
+    La configuración (pacer, métricas, reintentos, backend...) no se copia: se lee
+    de la sesión principal en cada acceso, así que los cambios en ella se ven en las
+    pestañas. En selenium las esperas usan el motor "poll": execute_async_script
+    retendría el lock del router durante toda la espera y pararía las demás pestañas.
+    """
+
+    # Atributos propios de cada pestaña; el resto se lee de la sesión principal
+    _OWN = ("driver", "handle", "_router", "_parent", "_network_idle_tracker", "watchdog", "element_cache", "blocker", "wait_engine")
+
+    @classmethod
+    def _from(cls, custom_driver, tab_driver=None, handle=None, router=None):
+        view = cls.__new__(cls)
+        view._parent = custom_driver
+        view.driver = tab_driver or custom_driver.driver
+        view.handle = handle
+        view._router = router
+        view._network_idle_tracker = None
+        # Las pestañas comparten el navegador: solo la sesión principal puede reciclarlo
+        view.watchdog = None
+        view.element_cache = ElementCache() if custom_driver.element_cache is not None else None
+        view.wait_engine = custom_driver.wait_engine if custom_driver.cdp else "poll"
+        view.blocker = None
+        if custom_driver.blocker is not None:
+            with view.activate():
+                view.blocker = blocking.ResourceBlocker(view, custom_driver.blocker.rules)
+        return view
+
+    def __getattr__(self, name):
+        # Solo se llama para los atributos que la vista no tiene
+        if name == "_parent":
+            raise AttributeError(name)
+        return getattr(self._parent, name)
+
+    def __setattr__(self, name, value):
+        if name in self._OWN:
+            object.__setattr__(self, name, value)
+        else:
+            # Pacer, métricas, opciones...: son de la sesión, compartidos por todas las pestañas
+            setattr(self._parent, name, value)
+
+    def activate(self):
+        """
+        Context manager que dirige a esta pestaña los comandos del hilo actual.
+        Los workers de TabGroup lo hacen automáticamente; solo hace falta al usar
+        la vista directamente desde otro hilo.
+        """
+        if self._router is None:
+            return nullcontext()
+        return self._router.bind(self.handle)
+
+    @instrumented("get")
+    def get(self, url, wait_until=None, timeout=30, humanize=None):
+        """
+        Navega a la URL en esta pestaña (ver CustomDriver.get).
+
+        En selenium driver.get bloquea la sesión hasta la carga completa; aquí se navega
+        con JavaScript y se espera el nuevo documento sondeando, sin retener el lock
+        entre sondeos, para que las demás pestañas sigan trabajando.
+        """
+        if self.cdp:
+            return super().get(url, wait_until=wait_until, timeout=timeout, humanize=humanize)
+
+        strategy = readiness.normalize(wait_until) if wait_until is not None else self.wait_until
+        self._invalidate_elements()
+        origin, hash_url = self._execute_js(_NAVIGATE_JS, url)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                time_origin, state, current_url = self._execute_js(_LOAD_STATE_JS)
+                # Un cambio de fragmento no crea documento nuevo: basta con que la URL cambie
+                loaded = time_origin != origin or (hash_url is not None and current_url == hash_url)
+                if loaded and state == "complete":
+                    break
+            except Exception:
+                # El documento anterior se descargó a mitad del script
+                pass
+            if time.monotonic() >= deadline:
+                raise Exception(f"Tab did not load {url} after {timeout} seconds")
+            time.sleep(POLL_INTERVAL)
+            note_sleep(POLL_INTERVAL)
+        self._after_navigation(strategy, timeout, humanize, "after_get")
+        self._collect_blocked()
+
+    def reset(self):
+        """
+        Limpia el storage de la pestaña y navega a about:blank. Las cookies se
+        comparten con el resto de pestañas y no se tocan.
+        """
+        self._invalidate_elements()
+        self._execute_js("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        self.get("about:blank", humanize=False)
+
+    def change_to_new_tab(self, wait_until=None, timeout=30, humanize=None):
+        raise Exception("change_to_new_tab is not available on a TabView; open more tabs with TabGroup")
+
+    def recycle(self, restore=True, reason="manual"):
+        raise Exception("recycle is not available on a TabView; recycle the main session after closing the TabGroup")
+
+    def detach(self, name=None):
+        raise Exception("detach is not available on a TabView; detach the main session after closing the TabGroup")
+
+    def quit(self):
+        """
+        Cierra solo esta pestaña.
+        """
+        if self.cdp:
+            self.driver.loop.run_until_complete(self.driver.page.close())
+            return
+        with self.activate():
+            self.driver.close()
+
+
+class TabGroup:
+    def __init__(self, custom_driver, count=4):
+        """
+        Abre `count` pestañas en la sesión de un CustomDriver y reparte tareas entre ellas,
+        una tarea a la vez por pestaña. Permite procesar N URLs en paralelo con un solo
+        navegador en lugar de N procesos.
+
+        Args:
+            custom_driver: Instancia de CustomDriver ya iniciada (cualquier backend)
+            count: Número de pestañas de trabajo (default: 4)
+
+        Example:
+            def scrape(tab, url):
+                tab.get(url)
+                return tab.extract_list("h1")
+
+            with TabGroup(driver, count=4) as group:
+                results = group.map(scrape, urls)
+        """
+        self.custom_driver = custom_driver
+        self.tabs = []
+        self._router = None
+        self._loop = None
+        self._closed = False
+        # Mientras haya pestañas abiertas la sesión principal no se recicla (ver CustomDriver.recycle)
+        custom_driver._tab_groups += 1
+        if not custom_driver.cdp and custom_driver.wait_engine == "observer":
+            print("ℹ️ Tabs use the poll wait engine on selenium backends: an observer wait would block the other tabs")
+
+        if custom_driver.cdp:
+            self._loop = _ThreadedLoop(custom_driver.driver.loop)
+            custom_driver.driver.loop = self._loop
+        else:
+            self._router = _TabRouter(custom_driver.driver)
+            self._home = custom_driver.driver.current_window_handle
+
+        try:
+            for _ in range(count):
+                self.tabs.append(self._open_tab())
+        except Exception:
+            self.close()
+            raise
+        if self._router is not None:
+            custom_driver.driver.switch_to.window(self._home)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open_tab(self):
+        if self.custom_driver.cdp:
+            from seleniumbase import sb_cdp
+
+            browser = self.custom_driver.driver.driver
+            page = self._loop.run_until_complete(browser.get("about:blank", new_tab=True))
+            return TabView._from(self.custom_driver, tab_driver=sb_cdp.CDPMethods(self._loop, page, browser))
+
+        driver = self.custom_driver.driver
+        with self._router.lock:
+            driver.switch_to.new_window("tab")
+            handle = driver.current_window_handle
+        return TabView._from(self.custom_driver, handle=handle, router=self._router)
+
+    def _worker(self, tab, tasks, results):
+        with tab.activate():
+            while True:
+                try:
+                    index, task = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[index] = task(tab)
+                except Exception as e:
+                    print(f"❌ Tab task {index} failed: {e}")
+                    results[index] = e
+
+    def run(self, tasks):
+        """
+        Ejecuta las tareas repartidas entre las pestañas.
+
+        Args:
+            tasks: Lista de callables que reciben la TabView en la que se ejecutan
+
+        Returns:
+            list: Resultados en el orden de `tasks`; las tareas que fallan dejan su excepción
+        """
+        if self._closed:
+            raise Exception("TabGroup is closed")
+        pending = queue.Queue()
+        for index, task in enumerate(tasks):
+            pending.put((index, task))
+        results = [None] * len(tasks)
+        with ThreadPoolExecutor(max_workers=len(self.tabs), thread_name_prefix="customdriver-tab") as executor:
+            for tab in self.tabs:
+                executor.submit(self._worker, tab, pending, results)
+        return results
+
+    def map(self, task, items):
+        """
+        Igual que run, llamando a task(tab, item) para cada elemento de `items`.
+        """
+        return self.run([lambda tab, item=item: task(tab, item) for item in items])
+
+    def close(self):
+        """
+        Cierra las pestañas de trabajo y devuelve la sesión a su estado normal.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.custom_driver._tab_groups -= 1
+        for tab in self.tabs:
+            try:
+                tab.quit()
+            except Exception as e:
+                print(f"⚠️ Error closing tab: {e}")
+        self.tabs = []
+        if self._router is not None:
+            self._router.uninstall()
+            self.custom_driver.driver.switch_to.window(self._home)
+        if self._loop is not None:
+            self._loop.stop()
+            self.custom_driver.driver.loop = self._loop.loop
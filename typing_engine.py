@@ -0,0 +1,155 @@
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+import asyncio
+import random
+
+ENGINES = ("actions", "send_keys")
+
+DEFAULT_OPTIONS = {
+    # "actions": la secuencia en pocos comandos W3C Actions (o un lote CDP)
+    # "send_keys": un send_keys por carácter, como antes
+    "engine": "actions",
+    # Probabilidad por carácter de cometer una errata y corregirla con backspace
+    "typo_rate": 0.0,
+    # Probabilidad de empezar una ráfaga rápida y su multiplicador de delay
+    "burst_rate": 0.15,
+    "burst_length": (2, 5),
+    "burst_factor": 0.4,
+}
+
+# Teclas vecinas en QWERTY para generar erratas creíbles
+_NEIGHBORS = {
+    "q": "wa", "w": "qes", "e": "wrd", "r": "etf", "t": "ryg", "y": "tuh", "u": "yij", "i": "uok", "o": "ipl", "p": "o",
+    "a": "qsz", "s": "adwx", "d": "sfec", "f": "dgrv", "g": "fhtb", "h": "gjyn", "j": "hkum", "k": "jli", "l": "ko",
+    "z": "xa", "x": "zcs", "c": "xvd", "v": "cbf", "b": "vng", "n": "bmh", "m": "nj",
+}
+
+BACKSPACE = "\b"
+
+# Duración máxima (pausas incluidas) de cada comando W3C Actions. Un texto largo con
+# delays humanos en un solo perform() superaría el read timeout de selenium (120 s)
+# en webdriver.Remote.
+ACTIONS_CHUNK_SECONDS = 5.0
+
+
+def build_schedule(text, pacer, options=None):
+    """
+    Precalcula la secuencia completa de teclas y pausas para escribir `text`.
+
+    Args:
+        text: Texto a escribir
+        pacer: Pacer de la sesión; los delays salen de su acción "keystroke"
+        options: Opciones de DEFAULT_OPTIONS a sobrescribir
+
+    Returns:
+        list: Tuplas (tecla, pausa en segundos después de la tecla). La tecla
+            BACKSPACE borra el carácter anterior.
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    schedule = []
+    burst_left = 0
+
+    for char in text:
+        if burst_left == 0 and random.random() < options["burst_rate"]:
+            burst_left = random.randint(*options["burst_length"])
+        factor = options["burst_factor"] if burst_left > 0 else 1.0
+        burst_left = max(0, burst_left - 1)
+
+        lower = char.lower()
+        if lower in _NEIGHBORS and random.random() < options["typo_rate"]:
+            typo = random.choice(_NEIGHBORS[lower])
+            typo = typo.upper() if char.isupper() else typo
+            # La errata se nota con algo de retraso antes de borrarla
+            schedule.append((typo, pacer.delay("keystroke") * 2))
+            schedule.append((BACKSPACE, pacer.delay("keystroke")))
+
+        schedule.append((char, pacer.delay("keystroke") * factor))
+    return schedule
+
+
+def total_delay(schedule):
+    return sum(delay for _, delay in schedule)
+
+
+def send_keys_value(key):
+    """Traduce una tecla de la secuencia al valor que espera send_keys/Actions de selenium."""
+    if key == BACKSPACE:
+        return Keys.BACKSPACE
+    if key == "\n":
+        return Keys.ENTER
+    if key == "\t":
+        return Keys.TAB
+    return key
+
+
+def chunk_schedule(schedule, max_seconds=ACTIONS_CHUNK_SECONDS):
+    """
+    Parte la secuencia en tramos cuyas pausas suman como mucho `max_seconds`
+    (cada tramo tiene al menos una tecla).
+    """
+    chunk, seconds = [], 0.0
+    for key, delay in schedule:
+        if chunk and seconds + delay > max_seconds:
+            yield chunk
+            chunk, seconds = [], 0.0
+        chunk.append((key, delay))
+        seconds += delay
+    if chunk:
+        yield chunk
+
+
+def dispatch_actions(driver, schedule, max_seconds=ACTIONS_CHUNK_SECONDS):
+    """
+    Envía la secuencia como llamadas W3C Actions (key down/up + pausas) de como mucho
+    `max_seconds` cada una, para no agotar el read timeout del cliente de selenium.
+    El elemento debe tener el foco.
+    """
+    for chunk in chunk_schedule(schedule, max_seconds):
+        actions = ActionChains(driver)
+        for key, delay in chunk:
+            key = send_keys_value(key)
+            actions.key_down(key).key_up(key)
+            if delay > 0:
+                actions.pause(delay)
+        actions.perform()
+
+
+def dispatch_send_keys(element, schedule, sleep):
+    """Motor clásico: un send_keys por tecla y la pausa con `sleep`."""
+    for key, delay in schedule:
+        element.send_keys(send_keys_value(key))
+        if delay > 0:
+            sleep(delay)
+
+
+def _cdp_key_events(key):
+    from mycdp import input_
+
+    if key == BACKSPACE:
+        params = {"key": "Backspace", "code": "Backspace", "windows_virtual_key_code": 8}
+        return [input_.dispatch_key_event("rawKeyDown", **params), input_.dispatch_key_event("keyUp", **params)]
+    if key == "\n":
+        params = {"key": "Enter", "code": "Enter", "windows_virtual_key_code": 13}
+        return [
+            input_.dispatch_key_event("rawKeyDown", **params),
+            input_.dispatch_key_event("char", text="\r", **params),
+            input_.dispatch_key_event("keyUp", **params),
+        ]
+    return [input_.dispatch_key_event("keyDown", key=key, text=key), input_.dispatch_key_event("keyUp", key=key)]
+
+
+async def _send_cdp_schedule(page, schedule):
+    for key, delay in schedule:
+        for event in _cdp_key_events(key):
+            await page.send(event)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def dispatch_cdp(cdp_driver, schedule):
+    """
+    Envía la secuencia como eventos Input.dispatchKeyEvent en un solo lote sobre el
+    loop de sb_cdp (un único run_until_complete en lugar de uno por tecla).
+    El elemento debe tener el foco.
+    """
+    cdp_driver.loop.run_until_complete(_send_cdp_schedule(cdp_driver.page, schedule))
@@ -0,0 +1,222 @@
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from element_cache import is_xpath
+import json
+import re
+import time
+import weakref
+
+STATES = ("present", "visible", "clickable", "detached", "hidden", "text", "url")
+
+# Margen extra del script timeout de selenium sobre el timeout propio de la espera
+SCRIPT_TIMEOUT_MARGIN = 5
+
+# Script timeout de cada sesión selenium, para no pedirlo ni fijarlo en cada espera
+_script_timeouts = weakref.WeakKeyDictionary()
+
+# Función JS que resuelve una Promise cuando se cumple la primera de las condiciones.
+# Se reevalúa en cada mutación del DOM (MutationObserver), cuando un elemento encontrado
+# pero aún no visible cambia de intersección (IntersectionObserver) y, como red de
+# seguridad para cambios solo de estilo (transiciones CSS), cada 250 ms.
+_WAIT_FN = r"""
+function (specs, timeoutMs) {
+    function find(spec) {
+        if (spec.xpath) {
+            return document.evaluate(spec.selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(spec.selector);
+    }
+    function visible(el) {
+        if (!el || !el.isConnected) return false;
+        var style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+        var rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+    var evaluate = null;
+    var watched = [];
+    var intersection = window.IntersectionObserver ? new IntersectionObserver(function () { evaluate(); }) : null;
+    function watch(el) {
+        if (intersection && el && watched.indexOf(el) === -1) {
+            watched.push(el);
+            intersection.observe(el);
+        }
+    }
+    function check(spec) {
+        if (spec.state === 'url') return new RegExp(spec.pattern).test(location.href) ? true : null;
+        var el = find(spec);
+        switch (spec.state) {
+            case 'present': return el;
+            case 'visible': watch(el); return visible(el) ? el : null;
+            case 'clickable': watch(el); return visible(el) && !el.disabled ? el : null;
+            case 'detached': return el ? null : true;
+            case 'hidden': return visible(el) ? null : true;
+            case 'text': return el && new RegExp(spec.text).test(el.textContent) ? el : null;
+        }
+        return null;
+    }
+    return new Promise(function (resolve) {
+        var done = false, observer = null, interval = null, timer = null;
+        function finish(result) {
+            if (done) return;
+            done = true;
+            if (observer) observer.disconnect();
+            if (intersection) intersection.disconnect();
+            clearInterval(interval);
+            clearTimeout(timer);
+            resolve(result);
+        }
+        evaluate = function () {
+            if (done) return;
+            for (var i = 0; i < specs.length; i++) {
+                var result = check(specs[i]);
+                if (result) return finish({index: i, element: result === true ? null : result});
+            }
+        };
+        evaluate();
+        if (done) return;
+        observer = new MutationObserver(evaluate);
+        observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true, characterData: true});
+        interval = setInterval(evaluate, 250);
+        timer = setTimeout(function () { finish({index: -1, element: null}); }, timeoutMs);
+    });
+}
+"""
+
+_SELENIUM_JS = (
+    "var callback = arguments[arguments.length - 1];"
+    "(" + _WAIT_FN + ")(arguments[0], arguments[1]).then(callback, function (e) { callback({index: -1, error: String(e)}); });"
+)
+
+
+def spec(element_selector, state, by=By.CSS_SELECTOR, text=None):
+    """
+    Construye la condición de espera de un selector.
+
+    Args:
+        element_selector: Selector CSS o XPath (se detecta XPath como en element_cache.is_xpath)
+        state: "present", "visible", "clickable", "detached", "hidden" o "text"
+        by: By.CSS_SELECTOR o By.XPATH
+        text: Regex que debe cumplir el textContent (solo para state="text")
+    """
+    if state not in STATES:
+        raise Exception(f"Unknown wait state {state}. Use one of {STATES}")
+    if state == "text" and text is None:
+        raise Exception(f"Wait state text for {element_selector} needs a text regex")
+    if by not in (By.CSS_SELECTOR, By.XPATH):
+        raise Exception(f"The observer wait engine does not support locator strategy {by}")
+    xpath = by == By.XPATH or is_xpath(element_selector)
+    return {"selector": element_selector, "xpath": xpath, "state": state, "text": text}
+
+
+def url_spec(pattern):
+    """Condición que se cumple cuando location.href coincide con la regex `pattern`."""
+    return {"state": "url", "pattern": pattern}
+
+
+def from_condition(condition):
+    """
+    Convierte una condición de wait_for_any en su spec:
+        - "selector": el elemento es visible
+        - {"selector": ..., "state": ..., "text": ...}: estado explícito (ver spec)
+        - {"url_contains": "texto"} o {"url_matches": "regex"}: condición sobre la URL
+    """
+    if isinstance(condition, str):
+        return spec(condition, "visible")
+    if "url_contains" in condition:
+        return url_spec(re.escape(condition["url_contains"]))
+    if "url_matches" in condition:
+        return url_spec(condition["url_matches"])
+    return spec(condition["selector"], condition.get("state", "visible"), condition.get("by", By.CSS_SELECTOR), condition.get("text"))
+
+
+def supports(by):
+    return by in (By.CSS_SELECTOR, By.XPATH)
+
+
+# Errores que indican que la página navegó durante la espera (el script se perdió)
+_NAVIGATION_ERRORS = (
+    "document unloaded", "execution context was destroyed", "cannot find context",
+    "inspected target navigated", "target closed",
+)
+
+
+def _is_navigation(exception):
+    message = str(exception).lower()
+    return any(marker in message for marker in _NAVIGATION_ERRORS)
+
+
+def _ensure_script_timeout(driver, seconds):
+    """
+    Sube el script timeout de la sesión a `seconds` solo si el actual es menor. El
+    valor se lee una vez por sesión y se recuerda, así que en el caso normal una
+    espera es un único execute_async_script.
+    """
+    current = _script_timeouts.get(driver)
+    if current is None:
+        current = driver.timeouts.script or 0
+    if seconds > current:
+        driver.set_script_timeout(seconds)
+        current = seconds
+    _script_timeouts[driver] = current
+
+
+def _run_once(custom_driver, specs, timeout):
+    timeout_ms = int(timeout * 1000)
+    if custom_driver.cdp:
+        expression = (
+            "(" + _WAIT_FN + ")(" + json.dumps(specs) + ", " + str(timeout_ms) + ")"
+            ".then(function (r) { return {index: r.index}; }, function (e) { return {index: -1, error: String(e)}; })"
+        )
+        page = custom_driver.driver.page
+        result = custom_driver.driver.loop.run_until_complete(page.evaluate(expression, await_promise=True)) or {}
+    else:
+        _ensure_script_timeout(custom_driver.driver, timeout + SCRIPT_TIMEOUT_MARGIN)
+        result = custom_driver.driver.execute_async_script(_SELENIUM_JS, specs, timeout_ms) or {}
+    if result.get("error"):
+        # Selector inválido, regex mal formada...: no se arregla reintentando
+        raise JavascriptException(f"Wait script failed: {result['error']}")
+    return result.get("index", -1), result.get("element")
+
+
+def wait_any(custom_driver, specs, timeout=20):
+    """
+    Espera, con un único script en la página, a que se cumpla la primera de las condiciones.
+
+    Si la página navega durante la espera el script se pierde; en ese caso se
+    vuelve a instalar con el tiempo restante. Cualquier otro error del script (ej: un
+    selector inválido) se relanza al momento. En selenium el script timeout de la
+    sesión solo se sube, la primera vez que una espera necesita más que el actual.
+
+    Args:
+        custom_driver: Instancia de CustomDriver
+        specs: Lista de condiciones (ver spec / url_spec)
+        timeout: Tiempo máximo de espera en segundos
+
+    Returns:
+        tuple: (índice de la condición cumplida, elemento o None). En CDP el elemento
+            se vuelve a localizar con find_element porque no se puede devolver por valor.
+
+    Raises:
+        TimeoutException: Si ninguna condición se cumple dentro del timeout
+        JavascriptException: Si el script de espera falla por algo que no es una navegación
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException(f"None of the wait conditions was met after {timeout} seconds")
+        try:
+            index, element = _run_once(custom_driver, specs, remaining)
+        except Exception as e:
+            if not _is_navigation(e):
+                raise
+            time.sleep(0.1)
+            continue
+        if index < 0:
+            raise TimeoutException(f"None of the wait conditions was met after {timeout} seconds")
+
+        matched = specs[index]
+        if custom_driver.cdp and matched["state"] not in ("detached", "hidden", "url"):
+            element = custom_driver.driver.find_element(matched["selector"], timeout=max(1, remaining))
+        return index, element